@@ -0,0 +1,196 @@
+"""
+On-disk cache of parsed logs.
+Each entry is one .npz file holding the per-message-type columns, the
+summary stats and the timeline, keyed by the log's content hash, the
+FORENSIC_FIELDS schema and the dialect. Finished report images live
+under renders/, keyed by that same entry key plus the figure kind, size
+and DPI, so they go stale together with the parsed data. Parsed entries,
+renders and seek indexes (seek/) are each evicted least recently used
+first once they grow past CACHE_MAX_BYTES, CACHE_RENDER_MAX_BYTES and
+CACHE_SEEK_MAX_BYTES respectively.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import numpy as np
+from . import config
+from . import column_store
+
+_HASH_INDEX = 'hashes.json'
+_RENDER_DIR = 'renders'
+_SEEK_DIR = 'seek'
+
+def file_hash(path):
+    """
+    Content hash of a file. Hashes are remembered per (path, size, mtime)
+    so unchanged files are not re-read on every open.
+    """
+    path = Path(path).resolve()
+    st = path.stat()
+    index_path = config.CACHE_DIR / _HASH_INDEX
+    try:
+        index = json.loads(index_path.read_text())
+    except (OSError, ValueError):
+        index = {}
+    entry = index.get(str(path))
+    if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+        return entry[2]
+
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    index[str(path)] = [st.st_size, st.st_mtime_ns, digest.hexdigest()]
+    try:
+        config.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        index_path.write_text(json.dumps(index))
+    except OSError:
+        pass
+    return digest.hexdigest()
+
+def cache_key(log_file, dialect=config.DEFAULT_DIALECT):
+    schema = json.dumps(config.FORENSIC_FIELDS, sort_keys=True)
+    key = f'{file_hash(log_file)}|{schema}|{dialect}|{config.CACHE_VERSION}'
+    return hashlib.blake2b(key.encode(), digest_size=20).hexdigest()
+
+def _entry_path(key):
+    return config.CACHE_DIR / f'{key}.npz'
+
+def _to_builtin(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def store(key, tables, stats, timeline):
+    """Writes one cache entry, then evicts old entries over the size cap."""
+    arrays = {'row_timestamps': tables.row_timestamps}
+    for type_, cols in tables.columns.items():
+        for name, values in cols.items():
+            if tables.kinds[type_].get(name) == column_store.TEXT:
+                missing = np.array([not isinstance(v, str) for v in values], dtype=bool)
+                arrays[f'{type_}/{name}'] = np.array(['' if m else v for v, m in zip(values, missing)], dtype=str)
+                arrays[f'{type_}/{name}/missing'] = missing
+            else:
+                arrays[f'{type_}/{name}'] = values
+    meta = {
+        'kinds': tables.kinds,
+        'stats': {k: _to_builtin(v) for k, v in stats.items()},
+        'timeline': timeline,
+    }
+    arrays['meta'] = np.array(json.dumps(meta))
+
+    try:
+        config.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path = _entry_path(key)
+        # '.npz.tmp' is outside evict()'s '*.npz' glob, so a concurrent eviction never sees a partial entry.
+        # Written through a file object: given a path, np.savez would append '.npz' again
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+        evict()
+    except OSError as e:
+        print(f"Cache write failed: {e}")
+
+def load(key):
+    """Returns (tables, stats, timeline) for a cached log, or None."""
+    path = _entry_path(key)
+    if not path.is_file():
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            kinds = meta['kinds']
+            columns = {}
+            for type_, type_kinds in kinds.items():
+                cols = {}
+                for name, kind in type_kinds.items():
+                    values = data[f'{type_}/{name}']
+                    if kind == column_store.TEXT:
+                        missing = data[f'{type_}/{name}/missing']
+                        values = values.astype(object)
+                        values[missing] = np.nan
+                    cols[name] = values
+                columns[type_] = cols
+            tables = column_store.MessageTables(config.FORENSIC_FIELDS, kinds, columns, data['row_timestamps'])
+        os.utime(path)
+    except Exception as e:
+        print(f"Cache read failed, ignoring entry: {e}")
+        return None
+    return tables, meta['stats'], meta['timeline']
+
+def render_key(log_key, kind, size, dpi, *extra):
+    """
+    Key of a rendered image: the parsed-log key (content hash, schema,
+    dialect, CACHE_VERSION), the figure kind, its size in inches, the DPI,
+    plus anything else the picture depends on (e.g. the tile server).
+    """
+    key = '|'.join(str(part) for part in (log_key, kind, tuple(size), dpi, *extra))
+    return hashlib.blake2b(key.encode(), digest_size=20).hexdigest()
+
+def _render_path(key):
+    return config.CACHE_DIR / _RENDER_DIR / f'{key}.png'
+
+def load_render(key):
+    """PNG bytes of a cached render, or None."""
+    path = _render_path(key)
+    try:
+        data = path.read_bytes()
+        os.utime(path)
+    except OSError:
+        return None
+    return data
+
+def store_render(key, data):
+    try:
+        path = _render_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        evict_renders()
+    except OSError as e:
+        print(f"Render cache write failed: {e}")
+
+def seek_index_path(log_file):
+    """Where the seek index (see seek_index.py) of a log's current content lives."""
+    return config.CACHE_DIR / _SEEK_DIR / f'{file_hash(log_file)}.npz'
+
+def _evict(paths, max_bytes):
+    entries = []
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError:
+            # Removed by another process since the glob
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    return removed
+
+def evict(max_bytes=None):
+    """
+    Deletes least recently used parsed-log entries until they fit in
+    max_bytes (CACHE_MAX_BYTES). renders/ and seek/ are left alone; they
+    have caps of their own. Returns the number of entries removed.
+    """
+    return _evict(config.CACHE_DIR.glob('*.npz'), config.CACHE_MAX_BYTES if max_bytes is None else max_bytes)
+
+def evict_renders(max_bytes=None):
+    """Same as evict() for the report images under renders/ (CACHE_RENDER_MAX_BYTES)."""
+    return _evict((config.CACHE_DIR / _RENDER_DIR).glob('*.png'),
+                  config.CACHE_RENDER_MAX_BYTES if max_bytes is None else max_bytes)
+
+def evict_seek_indexes(max_bytes=None):
+    """Same as evict() for the seek indexes under seek/ (CACHE_SEEK_MAX_BYTES)."""
+    return _evict((config.CACHE_DIR / _SEEK_DIR).glob('*.npz'),
+                  config.CACHE_SEEK_MAX_BYTES if max_bytes is None else max_bytes)
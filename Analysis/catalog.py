@@ -0,0 +1,289 @@
+"""
+Fleet-wide catalog of processed flights.
+One SQLite file (CATALOG_PATH) with a row per log: content hash, duration,
+start/end UTC, bounding box, altitudes, distance, plus its timeline events
+and the flight modes it went through. Rows are written whenever a log is
+processed, so questions like "flights that used AUTO" or "logs longer than
+30 minutes" are answered from the index without reparsing anything.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+import numpy as np
+from . import config
+from . import detectors
+from . import flight_path
+from . import spatial_index
+
+MODE_PREFIX = 'Mode: '
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS flights (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    file_hash TEXT NOT NULL,
+    message_count INTEGER,
+    duration_sec REAL,
+    start_utc REAL,
+    end_utc REAL,
+    min_lat REAL,
+    min_lon REAL,
+    max_lat REAL,
+    max_lon REAL,
+    max_alt_m REAL,
+    max_rel_alt_m REAL,
+    distance_m REAL,
+    max_range_m REAL,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS flights_hash ON flights (file_hash);
+CREATE INDEX IF NOT EXISTS flights_duration ON flights (duration_sec);
+CREATE INDEX IF NOT EXISTS flights_start ON flights (start_utc);
+CREATE TABLE IF NOT EXISTS events (
+    flight_id INTEGER NOT NULL REFERENCES flights (id) ON DELETE CASCADE,
+    log_time REAL NOT NULL,
+    utc REAL,
+    label TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_flight ON events (flight_id);
+CREATE INDEX IF NOT EXISTS events_label ON events (label);
+CREATE TABLE IF NOT EXISTS modes (
+    flight_id INTEGER NOT NULL REFERENCES flights (id) ON DELETE CASCADE,
+    mode TEXT NOT NULL,
+    PRIMARY KEY (flight_id, mode)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS modes_mode ON modes (mode);
+"""
+
+def _nanmax(values):
+    values = np.asarray(values, dtype=np.float64)
+    return float(np.nanmax(values)) if len(values) and not np.isnan(values).all() else None
+
+def summarize(tables, stats, timeline):
+    """Catalog fields, [(log_time, utc, label), ...] and the sorted mode names for one parsed log."""
+    offset = detectors.utc_offset(tables)
+    start, end = float(tables.start_time), float(tables.end_time)
+    fields = {
+        'message_count': int(tables.message_count()),
+        'duration_sec': float(stats.get('duration_sec', end - start)),
+        'start_utc': start + offset if offset is not None else None,
+        'end_utc': end + offset if offset is not None else None,
+        'min_lat': None, 'min_lon': None, 'max_lat': None, 'max_lon': None,
+        'max_alt_m': None, 'max_rel_alt_m': None,
+        'distance_m': stats.get('total_distance_m'),
+        'max_range_m': stats.get('max_range_m'),
+    }
+    lat, lon = flight_path.extract_path(tables)
+    if len(lat):
+        fields['min_lat'], fields['min_lon'], fields['max_lat'], fields['max_lon'] = (
+            float(v) for v in flight_path.bounds(lat, lon))
+    if 'GLOBAL_POSITION_INT' in tables:
+        gps = tables.columns['GLOBAL_POSITION_INT']
+        fields['max_alt_m'] = _nanmax(gps['alt'] / 1000.0)
+        fields['max_rel_alt_m'] = _nanmax(gps['relative_alt'] / 1000.0)
+
+    events = []
+    modes = set()
+    for row in timeline:
+        log_time = float(row['Time (s)'])
+        events.append((log_time, log_time + offset if offset is not None else None, row['Event']))
+        if row['Event'].startswith(MODE_PREFIX):
+            modes.add(row['Event'][len(MODE_PREFIX):])
+    return fields, events, sorted(modes)
+
+class Catalog:
+    """
+    The flight catalog database. Safe to share between threads (one SQLite
+    connection each) and between processes (WAL journal, batch workers all
+    write to the same file).
+    """
+
+    def __init__(self, path=None):
+        self.path = str(path or config.CATALOG_PATH)
+        self._local = threading.local()
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection().executescript(_SCHEMA + spatial_index.SCHEMA)
+
+    def _connection(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA foreign_keys=ON')
+            self._local.db = db
+        return db
+
+    def lookup(self, log_file):
+        """The catalog row for a log path, or None."""
+        return self._connection().execute('SELECT * FROM flights WHERE path=?',
+                                          (str(Path(log_file).resolve()),)).fetchone()
+
+    def is_current(self, log_file):
+        """True if the log is catalogued and its size and mtime haven't changed since."""
+        row = self.lookup(log_file)
+        if row is None:
+            return False
+        st = Path(log_file).stat()
+        return row['size'] == st.st_size and row['mtime_ns'] == st.st_mtime_ns
+
+    def touch(self, log_file):
+        """Refreshes the stored size/mtime of a log whose content is known to be unchanged."""
+        path = Path(log_file).resolve()
+        st = path.stat()
+        self._connection().execute('UPDATE flights SET size=?, mtime_ns=? WHERE path=?',
+                                   (st.st_size, st.st_mtime_ns, str(path)))
+
+    def record(self, log_file, file_hash, tables, stats, timeline):
+        """Adds or replaces the entry for one processed log."""
+        path = Path(log_file).resolve()
+        st = path.stat()
+        fields, events, modes = summarize(tables, stats, timeline)
+        segments = spatial_index.track_segments(tables)
+        fields.update(path=str(path), name=path.name, size=st.st_size, mtime_ns=st.st_mtime_ns,
+                      file_hash=file_hash, indexed_at=time.time())
+        names = list(fields)
+        db = self._connection()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            # Replacing the row cascades to its old events, modes and segments
+            old = [row[0] for row in db.execute('SELECT id FROM flights WHERE path=?', (str(path),))]
+            spatial_index.delete(db, old)
+            db.execute('DELETE FROM flights WHERE path=?', (str(path),))
+            flight_id = db.execute(f"INSERT INTO flights ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                                   [fields[n] for n in names]).lastrowid
+            db.executemany('INSERT INTO events VALUES (?, ?, ?, ?)', [(flight_id, *e) for e in events])
+            db.executemany('INSERT INTO modes VALUES (?, ?)', [(flight_id, m) for m in modes])
+            spatial_index.insert(db, flight_id, segments)
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        return flight_id
+
+    def lookup_hash(self, file_hash, exclude=None):
+        """A catalog row for another log with the same content (file hash), or None."""
+        exclude = None if exclude is None else str(Path(exclude).resolve())
+        return self._connection().execute('SELECT * FROM flights WHERE file_hash=? AND path IS NOT ? LIMIT 1',
+                                          (file_hash, exclude)).fetchone()
+
+    def record_copy(self, log_file, source):
+        """
+        Adds or replaces the entry for log_file as a copy of `source` (a row of
+        a log with the same content), with its events, modes and track
+        segments, so identical logs at different paths are each catalogued
+        without being parsed again.
+        """
+        path = Path(log_file).resolve()
+        st = path.stat()
+        fields = {name: source[name] for name in source.keys() if name != 'id'}
+        fields.update(path=str(path), name=path.name, size=st.st_size, mtime_ns=st.st_mtime_ns,
+                      indexed_at=time.time())
+        names = list(fields)
+        db = self._connection()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            old = [row[0] for row in db.execute('SELECT id FROM flights WHERE path=?', (str(path),))]
+            spatial_index.delete(db, old)
+            db.execute('DELETE FROM flights WHERE path=?', (str(path),))
+            flight_id = db.execute(f"INSERT INTO flights ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                                   [fields[n] for n in names]).lastrowid
+            db.execute('INSERT INTO events SELECT ?, log_time, utc, label FROM events WHERE flight_id=?',
+                       (flight_id, source['id']))
+            db.execute('INSERT INTO modes SELECT ?, mode FROM modes WHERE flight_id=?', (flight_id, source['id']))
+            spatial_index.copy(db, source['id'], flight_id)
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        return flight_id
+
+    def find(self, mode=None, event=None, min_duration=None, max_duration=None,
+             after=None, before=None, name=None, limit=None):
+        """
+        Catalogued flights matching every given filter, newest first:
+        mode: flew in this mode (e.g. 'AUTO'); event: has a timeline event
+        containing this text; durations in seconds; after/before: UNIX time
+        the flight overlaps; name: SQL LIKE pattern on the file name.
+        """
+        where, args = [], []
+        if mode is not None:
+            where.append('id IN (SELECT flight_id FROM modes WHERE mode = ? COLLATE NOCASE)')
+            args.append(mode)
+        if event is not None:
+            where.append("id IN (SELECT flight_id FROM events WHERE label LIKE ?)")
+            args.append(f'%{event}%')
+        if min_duration is not None:
+            where.append('duration_sec >= ?')
+            args.append(min_duration)
+        if max_duration is not None:
+            where.append('duration_sec <= ?')
+            args.append(max_duration)
+        if after is not None:
+            where.append('end_utc >= ?')
+            args.append(after)
+        if before is not None:
+            where.append('start_utc <= ?')
+            args.append(before)
+        if name is not None:
+            where.append('name LIKE ?')
+            args.append(name)
+        sql = 'SELECT * FROM flights'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY start_utc DESC, path'
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+        return [dict(row) for row in self._connection().execute(sql, args)]
+
+    def events(self, flight_id):
+        return [dict(row) for row in self._connection().execute(
+            'SELECT log_time, utc, label FROM events WHERE flight_id=? ORDER BY log_time', (flight_id,))]
+
+    def modes(self, flight_id=None):
+        """Modes of one flight, or [(mode, number of flights), ...] across the catalog."""
+        db = self._connection()
+        if flight_id is not None:
+            return [row[0] for row in db.execute('SELECT mode FROM modes WHERE flight_id=? ORDER BY mode', (flight_id,))]
+        return [tuple(row) for row in db.execute(
+            'SELECT mode, COUNT(*) FROM modes GROUP BY mode ORDER BY COUNT(*) DESC, mode')]
+
+    def near(self, lat, lon, radius_m, after=None, before=None):
+        """[{'flight_id', 'path', 'start_utc', 'end_utc', 'min_distance_m'}, ...] within radius_m of a point."""
+        return spatial_index.near(self._connection(), lat, lon, radius_m, after, before)
+
+    def within_bbox(self, min_lat, min_lon, max_lat, max_lon, after=None, before=None):
+        return spatial_index.within_bbox(self._connection(), min_lat, min_lon, max_lat, max_lon, after, before)
+
+    def within_polygon(self, polygon, after=None, before=None):
+        """polygon: [(lat, lon), ...]"""
+        return spatial_index.within_polygon(self._connection(), polygon, after, before)
+
+    def prune(self):
+        """Drops entries whose log file no longer exists. Returns how many were removed."""
+        db = self._connection()
+        gone = [(row[0], row[1]) for row in db.execute('SELECT id, path FROM flights') if not Path(row[1]).is_file()]
+        spatial_index.delete(db, [flight_id for flight_id, _ in gone])
+        db.executemany('DELETE FROM flights WHERE id=?', [(flight_id,) for flight_id, _ in gone])
+        return len(gone)
+
+    def count(self):
+        return self._connection().execute('SELECT COUNT(*) FROM flights').fetchone()[0]
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+def default_catalog():
+    """The process-wide Catalog at CATALOG_PATH, or None when the catalog is disabled."""
+    global _catalog
+    if config.CATALOG_PATH is None:
+        return None
+    with _catalog_lock:
+        if _catalog is None or _catalog.path != str(config.CATALOG_PATH):
+            _catalog = Catalog()
+        return _catalog
@@ -0,0 +1,240 @@
+"""
+Growable typed column buffers used to build DataFrames straight
+from the parser, without a text round-trip.
+"""
+
+from operator import itemgetter
+import numpy as np
+import pandas as pd
+
+NUMERIC = 'numeric'
+INTEGER = 'integer'
+TEXT = 'text'
+
+def field_kind(field_type, array_length=0):
+    """
+    Maps a MAVLink field type (e.g. 'int32_t', 'char') to a column kind.
+    Non-char arrays are kept as Python objects alongside the text columns.
+    """
+    if field_type == 'char' or array_length:
+        return TEXT
+    if field_type in ('float', 'double'):
+        return NUMERIC
+    return INTEGER
+
+class ColumnStore:
+    """
+    Row-appendable column store.
+    Numeric columns live in one 2D float64 block that doubles when full
+    (NaN marks missing values); text columns are kept as Python lists.
+    """
+
+    def __init__(self, columns, kinds, capacity=4096):
+        self.columns = list(columns)
+        self.kinds = dict(kinds)
+        self.size = 0
+
+        self._numeric_names = [c for c in self.columns if self.kinds.get(c, NUMERIC) != TEXT]
+        self._text_names = [c for c in self.columns if self.kinds.get(c, NUMERIC) == TEXT]
+        index = {name: i for i, name in enumerate(self.columns)}
+        numeric_idx = [index[c] for c in self._numeric_names]
+        self._get_numeric = self._getter(numeric_idx)
+        self._text_idx = [index[c] for c in self._text_names]
+
+        self._block = np.empty((capacity, len(self._numeric_names)), dtype=np.float64)
+        self._text = [[] for _ in self._text_names]
+
+    @staticmethod
+    def _getter(indices):
+        if not indices:
+            return lambda row: ()
+        if len(indices) == 1:
+            i = indices[0]
+            return lambda row: (row[i],)
+        return itemgetter(*indices)
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self):
+        block = np.empty((max(2 * len(self._block), 1), self._block.shape[1]), dtype=np.float64)
+        block[:self.size] = self._block[:self.size]
+        self._block = block
+
+    def append_row(self, row):
+        if self.size == len(self._block):
+            self._grow()
+        self._block[self.size] = self._get_numeric(row)
+        for values, i in zip(self._text, self._text_idx):
+            values.append(row[i])
+        self.size += 1
+
+    def clear(self):
+        """Drops every row but keeps the numeric block, so a streaming writer can refill it."""
+        self.size = 0
+        self._text = [[] for _ in self._text_names]
+
+    def column(self, name, copy=True):
+        """
+        Returns the finished array for a single column.
+        copy=False returns a float64 view of the rows appended so far instead
+        (cheap snapshots of a store that is still growing).
+        """
+        if name in self._text_names:
+            return np.array(self._text[self._text_names.index(name)], dtype=object)
+        values = self._block[:self.size, self._numeric_names.index(name)]
+        if not copy:
+            return values
+        if self.kinds.get(name) == INTEGER and not np.isnan(values).any():
+            return values.astype(np.int64)
+        return values.copy()
+
+    def to_dataframe(self):
+        data = {}
+        for name in self.columns:
+            if name in self._text_names:
+                data[name] = self._text[self._text_names.index(name)]
+            else:
+                data[name] = self.column(name)
+        return pd.DataFrame(data, columns=self.columns)
+
+class TableBuilder:
+    """
+    Collects messages into one compact ColumnStore per message type.
+    Each message also records the index of the dense row it would have
+    landed on (one row per run of equal timestamps), so the wide view
+    can be rebuilt exactly on demand.
+    """
+
+    def __init__(self, fields, kinds):
+        self.fields = fields
+        self.stores = {}
+        for type_, field_list in fields.items():
+            columns = ['timestamp', '_row'] + list(field_list)
+            type_kinds = {attr: kinds.get(f'{type_}.{attr}', NUMERIC) for attr in field_list}
+            type_kinds.update(timestamp=NUMERIC, _row=INTEGER)
+            self.stores[type_] = ColumnStore(columns, type_kinds, capacity=256)
+        # A growable float64 buffer, so live snapshots can take a view instead of converting a list
+        self.rows = ColumnStore(['timestamp'], {'timestamp': NUMERIC}, capacity=4096)
+        self._last_timestamp = None
+
+    def append(self, type_, timestamp, values):
+        if timestamp != self._last_timestamp:
+            self.rows.append_row((timestamp,))
+            self._last_timestamp = timestamp
+        self.stores[type_].append_row([timestamp, len(self.rows) - 1, *values])
+
+    def finish(self, copy=True):
+        """copy=False snapshots the builder without copying numeric columns (live mode)."""
+        columns = {type_: {name: store.column(name, copy) for name in store.columns}
+                   for type_, store in self.stores.items()}
+        kinds = {type_: store.kinds for type_, store in self.stores.items()}
+        return MessageTables(self.fields, kinds, columns, self.rows.column('timestamp', copy))
+
+class MessageTables:
+    """
+    Sparse per-message-type telemetry.
+    tables['GLOBAL_POSITION_INT'] is a DataFrame with a 'timestamp' column
+    plus that type's fields; wide() builds the dense forward-filled frame
+    (the TlogParser.to_dataframe layout) only when asked for.
+    """
+
+    def __init__(self, fields, kinds, columns, row_timestamps):
+        self.fields = fields
+        self.kinds = kinds
+        self.columns = columns
+        self.row_timestamps = row_timestamps
+        self._frames = {}
+        self._wide = None
+
+    def __contains__(self, type_):
+        return type_ in self.columns and len(self.columns[type_]['timestamp']) > 0
+
+    def __getitem__(self, type_):
+        if type_ not in self._frames:
+            names = ['timestamp'] + list(self.fields[type_])
+            self._frames[type_] = pd.DataFrame({c: self.columns[type_][c] for c in names}, columns=names)
+        return self._frames[type_]
+
+    @classmethod
+    def concat(cls, parts):
+        """
+        Joins tables parsed from consecutive pieces of one log, in file order.
+        Row indices are shifted so the result matches a single serial parse,
+        including a timestamp run that straddles two pieces.
+        """
+        first = parts[0]
+        columns = {type_: {name: [] for name in cols} for type_, cols in first.columns.items()}
+        row_timestamps = []
+        row_offset = 0
+        last_timestamp = None
+        for part in parts:
+            if not len(part.row_timestamps):
+                continue
+            shift = row_offset
+            part_rows = part.row_timestamps
+            if last_timestamp is not None and part_rows[0] == last_timestamp:
+                shift -= 1
+                part_rows = part_rows[1:]
+            row_timestamps.append(part_rows)
+            for type_, cols in part.columns.items():
+                for name, values in cols.items():
+                    columns[type_][name].append(values + shift if name == '_row' else values)
+            row_offset = shift + len(part.row_timestamps)
+            last_timestamp = part.row_timestamps[-1]
+
+        merged = {}
+        for type_, cols in columns.items():
+            merged[type_] = {name: np.concatenate(chunks) if chunks else first.columns[type_][name]
+                             for name, chunks in cols.items()}
+        row_timestamps = np.concatenate(row_timestamps) if row_timestamps else first.row_timestamps
+        return cls(first.fields, first.kinds, merged, row_timestamps)
+
+    @property
+    def empty(self):
+        return not any(type_ in self for type_ in self.columns)
+
+    @property
+    def start_time(self):
+        return self.row_timestamps.min() if len(self.row_timestamps) else float('nan')
+
+    @property
+    def end_time(self):
+        return self.row_timestamps.max() if len(self.row_timestamps) else float('nan')
+
+    def message_count(self, type_=None):
+        if type_ is not None:
+            return len(self.columns[type_]['timestamp'])
+        return sum(len(cols['timestamp']) for cols in self.columns.values())
+
+    def wide(self):
+        """Dense view: one row per timestamp run, every field forward-filled."""
+        if self._wide is not None:
+            return self._wide
+
+        n = len(self.row_timestamps)
+        data = {'timestamp': self.row_timestamps.copy()}
+        for type_, field_list in self.fields.items():
+            cols = self.columns[type_]
+            pos = np.full(n, -1, dtype=np.int64)
+            if len(cols['_row']):
+                rows = cols['_row'].astype(np.int64)
+                last = np.r_[rows[1:] != rows[:-1], True]
+                pos[rows[last]] = np.flatnonzero(last)
+                pos = np.maximum.accumulate(pos)
+            have = pos >= 0
+            for attr in field_list:
+                values = cols[attr]
+                if self.kinds[type_][attr] == TEXT:
+                    out = np.full(n, np.nan, dtype=object)
+                    out[have] = values[pos[have]]
+                    data[f'{type_}.{attr}'] = list(out)
+                    continue
+                out = np.full(n, np.nan)
+                out[have] = values[pos[have]]
+                if self.kinds[type_][attr] == INTEGER and not np.isnan(out).any():
+                    out = out.astype(np.int64)
+                data[f'{type_}.{attr}'] = out
+
+        self._wide = pd.DataFrame(data)
+        return self._wide
@@ -0,0 +1,141 @@
+"""
+Streaming export of parsed telemetry to Parquet or Arrow IPC files.
+Messages go from the TlogParser generator into a ColumnStore of
+EXPORT_BATCH_ROWS rows; every time it fills up it is written out as one
+Parquet row group (or Arrow record batch) and cleared, so peak memory
+depends on the batch size, not on the size of the log.
+Layouts: 'wide' writes the dense forward-filled rows of
+TlogParser.process_log() to one file; 'tables' writes one file per
+message type, each with its own timestamp column, into a directory.
+"""
+
+import os
+from pathlib import Path
+import numpy as np
+from . import config
+from . import column_store
+from . import instrument
+from .column_store import INTEGER, TEXT
+from .log_converter import TlogParser
+
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+LAYOUTS = ('wide', 'tables')
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet/Arrow export needs pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+def _arrow_type(pa, kind):
+    return {TEXT: pa.string(), INTEGER: pa.int64()}.get(kind, pa.float64())
+
+def _text(value):
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return value if isinstance(value, str) else str(value)
+
+class _BatchWriter:
+    """Buffers rows in a ColumnStore and writes each full buffer as one row group / record batch."""
+
+    def __init__(self, pa, path, columns, kinds, fmt, batch_rows):
+        self.pa = pa
+        self.path = Path(path)
+        self.columns = columns
+        self.kinds = kinds
+        self.batch_rows = batch_rows
+        self.schema = pa.schema([(name, _arrow_type(pa, kinds.get(name))) for name in columns])
+        self.store = column_store.ColumnStore(columns, kinds, capacity=batch_rows)
+        self.rows = 0
+        if fmt == 'parquet':
+            self._writer = pa.parquet.ParquetWriter(self.path, self.schema, compression=config.PARQUET_COMPRESSION)
+        else:
+            self._writer = pa.ipc.new_file(self.path, self.schema)
+
+    def append_row(self, row):
+        self.store.append_row(row)
+        if len(self.store) >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        if not len(self.store):
+            return
+        pa = self.pa
+        arrays = []
+        for name, field in zip(self.columns, self.schema):
+            values = self.store.column(name, copy=False)
+            if field.type == pa.string():
+                arrays.append(pa.array([_text(v) for v in values], type=pa.string()))
+            elif field.type == pa.int64():
+                missing = np.isnan(values)
+                arrays.append(pa.array(np.where(missing, 0, values).astype(np.int64), mask=missing, type=pa.int64()))
+            else:
+                arrays.append(pa.array(values, type=pa.float64(), from_pandas=True))
+        # The arrays may share the store's block, so they are written before it is refilled
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self.rows += len(self.store)
+        self.store.clear()
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+def export(log_file, out, fmt='parquet', layout='wide', batch_rows=None, time_range=None,
+           dialect=config.DEFAULT_DIALECT):
+    """
+    Streams log_file into out: a file for the 'wide' layout, a directory
+    (created if needed) for 'tables'. time_range: (t0, t1) to export only
+    that window (see TlogParser). Returns {path: rows written}.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format {fmt!r}, expected one of {', '.join(FORMATS)}")
+    if layout not in LAYOUTS:
+        raise ValueError(f"unknown layout {layout!r}, expected one of {', '.join(LAYOUTS)}")
+    pa = _pyarrow()
+    batch_rows = batch_rows or config.EXPORT_BATCH_ROWS
+    parser = TlogParser(log_file, dialect, time_range=time_range)
+
+    with instrument.span('columnar_export', file=os.path.basename(str(log_file)), format=fmt, layout=layout) as s:
+        if layout == 'wide':
+            written = _export_wide(pa, parser, Path(out), fmt, batch_rows)
+        else:
+            written = _export_tables(pa, parser, Path(out), fmt, batch_rows)
+        s.rows = sum(written.values())
+        s.bytes = sum(os.path.getsize(path) for path in written)
+    return written
+
+def _export_wide(pa, parser, out, fmt, batch_rows):
+    kinds = parser.column_kinds()
+    kinds['timestamp'] = column_store.NUMERIC
+    writer = _BatchWriter(pa, out, parser.csv_fields, kinds, fmt, batch_rows)
+    try:
+        for row in parser.process_log():
+            writer.append_row(row)
+    finally:
+        writer.close()
+    return {str(out): writer.rows}
+
+def _export_tables(pa, parser, out, fmt, batch_rows):
+    out.mkdir(parents=True, exist_ok=True)
+    kinds = parser.column_kinds()
+    writers = {}
+    nan = float('nan')
+    try:
+        with parser as mavlink:
+            for msg in mavlink:
+                type_ = msg.get_type()
+                writer = writers.get(type_)
+                if writer is None:
+                    fields = parser.fields[type_]
+                    type_kinds = {attr: kinds.get(f'{type_}.{attr}', column_store.NUMERIC) for attr in fields}
+                    type_kinds['timestamp'] = column_store.NUMERIC
+                    writer = writers[type_] = _BatchWriter(pa, out / f'{type_}{FORMATS[fmt]}', ['timestamp'] + list(fields),
+                                                           type_kinds, fmt, batch_rows)
+                writer.append_row([getattr(msg, '_timestamp', 0.0), *(getattr(msg, attr, nan) for attr in parser.fields[type_])])
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return {str(writer.path): writer.rows for writer in writers.values()}
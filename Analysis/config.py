@@ -3,29 +3,153 @@ Configuration file for the BirdHunt forensic tool.
 Holds all constants, paths, and settings.
 """
 
+import os
 from pathlib import Path
 
-PLOT_DIR = Path('plots_temp') 
-
 DEFAULT_DIALECT = 'ardupilotmega'
 
+# Takeoff when altitude above home reaches ALT_THRESHOLD (m); landing once it
+# drops back to ALT_THRESHOLD - ALT_HYSTERESIS
 ALT_THRESHOLD = 5.0
+ALT_HYSTERESIS = 2.0
+
+# GPS_RAW_INT.fix_type counted as a GPS lock (3 = 3D fix)
+GPS_MIN_FIX_TYPE = 3
 
 FORENSIC_FIELDS = {
     "SYSTEM_TIME": ["time_unix_usec", "time_boot_ms"],
     "GLOBAL_POSITION_INT": ["time_boot_ms", "lat", "lon", "alt", "relative_alt", "vx", "vy", "vz", "hdg"],
-    "GPS_RAW_INT": ["time_usec", "lat", "lon", "alt", "vel", "cog"],
+    "GPS_RAW_INT": ["time_usec", "fix_type", "satellites_visible", "lat", "lon", "alt", "vel", "cog"],
     "HOME_POSITION": ["latitude", "longitude", "altitude"],
 
     "RC_CHANNELS": ["time_boot_ms", "chan1_raw", "chan2_raw", "chan3_raw", "chan4_raw"],
     "MISSION_ITEM_INT": ["seq", "frame", "command", "x", "y", "z"],
-    "HEARTBEAT": ["base_mode", "custom_mode", "system_status"],
+    "HEARTBEAT": ["type", "autopilot", "base_mode", "custom_mode", "system_status"],
     "ATTITUDE": ["time_boot_ms", "roll", "pitch", "yaw"],
     "VFR_HUD": ["groundspeed", "heading", "throttle", "alt", "climb"],
 
-    "STATUSTEXT": ["text"],
+    "STATUSTEXT": ["severity", "text"],
     "COMMAND_ACK": ["command", "result"],
 
     "PARAM_VALUE": ["param_id", "param_value"],
     "SIMSTATE": ["lat", "lng", "roll", "pitch", "yaw"]
-}
\ No newline at end of file
+}
+
+# ---- Parsing and the parsed-log cache ----
+
+# TlogParser reader: 'mmap' walks a memory-mapped file, 'stream' uses buffered reads
+READER_BACKEND = 'mmap'
+
+# Logs at least this big are parsed in a process pool, in ranges of PARSE_CHUNK_BYTES.
+# While chunks are running the progress callback (and so a cancel) is checked this often
+PARALLEL_PARSE_MIN_BYTES = 128 * 1024 * 1024
+PARSE_CHUNK_BYTES = 64 * 1024 * 1024
+PARSE_PROGRESS_POLL_SEC = 0.2
+
+# Spacing of the seek index entries used to parse only a time window of a log
+SEEK_INDEX_INTERVAL_SEC = 1.0
+
+# Parsed-log cache: bump CACHE_VERSION whenever parsing or analysis output changes
+CACHE_DIR = Path.home() / '.birdhunt' / 'cache'
+CACHE_MAX_BYTES = 2 * 1024 ** 3
+# Report images (renders/) and seek indexes (seek/) are evicted separately, each within its own cap
+CACHE_RENDER_MAX_BYTES = 512 * 1024 ** 2
+CACHE_SEEK_MAX_BYTES = 64 * 1024 ** 2
+CACHE_VERSION = 3
+
+# ---- Exports ----
+
+# Common time grid (see resample.py): default rate, per-series join method
+# ('previous', 'nearest' or 'linear') and how stale a sample may be before the grid shows a gap
+RESAMPLE_RATE_HZ = 10.0
+RESAMPLE_METHOD = 'previous'
+RESAMPLE_MAX_AGE_SEC = 1.0
+
+# Streaming Parquet/Arrow export (see columnar_export.py): rows buffered per
+# row group / record batch, which bounds its memory use, and the Parquet codec
+EXPORT_BATCH_ROWS = 65536
+PARQUET_COMPRESSION = 'zstd'
+
+# PDF export renders its images in parallel into a private scratch directory
+# created under EXPORT_SCRATCH_DIR (None = the system temp directory)
+EXPORT_SCRATCH_DIR = None
+EXPORT_RENDER_WORKERS = 3
+# Map image resolution in the PDF; part of the render cache key
+MAP_EXPORT_DPI = 100
+
+# Altitude/RC plot resolution in the PDF report; lines are decimated to this, not to the screen
+PDF_PLOT_DPI = 150
+
+# ---- Live mode and GUI ----
+
+# Live mode: GUI redraws per second, and how long the reader sleeps when no new data arrived
+LIVE_REDRAW_HZ = 2
+LIVE_POLL_SEC = 0.05
+# Live timeline: detectors rerun over only the new messages plus this many seconds before them
+LIVE_DETECT_CONTEXT_SEC = 30.0
+
+# GUI background jobs (loads, exports): worker threads, and how often the progress bar refreshes
+JOB_WORKERS = 2
+JOB_POLL_MS = 100
+
+# GUI console: print() output is queued and drained every CONSOLE_DRAIN_MS;
+# the tab keeps the last CONSOLE_MAX_LINES lines, the full text goes to a rotating file
+CONSOLE_DRAIN_MS = 100
+CONSOLE_MAX_LINES = 5000
+CONSOLE_LOG_PATH = Path.home() / '.birdhunt' / 'console.log'
+CONSOLE_LOG_MAX_BYTES = 5 * 1024 ** 2
+CONSOLE_LOG_BACKUPS = 3
+
+# ---- Map and tiles ----
+
+# Map view: simplified flight path may deviate from the track by up to this many screen pixels
+MAP_PATH_TOLERANCE_PX = 1.0
+
+# Map tiles for the GUI map and the PDF basemap, shared through one LRU-evicted store.
+# BIRDHUNT_OFFLINE=1 (or `--offline`) serves tiles only from the store.
+MAP_TILE_SERVER = "https://mt0.google.com/vt/lyrs=s&hl=en&x={x}&y={y}&z={z}&s=Ga"
+EXPORT_TILE_SERVER = "https://tile.openstreetmap.org/{z}/{x}/{y}.png"
+TILE_CACHE_PATH = Path.home() / '.birdhunt' / 'tiles.db'
+TILE_CACHE_MAX_BYTES = 1024 ** 3
+TILE_EVICT_EVERY = 256
+TILE_FETCH_TIMEOUT_SEC = 10
+TILES_OFFLINE = os.environ.get('BIRDHUNT_OFFLINE', '') not in ('', '0')
+# Approximate width in tile pixels of the basemap behind the exported flight path
+EXPORT_BASEMAP_PIXELS = 1024
+
+# ---- Flight catalog ----
+
+# Flight catalog filled in whenever a log is processed (None = no catalog)
+CATALOG_PATH = Path.home() / '.birdhunt' / 'catalog.db'
+# Track segments in the catalog's spatial index: simplified to within
+# SPATIAL_TOLERANCE_M, at most SPATIAL_MAX_SEGMENT_SEC long; query spans
+# of one flight closer than SPATIAL_MERGE_GAP_SEC are merged
+SPATIAL_TOLERANCE_M = 5.0
+SPATIAL_MAX_SEGMENT_SEC = 10.0
+SPATIAL_MERGE_GAP_SEC = 1.0
+
+# ---- Instrumentation and benchmarks ----
+
+# Pipeline spans (see instrument.py): JSON lines log (None = don't write one)
+# and how many recent spans the GUI performance panel keeps. Past
+# SPAN_LOG_MAX_BYTES the log is moved to '<name>.1' (replacing the previous
+# backup) and a new one is started (None = let it grow)
+SPAN_LOG_PATH = Path.home() / '.birdhunt' / 'spans.jsonl'
+SPAN_LOG_MAX_BYTES = 16 * 1024 ** 2
+SPAN_HISTORY = 500
+
+# Pipeline benchmark (python -m CLI bench): with --check a stage fails when it is more than
+# BENCH_THRESHOLD slower or larger than its baseline, ignoring changes below the floors.
+# Baselines only hold for the machine that recorded them, so they live outside the
+# repository and are keyed by host name
+BENCH_BASELINES = Path.home() / '.birdhunt' / 'bench_baselines.json'
+BENCH_THRESHOLD = 0.25
+BENCH_MIN_SECONDS = 0.05
+BENCH_MIN_MB = 5
+
+# `BirdHunt startup-bench` fails when the first window takes longer than this
+STARTUP_BUDGET_SEC = 2.5
+# Set in the GUI's environment by startup-bench: the app prints STARTUP_PROBE_MARKER
+# and the wall-clock time once its first window is drawn, then exits
+STARTUP_PROBE_ENV = 'BIRDHUNT_STARTUP_PROBE'
+STARTUP_PROBE_MARKER = 'BIRDHUNT_FIRST_WINDOW'
@@ -0,0 +1,47 @@
+"""
+Level-of-detail downsampling for line plots.
+minmax_indices() keeps, for every pixel-wide bucket of the visible x-range,
+the first, last, lowest and highest sample, so spikes survive decimation
+and the drawn line looks the same as the full-resolution one.
+"""
+
+import numpy as np
+
+def visible_slice(x, x0, x1):
+    """Index range covering [x0, x1] plus one sample either side, so lines reach the plot edges."""
+    lo = max(np.searchsorted(x, x0, side='left') - 1, 0)
+    hi = min(np.searchsorted(x, x1, side='right') + 1, len(x))
+    return lo, hi
+
+def minmax_indices(x, y, buckets, x0=None, x1=None):
+    """
+    Indices of the samples to draw for x (sorted) and y in [x0, x1] at a
+    width of `buckets` pixels. Returns every index in range when there are
+    no more than a few samples per bucket.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if not len(x):
+        return np.empty(0, dtype=np.int64)
+    x0 = x[0] if x0 is None else x0
+    x1 = x[-1] if x1 is None else x1
+    lo, hi = visible_slice(x, x0, x1)
+    buckets = max(int(buckets), 1)
+    if hi - lo <= 4 * buckets or x1 <= x0:
+        return np.arange(lo, hi)
+
+    xs, ys = x[lo:hi], y[lo:hi]
+    bucket = np.clip(((xs - x0) * (buckets / (x1 - x0))).astype(np.int64), -1, buckets)
+    starts = np.r_[0, np.flatnonzero(bucket[1:] != bucket[:-1]) + 1]
+    ends = np.r_[starts[1:] - 1, len(xs) - 1]
+    counts = ends - starts + 1
+
+    keep = [starts, ends]
+    with np.errstate(invalid='ignore'):
+        for reduce in (np.fmin, np.fmax):
+            extreme = np.repeat(reduce.reduceat(ys, starts), counts)
+            hits = np.flatnonzero(ys == extreme)
+            # First hit per bucket; buckets that are all NaN have none
+            _, first = np.unique(np.searchsorted(starts, hits, side='right'), return_index=True)
+            keep.append(hits[first])
+    return np.unique(np.concatenate(keep)) + lo
@@ -0,0 +1,218 @@
+"""
+Vectorized timeline event detectors.
+Each detector takes the parsed MessageTables and returns (times, labels):
+a float array of log timestamps and a matching list of event names.
+Detectors are registered with @detector and run by detect_events(),
+which converts every event time to UTC in a single pass.
+"""
+
+import numpy as np
+from pymavlink import mavutil
+from . import config
+
+DETECTORS = []
+
+MAV_TYPE_GCS = 6
+MAV_AUTOPILOT_INVALID = 8
+MAV_MODE_FLAG_SAFETY_ARMED = 128
+MAV_RESULT_ACCEPTED = 0
+MAV_RESULT_IN_PROGRESS = 5
+SEVERITY_NAMES = ['EMERGENCY', 'ALERT', 'CRITICAL', 'ERROR', 'WARNING', 'NOTICE', 'INFO', 'DEBUG']
+
+# SYSTEM_TIME.time_unix_usec below this (2001-09-09) means the vehicle had no GPS time
+MIN_VALID_UNIX_USEC = 1e15
+
+def detector(func):
+    DETECTORS.append(func)
+    return func
+
+def _no_events():
+    return np.empty(0), []
+
+def _column(tables, type_, field):
+    if type_ not in tables or field not in tables.columns[type_]:
+        return None
+    return tables.columns[type_][field]
+
+def _changes(values):
+    """Indices where a value differs from the one before it (the first sample excluded)."""
+    return np.flatnonzero(values[1:] != values[:-1]) + 1
+
+def _enum_name(enum, value):
+    entry = mavutil.mavlink.enums.get(enum, {}).get(int(value))
+    return entry.name if entry is not None else str(int(value))
+
+def _vehicle_heartbeats(tables):
+    """Mask of HEARTBEAT rows sent by the vehicle's autopilot (not GCS, camera, companion...)."""
+    ts = _column(tables, 'HEARTBEAT', 'timestamp')
+    if ts is None:
+        return None
+    mask = np.ones(len(ts), dtype=bool)
+    mav_type = _column(tables, 'HEARTBEAT', 'type')
+    autopilot = _column(tables, 'HEARTBEAT', 'autopilot')
+    if mav_type is not None:
+        mask &= mav_type != MAV_TYPE_GCS
+    if autopilot is not None:
+        mask &= autopilot != MAV_AUTOPILOT_INVALID
+    return mask
+
+def hysteresis_state(values, high, low):
+    """
+    Two-threshold state: True once values reach high, False once they drop
+    to low, unchanged in between. Starts False (on the ground).
+    """
+    decided = np.flatnonzero((values >= high) | (values <= low))
+    held = np.full(len(values), -1, dtype=np.int64)
+    held[decided] = decided
+    held = np.maximum.accumulate(held) if len(held) else held
+    state = np.zeros(len(values), dtype=bool)
+    known = held >= 0
+    state[known] = values[held[known]] >= high
+    return state
+
+@detector
+def log_bounds(tables):
+    if not len(tables.row_timestamps):
+        return _no_events()
+    return np.array([tables.row_timestamps[0], tables.row_timestamps[-1]]), ['Log Start', 'Log End']
+
+@detector
+def flight_cycles(tables):
+    """Every takeoff/landing pair, using altitude above home with hysteresis."""
+    ts = _column(tables, 'GLOBAL_POSITION_INT', 'timestamp')
+    if ts is None:
+        return _no_events()
+    rel = _column(tables, 'GLOBAL_POSITION_INT', 'relative_alt')
+    # MAVLink sends both altitudes in millimetres
+    alt = (rel if rel is not None else _column(tables, 'GLOBAL_POSITION_INT', 'alt')) / 1000.0
+    valid = ~np.isnan(alt)
+    ts, alt = ts[valid], alt[valid]
+    airborne = hysteresis_state(alt, config.ALT_THRESHOLD, config.ALT_THRESHOLD - config.ALT_HYSTERESIS)
+    edges = _changes(airborne)
+    labels = ['Takeoff' if airborne[i] else 'Landing' for i in edges]
+    if len(airborne) and airborne[0]:
+        edges = np.r_[0, edges]
+        labels.insert(0, 'Airborne at Log Start')
+    return ts[edges], labels
+
+@detector
+def mode_changes(tables):
+    vehicle = _vehicle_heartbeats(tables)
+    if vehicle is None:
+        return _no_events()
+    ts = tables.columns['HEARTBEAT']['timestamp'][vehicle]
+    modes = tables.columns['HEARTBEAT']['custom_mode'][vehicle]
+    mav_type = _column(tables, 'HEARTBEAT', 'type')
+    mav_type = mav_type[vehicle] if mav_type is not None else None
+    edges = _changes(modes)
+    if len(modes):
+        edges = np.r_[0, edges]
+    labels = []
+    for i in edges:
+        names = mavutil.mode_mapping_bynumber(int(mav_type[i])) if mav_type is not None else None
+        mode = int(modes[i])
+        labels.append(f"Mode: {names[mode]}" if names and mode in names else f"Mode: {mode}")
+    return ts[edges], labels
+
+@detector
+def arming(tables):
+    vehicle = _vehicle_heartbeats(tables)
+    if vehicle is None:
+        return _no_events()
+    ts = tables.columns['HEARTBEAT']['timestamp'][vehicle]
+    armed = (tables.columns['HEARTBEAT']['base_mode'][vehicle].astype(np.int64) & MAV_MODE_FLAG_SAFETY_ARMED) != 0
+    edges = _changes(armed)
+    if len(armed) and armed[0]:
+        edges = np.r_[0, edges]
+    return ts[edges], ['Armed' if armed[i] else 'Disarmed' for i in edges]
+
+@detector
+def gps_fix(tables):
+    """GPS lock/loss from GPS_RAW_INT fix_type, or first position fix as a fallback."""
+    fix = _column(tables, 'GPS_RAW_INT', 'fix_type')
+    if fix is not None:
+        ts = tables.columns['GPS_RAW_INT']['timestamp']
+        locked = fix >= config.GPS_MIN_FIX_TYPE
+        edges = _changes(locked)
+        if len(locked) and locked[0]:
+            edges = np.r_[0, edges]
+        return ts[edges], ['GPS Lock' if locked[i] else 'GPS Lost' for i in edges]
+
+    lat = _column(tables, 'GLOBAL_POSITION_INT', 'lat')
+    if lat is None:
+        return _no_events()
+    first = np.flatnonzero(~np.isnan(lat) & (lat != 0))[:1]
+    return tables.columns['GLOBAL_POSITION_INT']['timestamp'][first], ['GPS Lock'] * len(first)
+
+@detector
+def status_text(tables):
+    text = _column(tables, 'STATUSTEXT', 'text')
+    if text is None:
+        return _no_events()
+    ts = tables.columns['STATUSTEXT']['timestamp']
+    severity = _column(tables, 'STATUSTEXT', 'severity')
+    labels = []
+    for i, message in enumerate(text):
+        level = SEVERITY_NAMES[int(severity[i])] if severity is not None and 0 <= severity[i] < 8 else 'TEXT'
+        labels.append(f"[{level}] {message}")
+    return ts, labels
+
+@detector
+def command_failures(tables):
+    result = _column(tables, 'COMMAND_ACK', 'result')
+    if result is None:
+        return _no_events()
+    failed = np.flatnonzero((result != MAV_RESULT_ACCEPTED) & (result != MAV_RESULT_IN_PROGRESS))
+    commands = tables.columns['COMMAND_ACK']['command'][failed]
+    labels = [f"Command {_enum_name('MAV_CMD', c)} failed: {_enum_name('MAV_RESULT', r)}"
+              for c, r in zip(commands, result[failed])]
+    return tables.columns['COMMAND_ACK']['timestamp'][failed], labels
+
+def utc_offset(tables):
+    """
+    Seconds to add to a log timestamp to get UNIX time, from the first valid
+    SYSTEM_TIME sample. Falls back to the tlog's own timestamps (already UNIX
+    time from the recording station) and returns None if those are not
+    plausible either.
+    """
+    unix_usec = _column(tables, 'SYSTEM_TIME', 'time_unix_usec')
+    if unix_usec is not None:
+        valid = np.flatnonzero(unix_usec >= MIN_VALID_UNIX_USEC)
+        if valid.size:
+            i = valid[0]
+            return unix_usec[i] / 1e6 - tables.columns['SYSTEM_TIME']['timestamp'][i]
+    if len(tables.row_timestamps) and tables.row_timestamps[0] * 1e6 >= MIN_VALID_UNIX_USEC:
+        return 0.0
+    return None
+
+def to_utc_strings(times, offset):
+    """HH:MM:SS (UTC) for an array of log timestamps."""
+    if offset is None:
+        return ["N/A (No GPS Time)"] * len(times)
+    stamps = np.round((np.asarray(times, dtype=np.float64) + offset) * 1e6).astype('datetime64[us]')
+    return [s[11:19] for s in np.datetime_as_string(stamps, unit='s')]
+
+def find_events(tables, detectors=None):
+    """(times, labels) of every detector's events, sorted by time."""
+    times, labels = [], []
+    for func in detectors or DETECTORS:
+        event_times, event_labels = func(tables)
+        times.append(np.asarray(event_times, dtype=np.float64))
+        labels.extend(event_labels)
+    times = np.concatenate(times) if times else np.empty(0)
+    order = np.argsort(times, kind='stable')
+    return times[order], [labels[i] for i in order]
+
+def timeline_rows(times, labels, offset):
+    """Timeline entries as shown in the GUI and the report."""
+    real_times = to_utc_strings(times, offset)
+    return [{'Event': label, 'Time (s)': f"{t:.1f}", 'Real Time (UTC)': real}
+            for label, t, real in zip(labels, times, real_times)]
+
+def detect_events(tables, detectors=None):
+    """Runs every detector and returns the timeline sorted by time."""
+    times, labels = find_events(tables, detectors)
+    offset = utc_offset(tables)
+    if offset is None:
+        print("Warning: No SYSTEM_TIME found. Timeline will be relative.")
+    return timeline_rows(times, labels, offset)
@@ -0,0 +1,129 @@
+"""
+Flight path extraction and simplification for the map view.
+Positions are projected to Web Mercator "world pixels" (256 px wide at
+zoom 0), so a tolerance in screen pixels at zoom z is tolerance / 2**z.
+"""
+
+import numpy as np
+from . import config
+from . import geodesy
+
+TILE_SIZE = 256
+
+def extract_track(tables, vehicle_time=False):
+    """
+    (time, lat, lon) arrays from GLOBAL_POSITION_INT, degrees, without missing
+    or zero fixes. Time is the log timestamp, or with vehicle_time the
+    autopilot's time_boot_ms in seconds (free of receive jitter) when logged.
+    """
+    if 'GLOBAL_POSITION_INT' not in tables:
+        return np.empty(0), np.empty(0), np.empty(0)
+    cols = tables.columns['GLOBAL_POSITION_INT']
+    lat = np.asarray(cols['lat'], dtype=np.float64) / 1e7
+    lon = np.asarray(cols['lon'], dtype=np.float64) / 1e7
+    valid = ~np.isnan(lat) & ~np.isnan(lon) & (lat != 0) & (lon != 0)
+    t = cols['timestamp']
+    if vehicle_time and 'time_boot_ms' in cols:
+        t = np.asarray(cols['time_boot_ms'], dtype=np.float64) / 1000.0
+    return t[valid], lat[valid], lon[valid]
+
+def extract_path(tables):
+    """(lat, lon) arrays in degrees, as extract_track without the timestamps."""
+    return extract_track(tables)[1:]
+
+def to_world_pixels(lat, lon):
+    x, y = geodesy.web_mercator(lat, lon)
+    scale = TILE_SIZE / (2 * np.pi * geodesy.EARTH_RADIUS_M)
+    return x * scale + TILE_SIZE / 2, TILE_SIZE / 2 - y * scale
+
+def bounds(lat, lon):
+    """(min_lat, min_lon, max_lat, max_lon) in one reduction over the stacked coordinates."""
+    coords = np.column_stack([lat, lon])
+    (min_lat, min_lon), (max_lat, max_lon) = coords.min(axis=0), coords.max(axis=0)
+    return min_lat, min_lon, max_lat, max_lon
+
+def zoom_for_bounds(box, width_px, height_px, max_zoom=22, padding=1.2):
+    """Largest integer zoom at which the bounding box (plus padding) fits in the view."""
+    min_lat, min_lon, max_lat, max_lon = box
+    x, y = to_world_pixels(np.array([max_lat, min_lat]), np.array([min_lon, max_lon]))
+    span_x = (x[1] - x[0]) * padding
+    span_y = (y[1] - y[0]) * padding
+    zooms = [max_zoom]
+    if span_x > 0:
+        zooms.append(np.log2(width_px / span_x))
+    if span_y > 0:
+        zooms.append(np.log2(height_px / span_y))
+    return int(np.clip(np.floor(min(zooms)), 0, max_zoom))
+
+def dp_significance(x, y):
+    """
+    Douglas-Peucker split distance of every point, computed level by level
+    with every open segment handled in one vectorized pass. The points kept
+    by Douglas-Peucker at tolerance t are exactly those with significance > t,
+    so any tolerance can be applied later with a single comparison.
+    """
+    n = len(x)
+    significance = np.zeros(n)
+    significance[[0, -1]] = np.inf
+    if n <= 2:
+        return significance
+
+    starts = np.array([0])
+    ends = np.array([n - 1])
+    parent = np.array([np.inf])
+    while len(starts):
+        lengths = ends - starts - 1
+        open_ = lengths > 0
+        starts, ends, parent, lengths = starts[open_], ends[open_], parent[open_], lengths[open_]
+        if not len(starts):
+            break
+        offsets = np.cumsum(lengths) - lengths
+        seg = np.repeat(np.arange(len(starts)), lengths)
+        idx = np.arange(lengths.sum()) - offsets[seg] + starts[seg] + 1
+
+        x0, y0 = x[starts][seg], y[starts][seg]
+        dx, dy = x[ends][seg] - x0, y[ends][seg] - y0
+        px, py = x[idx] - x0, y[idx] - y0
+        norm = np.hypot(dx, dy)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            dist = np.where(norm > 0, np.abs(dx * py - dy * px) / norm, np.hypot(px, py))
+
+        dmax = np.maximum.reduceat(dist, offsets)
+        hits = np.flatnonzero(dist == dmax[seg])
+        _, first = np.unique(seg[hits], return_index=True)
+        split = idx[hits[first]]
+        # A point is only reached if its parent segment was split, hence the min
+        level = np.minimum(dmax, parent)
+        significance[split] = level
+
+        starts, ends = np.r_[starts, split], np.r_[split, ends]
+        parent = np.r_[level, level]
+    return significance
+
+class FlightPath:
+    """A track with its Douglas-Peucker significance, simplified on demand per zoom level."""
+
+    def __init__(self, lat, lon):
+        self.lat = lat
+        self.lon = lon
+        self.significance = dp_significance(*to_world_pixels(lat, lon))
+        self._by_zoom = {}
+
+    @classmethod
+    def from_tables(cls, tables):
+        return cls(*extract_path(tables))
+
+    def __len__(self):
+        return len(self.lat)
+
+    def bounds(self):
+        return bounds(self.lat, self.lon)
+
+    def for_zoom(self, zoom, tolerance_px=None):
+        """Simplified [(lat, lon), ...] that deviates from the track by less than tolerance_px at zoom."""
+        tolerance_px = config.MAP_PATH_TOLERANCE_PX if tolerance_px is None else tolerance_px
+        zoom = int(round(zoom))
+        if zoom not in self._by_zoom:
+            keep = self.significance > tolerance_px / 2 ** zoom
+            self._by_zoom[zoom] = list(zip(self.lat[keep].tolist(), self.lon[keep].tolist()))
+        return self._by_zoom[zoom]
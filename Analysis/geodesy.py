@@ -0,0 +1,45 @@
+"""
+Small vectorized geodesy helpers for flight tracks (degrees in, metres out).
+Spherical Earth with the WGS84 equatorial radius, as Web Mercator uses.
+"""
+
+import numpy as np
+
+EARTH_RADIUS_M = 6378137.0
+MAX_MERCATOR_LAT = 85.05112878
+
+def web_mercator(lat, lon):
+    """EPSG:3857 (x, y) in metres."""
+    lat = np.clip(np.asarray(lat, dtype=np.float64), -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT)
+    x = EARTH_RADIUS_M * np.radians(lon)
+    y = EARTH_RADIUS_M * np.log(np.tan(np.pi / 4 + np.radians(lat) / 2))
+    return x, y
+
+def inverse_web_mercator(x, y):
+    """EPSG:3857 metres back to (lat, lon) in degrees."""
+    lon = np.degrees(np.asarray(x, dtype=np.float64) / EARTH_RADIUS_M)
+    lat = np.degrees(2 * np.arctan(np.exp(np.asarray(y, dtype=np.float64) / EARTH_RADIUS_M)) - np.pi / 2)
+    return lat, lon
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Great-circle distance in metres, element-wise."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def segment_lengths(lat, lon):
+    """Distance between consecutive fixes (len - 1 values)."""
+    return haversine(lat[:-1], lon[:-1], lat[1:], lon[1:])
+
+def ground_speed(t, lat, lon):
+    """
+    Speed over each segment between consecutive fixes (len - 1 values, m/s).
+    Segments without a positive time step are NaN.
+    """
+    dt = np.diff(np.asarray(t, dtype=np.float64))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(dt > 0, segment_lengths(lat, lon) / dt, np.nan)
+
+def distance_from(lat, lon, ref_lat, ref_lon):
+    """Distance of every fix from one reference point (e.g. HOME_POSITION)."""
+    return haversine(lat, lon, ref_lat, ref_lon)
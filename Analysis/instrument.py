@@ -0,0 +1,194 @@
+"""
+Span-based instrumentation for the analysis pipeline.
+Wrap a stage in `with instrument.span('parse', file=name) as s:` (or
+decorate it with @instrument.traced('timeline')) and set s.rows / s.bytes
+to what it processed. Each finished span records wall time, process CPU
+time and how far it raised the process's peak resident memory, is kept
+in memory for the GUI performance panel and is appended as one JSON line
+to SPAN_LOG_PATH so production runs can be compared over time. The log is
+rotated past SPAN_LOG_MAX_BYTES, keeping one '.1' backup.
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from . import config
+
+RUN_ID = uuid.uuid4().hex[:12]
+
+_recent = deque(maxlen=config.SPAN_HISTORY)
+_lock = threading.Lock()
+_local = threading.local()
+
+def peak_rss_bytes():
+    """High-water mark of the process's resident memory, or None where it can't be read."""
+    try:
+        import resource
+    except ImportError:
+        return _peak_rss_windows()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def _peak_rss_windows():
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None
+        return counters.PeakWorkingSetSize
+    except Exception:
+        return None
+
+class Span:
+    """One timed stage. rows/bytes and any attrs given at creation end up in the record."""
+
+    def __init__(self, name, parent=None, **attrs):
+        self.name = name
+        self.parent = parent
+        self.attrs = attrs
+        self.rows = None
+        self.bytes = None
+        self.record = None
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        if self.parent is None and stack:
+            self.parent = stack[-1].name
+        stack.append(self)
+        self._peak = peak_rss_bytes()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        peak = peak_rss_bytes()
+        _local.stack.remove(self)
+        self.record = {
+            'time': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'run': RUN_ID,
+            'pid': os.getpid(),
+            'span': self.name,
+            'parent': self.parent,
+            'wall_s': round(wall, 6),
+            'cpu_s': round(cpu, 6),
+            'peak_rss_delta_mb': None if peak is None or self._peak is None
+                                 else round((peak - self._peak) / 1024 ** 2, 3),
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'ok': exc_type is None,
+        }
+        self.record.update({key: _jsonable(value) for key, value in self.attrs.items()})
+        _finish(self.record)
+        return False
+
+    @property
+    def wall(self):
+        return self.record['wall_s'] if self.record else None
+
+def span(name, parent=None, **attrs):
+    return Span(name, parent, **attrs)
+
+def current():
+    """Innermost open span on this thread, or None."""
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else None
+
+def traced(name):
+    """Decorator form of span() for stages that don't report rows or bytes."""
+    def wrap(func):
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return inner
+    return wrap
+
+def _jsonable(value):
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    try:
+        return value.item()
+    except AttributeError:
+        return str(value)
+
+def _finish(record):
+    with _lock:
+        _recent.append(record)
+        path = config.SPAN_LOG_PATH
+        if path is None:
+            return
+        line = json.dumps(record) + '\n'
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _rotate(path, len(line))
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(line)
+        except OSError:
+            pass
+
+def _backup_path(path):
+    return path.with_name(path.name + '.1')
+
+def _rotate(path, incoming):
+    """Moves the log to its '.1' backup when `incoming` more bytes would take it past SPAN_LOG_MAX_BYTES."""
+    limit = config.SPAN_LOG_MAX_BYTES
+    if limit is None:
+        return
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return
+    if size and size + incoming > limit:
+        # Another process may have rotated it first; then there is nothing left to move
+        try:
+            os.replace(path, _backup_path(path))
+        except FileNotFoundError:
+            pass
+
+def recent(limit=None):
+    """Finished spans of this process, oldest first."""
+    with _lock:
+        records = list(_recent)
+    return records[-limit:] if limit else records
+
+def read_log(path=None):
+    """
+    Every span record in a JSON lines file (default SPAN_LOG_PATH) and its
+    '.1' backup, oldest first, skipping damaged lines.
+    """
+    path = Path(path or config.SPAN_LOG_PATH)
+    records = []
+    for name in (_backup_path(path), path):
+        try:
+            with open(name, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+    return records
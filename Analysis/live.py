@@ -0,0 +1,304 @@
+"""
+Live tail mode: follows a .tlog that is still being written, or a MAVLink
+stream on a UDP port, and keeps the message tables growing from only the
+new frames. Snapshots give the GUI tables, stats and timeline to redraw.
+"""
+
+import queue
+import socket
+import struct
+import threading
+import time
+import numpy as np
+from pymavlink import mavutil
+from . import config
+from . import column_store
+from . import log_converter
+from . import tlog_scanner
+from . import analysis
+from . import detectors
+from . import flight_path
+from . import geodesy
+
+class TlogFollower:
+    """Reads the bytes appended to a .tlog since the last poll and decodes the complete records."""
+
+    def __init__(self, log_file, msgids, from_start=True):
+        self.log_file = str(log_file)
+        self.scanner = tlog_scanner.TlogScanner(self.log_file, mavutil.mavlink.MAVLink(None), msgids)
+        self._file = open(self.log_file, 'rb')
+        if not from_start:
+            self._file.seek(0, 2)
+        self._pending = b''
+
+    def read(self):
+        chunk = self._file.read()
+        if not chunk:
+            return []
+        self._pending += chunk
+        messages = []
+        walk = self.scanner.walk(self._pending, 0, len(self._pending), final=False)
+        while True:
+            try:
+                messages.append(next(walk))
+            except StopIteration as done:
+                consumed = done.value
+                break
+        self._pending = self._pending[consumed:]
+        return messages
+
+    def close(self):
+        self._file.close()
+
+class UdpSource:
+    """
+    Decodes MAVLink datagrams arriving on a local UDP port. Messages are
+    stamped with the receive time; record_to optionally saves the stream
+    as a .tlog so it can be analyzed again after the flight.
+    """
+
+    def __init__(self, port, type_set, host='0.0.0.0', record_to=None):
+        self.type_set = type_set
+        self.mav = mavutil.mavlink.MAVLink(None)
+        self.mav.robust_parsing = True
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+        self._record = open(record_to, 'ab') if record_to else None
+
+    def read(self):
+        messages = []
+        while True:
+            try:
+                data, _ = self.sock.recvfrom(65535)
+            except (BlockingIOError, InterruptedError):
+                break
+            now = time.time()
+            for msg in self.mav.parse_buffer(data) or []:
+                if self._record is not None:
+                    self._record.write(struct.pack('>Q', int(now * 1e6)) + msg.get_msgbuf())
+                if msg.get_type() in self.type_set:
+                    msg._timestamp = now
+                    messages.append(msg)
+        return messages
+
+    def close(self):
+        self.sock.close()
+        if self._record is not None:
+            self._record.close()
+
+class LiveAnalyzer:
+    """
+    Keeps the summary stats and the timeline of a growing TableBuilder
+    up to date from only the messages added since the last update.
+    Detectors rerun over the new messages plus LIVE_DETECT_CONTEXT_SEC
+    before them (so edges and hysteresis have their earlier samples), and
+    only events after the previous update's last timestamp are kept.
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.detectors = [func for func in detectors.DETECTORS if func is not detectors.log_bounds]
+        self.seen = {type_: 0 for type_ in fields}
+        self.rows_seen = 0
+        self.watermark = -np.inf
+        self.event_times = []
+        self.event_labels = []
+        self.timeline = []
+        self.offset = None
+        self.start_time = np.inf
+        self.end_time = -np.inf
+        self.home = None
+        self.home_from_log = False
+        self.last_fix = None
+        self.distance = 0.0
+        self.max_range = 0.0
+        self.max_speed = 0.0
+
+    def update(self, tables):
+        """Folds the messages added to tables since the last call into the stats and timeline."""
+        new_rows = tables.row_timestamps[self.rows_seen:]
+        if not len(new_rows):
+            return
+        self.rows_seen = len(tables.row_timestamps)
+        self.start_time = min(self.start_time, float(new_rows.min()))
+        self.end_time = max(self.end_time, float(new_rows.max()))
+        self._update_track(tables)
+        self._update_events(tables)
+        self.seen = {type_: len(cols['timestamp']) for type_, cols in tables.columns.items()}
+        self.watermark = self.end_time
+
+    def _tail(self, tables, starts):
+        columns = {type_: {name: values[starts[type_]:] for name, values in cols.items()}
+                   for type_, cols in tables.columns.items()}
+        return column_store.MessageTables(self.fields, tables.kinds, columns, tables.row_timestamps)
+
+    def _update_track(self, tables):
+        if 'GLOBAL_POSITION_INT' not in tables:
+            return
+        if not self.home_from_log and 'HOME_POSITION' in tables:
+            home = tables.columns['HOME_POSITION']
+            valid = np.flatnonzero((home['latitude'] != 0) | (home['longitude'] != 0))
+            if valid.size:
+                self.home = home['latitude'][valid[0]] / 1e7, home['longitude'][valid[0]] / 1e7
+                self.home_from_log = True
+                # Ranges so far were measured from the first fix; once per session, measure them again
+                _, lat, lon = flight_path.extract_track(tables)
+                self.max_range = float(geodesy.distance_from(lat, lon, *self.home).max()) if len(lat) else 0.0
+
+        starts = dict(self.seen)
+        t, lat, lon = flight_path.extract_track(self._tail(tables, starts), vehicle_time=True)
+        if not len(lat):
+            return
+        if self.home is None:
+            self.home = lat[0], lon[0]
+        self.max_range = max(self.max_range, float(geodesy.distance_from(lat, lon, *self.home).max()))
+        if self.last_fix is not None:
+            t, lat, lon = (np.r_[prev, new] for prev, new in zip(self.last_fix, (t, lat, lon)))
+        self.last_fix = t[-1], lat[-1], lon[-1]
+        if len(lat) < 2:
+            return
+        self.distance += float(geodesy.segment_lengths(lat, lon).sum())
+        speed = geodesy.ground_speed(t, lat, lon)
+        if not np.isnan(speed).all():
+            self.max_speed = max(self.max_speed, float(np.nanmax(speed)))
+
+    def _update_events(self, tables):
+        if self.offset is None:
+            self.offset = detectors.utc_offset(tables)
+            if self.offset is not None and self.timeline:
+                # Clock found after the first events: give the earlier ones their UTC times too
+                self.timeline = detectors.timeline_rows(self.event_times, self.event_labels, self.offset)
+        if not self.timeline:
+            self._add_events(np.array([self.start_time]), ['Log Start'])
+
+        starts = {}
+        for type_, cols in tables.columns.items():
+            ts = cols['timestamp']
+            context = np.searchsorted(ts[:self.seen[type_]], self.watermark - config.LIVE_DETECT_CONTEXT_SEC)
+            starts[type_] = max(min(context, self.seen[type_] - 1), 0)
+        times, labels = detectors.find_events(self._tail(tables, starts), self.detectors)
+        new = times > self.watermark
+        self._add_events(times[new], [label for label, keep in zip(labels, new) if keep])
+
+    def _add_events(self, times, labels):
+        self.event_times.extend(times.tolist())
+        self.event_labels.extend(labels)
+        self.timeline.extend(detectors.timeline_rows(times, labels, self.offset))
+
+    def stats(self):
+        """Same keys as analysis.calculate_summary_stats."""
+        return {'start_time': self.start_time, 'end_time': self.end_time,
+                'duration_sec': self.end_time - self.start_time, 'total_distance_m': self.distance,
+                'max_range_m': self.max_range, 'max_speed_mps': self.max_speed}
+
+    def timeline_with_end(self):
+        """The events so far followed by a 'Log End' at the latest timestamp."""
+        return self.timeline + detectors.timeline_rows(np.array([self.end_time]), ['Log End'], self.offset)
+
+class LiveSession:
+    """
+    Appends messages from a source into one TableBuilder on a worker thread.
+    At most LIVE_REDRAW_HZ times a second that thread also folds the new
+    messages into a LiveAnalyzer and queues a ready (tables, stats, timeline)
+    snapshot; the GUI only takes the newest one from latest(), so a redraw
+    never reruns the analysis over the whole session.
+    """
+
+    def __init__(self, source, fields=None):
+        self.fields = fields or config.FORENSIC_FIELDS
+        self.source = source
+        self.builder = column_store.TableBuilder(self.fields, log_converter.column_kinds(self.fields))
+        self.analyzer = LiveAnalyzer(self.fields)
+        self.lock = threading.Lock()
+        self.messages = 0
+        self.snapshots = queue.Queue(maxsize=1)
+        self._analyzed = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def follow_tlog(cls, log_file, dialect=config.DEFAULT_DIALECT, from_start=True):
+        mavutil.set_dialect(dialect)
+        msgids = log_converter.wanted_msgids(set(config.FORENSIC_FIELDS))
+        return cls(TlogFollower(log_file, msgids, from_start))
+
+    @classmethod
+    def listen_udp(cls, port, host='0.0.0.0', dialect=config.DEFAULT_DIALECT, record_to=None):
+        mavutil.set_dialect(dialect)
+        return cls(UdpSource(port, set(config.FORENSIC_FIELDS), host, record_to))
+
+    def poll(self):
+        """Reads whatever the source has now. Returns the number of new messages."""
+        messages = self.source.read()
+        if not messages:
+            return 0
+        nan = float('nan')
+        with self.lock:
+            for msg in messages:
+                type_ = msg.get_type()
+                values = [getattr(msg, attr, nan) for attr in self.fields[type_]]
+                self.builder.append(type_, msg._timestamp, values)
+            self.messages += len(messages)
+        return len(messages)
+
+    def publish(self):
+        """Worker thread: analyzes the messages since the last call and queues the snapshot."""
+        if self.messages == self._analyzed:
+            return
+        with self.lock:
+            tables = self.builder.finish(copy=False)
+            self._analyzed = self.messages
+        self.analyzer.update(tables)
+        snapshot = (tables, self.analyzer.stats(), self.analyzer.timeline_with_end())
+        try:
+            self.snapshots.get_nowait()
+        except queue.Empty:
+            pass
+        self.snapshots.put_nowait(snapshot)
+
+    def latest(self):
+        """GUI thread: the newest queued snapshot, or None if nothing changed since the last call."""
+        try:
+            return self.snapshots.get_nowait()
+        except queue.Empty:
+            return None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        interval = 1.0 / config.LIVE_REDRAW_HZ
+        next_publish = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                new = self.poll()
+                if time.monotonic() >= next_publish:
+                    self.publish()
+                    next_publish = time.monotonic() + interval
+            except Exception as e:
+                print(f"Live source error: {e}")
+                break
+            if not new:
+                self._stop.wait(config.LIVE_POLL_SEC)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.source.close()
+
+    def snapshot(self):
+        """
+        Returns (tables, stats, timeline) for everything received so far, or
+        None if nothing yet, analyzing the whole session from scratch (used
+        once live mode stops, so the final result matches a normal load).
+        """
+        with self.lock:
+            if not self.messages:
+                return None
+            tables = self.builder.finish()
+        return tables, analysis.calculate_summary_stats(tables), analysis.calculate_timeline_events(tables)
@@ -2,16 +2,70 @@
 Handles the parsing of MAVLink .tlog files.
 """
 
-import csv
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pymavlink import mavutil
 from . import config
+from . import column_store
+from . import tlog_scanner
+from . import instrument
+from . import seek_index
+
+def message_definitions():
+    """Message classes of the active dialect, keyed by message name."""
+    return {cls.msgname: cls for cls in mavutil.mavlink.mavlink_map.values()}
+
+def wanted_msgids(type_set):
+    return [cls.id for name, cls in message_definitions().items() if name in type_set]
+
+def column_kinds(fields):
+    """Column kinds for 'TYPE.field' columns, taken from the dialect's message definitions."""
+    definitions = message_definitions()
+    kinds = {'timestamp': column_store.NUMERIC}
+    for type_, field_list in fields.items():
+        cls = definitions.get(type_)
+        for attr in field_list:
+            kind = column_store.NUMERIC
+            if cls is not None and attr in cls.fieldnames:
+                i = cls.fieldnames.index(attr)
+                kind = column_store.field_kind(cls.fieldtypes[i], cls.array_lengths[i])
+            kinds[f'{type_}.{attr}'] = kind
+    return kinds
+
+# How often (in decoded messages) a serial parse reports its progress
+PROGRESS_EVERY_MESSAGES = 4096
 
 class TlogParser:
-    def __init__(self, log_file, dialect=config.DEFAULT_DIALECT):
+    def __init__(self, log_file, dialect=config.DEFAULT_DIALECT, prefilter=True, byte_range=None,
+                 backend=config.READER_BACKEND, time_range=None):
+        """
+        prefilter: walk raw frame headers and only decode the message
+        types in FORENSIC_FIELDS, instead of letting pymavlink decode every frame.
+        byte_range: (start, stop) to parse only the records starting in that
+        part of the file (requires prefilter).
+        backend: 'mmap' (zero-copy, default) or 'stream' reader for the prefilter scanner.
+        time_range: (t0, t1) log timestamps (either may be None) to keep only
+        the messages in that window. With prefilter, the log's seek index
+        narrows byte_range to the window so the rest is never read.
+        """
         self.log_file = str(log_file)
-        self.mlog = mavutil.mavlink_connection(self.log_file, dialect=dialect)
+        self.dialect = dialect
+        self.prefilter = prefilter
+        self.backend = backend
+        self.time_range = time_range
+        if time_range is not None and prefilter and byte_range is None:
+            byte_range = seek_index.load_or_build(self.log_file).byte_range(*time_range)
         self.fields = config.FORENSIC_FIELDS 
         self.type_set = set(self.fields) 
+        if prefilter:
+            mavutil.set_dialect(dialect)
+            self.mlog = None
+            msgids = wanted_msgids(self.type_set)
+            self.scanner = tlog_scanner.TlogScanner(self.log_file, mavutil.mavlink.MAVLink(None), msgids,
+                                                    byte_range=byte_range, backend=backend)
+        else:
+            self.mlog = mavutil.mavlink_connection(self.log_file, dialect=dialect)
+            self.scanner = None
         self.csv_fields = ['timestamp']
         nan = float('nan')
         self.data = [nan]
@@ -26,13 +80,35 @@ class TlogParser:
         return self
 
     def __exit__(self, *exc):
-        self.mlog.close()
+        if self.mlog is not None:
+            self.mlog.close()
 
     def __iter__(self):
+        if self.time_range is not None:
+            t0, t1 = self.time_range
+            t0 = float('-inf') if t0 is None else t0
+            t1 = float('inf') if t1 is None else t1
+            for msg in self._messages():
+                if t0 <= getattr(msg, '_timestamp', 0.0) <= t1:
+                    yield msg
+            return
+        yield from self._messages()
+
+    def _messages(self):
+        if self.scanner is not None:
+            yield from self.scanner
+            if self.scanner.byte_range is None:
+                print(f"Frames decoded: {self.scanner.decoded}, skipped: {self.scanner.skipped}, "
+                      f"corrupt: {self.scanner.corrupt}")
+            return
         while msg := self.mlog.recv_match(type=self.type_set):
             if msg.get_type() == 'BAD_DATA': continue
             yield msg
 
+    def column_kinds(self):
+        """Column kinds for csv_fields, taken from the dialect's message definitions."""
+        return column_kinds(self.fields)
+
     def _update(self, type_, data_dict):
         offset = self.offsets[type_]
         for index, desired_attr in enumerate(self.fields[type_]):
@@ -42,32 +118,134 @@ class TlogParser:
         last_timestamp = None
         with self as mavlink:
             for msg in mavlink:
-                yielded_last_row = False
                 timestamp = getattr(msg, '_timestamp', 0.0)
                 data_dict = msg.to_dict()
 
                 if last_timestamp is not None and timestamp != last_timestamp:
-                    self.data[0] = f'{last_timestamp:.8f}'
+                    self.data[0] = last_timestamp
                     yield self.data
-                    yielded_last_row = True
 
                 self._update(msg.get_type(), data_dict)
                 last_timestamp = timestamp
 
-            if not yielded_last_row and last_timestamp is not None:
-                self.data[0] = f'{last_timestamp:.8f}'
+            if last_timestamp is not None:
+                self.data[0] = last_timestamp
                 yield self.data
 
+    def to_column_store(self):
+        store = column_store.ColumnStore(self.csv_fields, self.column_kinds())
+        for data_row in self.process_log():
+            store.append_row(data_row)
+        return store
+
+    def to_dataframe(self):
+        """
+        Builds the forensic DataFrame directly from typed column buffers.
+        Integer fields stay int64 unless they contain gaps (then float64 with NaN).
+        """
+        print(f"Processing {self.log_file}...")
+        with instrument.span('dataframe', file=os.path.basename(self.log_file)) as s:
+            df = self.to_column_store().to_dataframe()
+            s.rows, s.bytes = len(df), os.path.getsize(self.log_file)
+        return df
+
+    def to_tables(self, jobs=1, progress=None):
+        """
+        Sparse storage mode: one compact table per message type, each with its
+        own timestamp column, instead of the dense forward-filled row.
+        jobs > 1 parses byte ranges of the file in a process pool.
+        progress: called as progress(bytes_done, bytes_total) while parsing;
+        an exception it raises (e.g. a cancelled job) aborts the parse.
+        """
+        print(f"Processing {self.log_file}...")
+        with instrument.span('parse', file=os.path.basename(self.log_file), jobs=jobs) as s:
+            if jobs > 1 and self.prefilter:
+                tables = self._to_tables_parallel(jobs, progress)
+            else:
+                tables = self._build_tables(progress)
+            s.rows = tables.message_count()
+            s.bytes = os.path.getsize(self.log_file)
+            if self.scanner is not None and self.scanner.byte_range is not None:
+                start, stop = self.scanner.byte_range
+                s.bytes = min(stop, s.bytes) - start
+        return tables
+
+    def _parse_extent(self):
+        """(first, last) byte offsets this parser reads."""
+        size = os.path.getsize(self.log_file)
+        if self.scanner is None or self.scanner.byte_range is None:
+            return 0, size
+        start, stop = self.scanner.byte_range
+        return start, min(stop, size)
+
+    def _build_tables(self, progress=None):
+        builder = column_store.TableBuilder(self.fields, self.column_kinds())
+        nan = float('nan')
+        if progress is not None and self.scanner is not None:
+            first, last = self._parse_extent()
+            progress(0, last - first)
+        with self as mavlink:
+            for count, msg in enumerate(mavlink, 1):
+                type_ = msg.get_type()
+                values = [getattr(msg, attr, nan) for attr in self.fields[type_]]
+                builder.append(type_, getattr(msg, '_timestamp', 0.0), values)
+                if progress is not None and self.scanner is not None and not count % PROGRESS_EVERY_MESSAGES:
+                    progress(min(self.scanner.position, last) - first, last - first)
+        return builder.finish()
+
+    def _to_tables_parallel(self, jobs, progress=None):
+        first, last = self._parse_extent()
+        size = last - first
+        count = max(jobs, -(-size // config.PARSE_CHUNK_BYTES))
+        bounds = [first + size * i // count for i in range(count + 1)]
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        try:
+            futures = {pool.submit(_parse_range, self.log_file, self.dialect, start, stop, self.backend,
+                                   self.time_range): stop - start
+                       for start, stop in zip(bounds[:-1], bounds[1:])}
+            pending, done = set(futures), 0
+            while pending:
+                # Wakes up at least every poll interval so a cancel is seen while long chunks run
+                finished, pending = wait(pending, timeout=config.PARSE_PROGRESS_POLL_SEC,
+                                         return_when=FIRST_COMPLETED)
+                for future in finished:
+                    future.result()
+                    done += futures[future]
+                if progress is not None:
+                    progress(done, size)
+            chunks = [future.result() for future in futures]
+        except BaseException:
+            # Drop the chunks not started yet and return without waiting for the running ones
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        pool.shutdown()
+
+        for prev, chunk in zip(chunks, chunks[1:]):
+            if prev['end_offset'] != chunk['first_record']:
+                print(f"Warning: chunk seam mismatch at byte {chunk['first_record']}, reparsing serially.")
+                return self._build_tables(progress)
+
+        decoded, skipped, corrupt = (sum(chunk[key] for chunk in chunks) for key in ('decoded', 'skipped', 'corrupt'))
+        print(f"Frames decoded: {decoded}, skipped: {skipped}, corrupt: {corrupt} ({count} chunks, {jobs} workers)")
+        return column_store.MessageTables.concat([chunk['tables'] for chunk in chunks])
+
     def to_csv(self, output_file):
         print(f"Processing {self.log_file}...")
         try:
-            with open(output_file, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(self.csv_fields)
-                for data_row in self.process_log():
-                    writer.writerow([str(val) for val in data_row])
+            with instrument.span('csv', file=os.path.basename(self.log_file)) as s:
+                df = self.to_column_store().to_dataframe()
+                df.to_csv(output_file, index=False)
+                s.rows, s.bytes = len(df), os.path.getsize(output_file)
             print(f"Success: Forensic CSV saved to {output_file}")
             return True
         except Exception as e:
             print(f"CSV Error: {e}")
-            return False
\ No newline at end of file
+            return False
+
+def _parse_range(log_file, dialect, start, stop, backend, time_range=None):
+    """Process-pool worker: parses the records starting in [start, stop)."""
+    parser = TlogParser(log_file, dialect, byte_range=(start, stop), backend=backend, time_range=time_range)
+    tables = parser._build_tables()
+    scanner = parser.scanner
+    return {'tables': tables, 'first_record': scanner.first_record, 'end_offset': scanner.end_offset,
+            'decoded': scanner.decoded, 'skipped': scanner.skipped, 'corrupt': scanner.corrupt}
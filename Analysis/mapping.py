@@ -1,52 +1,50 @@
 """
-Handles all geospatial plotting using GeoPandas.
+Handles all geospatial plotting.
 MODIFIED to only plot the path (no basemap).
 The basemap will be added by the GUI in the main thread.
+Positions are projected with geodesy.web_mercator (EPSG:3857).
 """
 
-import geopandas
-import contextily as cx
 from matplotlib.figure import Figure
 import matplotlib.patheffects as pe
-import tempfile
-import os
+from . import config
+from . import flight_path
+from . import geodesy
+from . import instrument
 
-def create_flight_path_map(df):
+MAP_FIGSIZE = (10, 10)
+
+@instrument.traced('map.path')
+def create_flight_path_map(tables):
     print("Generating flight path (lines only)...")
-    gps_df = df.dropna(subset=['GLOBAL_POSITION_INT.lat', 'GLOBAL_POSITION_INT.lon']).copy()
+    lat, lon = flight_path.extract_path(tables)
+    instrument.current().rows = len(lat)
     
-    if gps_df.empty:
+    if not len(lat):
         print("Warning: No GPS data found.")
         return None
-
-    gps_df['lat'] = gps_df['GLOBAL_POSITION_INT.lat'] / 1e7
-    gps_df['lon'] = gps_df['GLOBAL_POSITION_INT.lon'] / 1e7
     
     try:
-        gdf = geopandas.GeoDataFrame(
-            gps_df, geometry=geopandas.points_from_xy(gps_df.lon, gps_df.lat), crs='EPSG:4326'
-        )
-        gdf_wm = gdf.to_crs(epsg=3857) 
+        x, y = geodesy.web_mercator(lat, lon)
 
-        fig = Figure(figsize=(10, 10))
+        fig = Figure(figsize=MAP_FIGSIZE)
         ax = fig.add_subplot(1, 1, 1)
         
-        gdf_wm.plot(ax=ax, color='red', linewidth=3, alpha=0.7, zorder=2)
+        ax.plot(x, y, color='red', linewidth=3, alpha=0.7, zorder=2)
+        ax.set_aspect('equal')
         
-        minx, miny, maxx, maxy = gdf_wm.total_bounds
+        minx, maxx, miny, maxy = x.min(), x.max(), y.min(), y.max()
         x_buf = (maxx - minx) * 0.5
         y_buf = (maxy - miny) * 0.5
         ax.set_xlim(minx - x_buf, maxx + x_buf)
         ax.set_ylim(miny - y_buf, maxy + y_buf)
         
-        start = gdf_wm.geometry.iloc[0]
-        ax.scatter(start.x, start.y, color='#2ecc71', edgecolors='black', s=150, zorder=5)
-        ax.text(start.x, start.y, " START", fontsize=12, fontweight='bold', color='white', 
+        ax.scatter(x[0], y[0], color='#2ecc71', edgecolors='black', s=150, zorder=5)
+        ax.text(x[0], y[0], " START", fontsize=12, fontweight='bold', color='white', 
                 path_effects=[pe.withStroke(linewidth=3, foreground="black")], zorder=6)
 
-        end = gdf_wm.geometry.iloc[-1]
-        ax.scatter(end.x, end.y, color='#3498db', edgecolors='black', marker='X', s=150, zorder=5)
-        ax.text(end.x, end.y, " END", fontsize=12, fontweight='bold', color='white', 
+        ax.scatter(x[-1], y[-1], color='#3498db', edgecolors='black', marker='X', s=150, zorder=5)
+        ax.text(x[-1], y[-1], " END", fontsize=12, fontweight='bold', color='white', 
                 path_effects=[pe.withStroke(linewidth=3, foreground="black")], zorder=6)
         
         ax.set_axis_off()
@@ -59,16 +57,30 @@ def create_flight_path_map(df):
          print(f"Map Error: {e}")
          return None
 
+@instrument.traced('map.basemap')
 def add_basemap(fig):
     """
     Adds the basemap to an existing figure. 
     Useful for PDF export where we need the background.
+    Tiles come from the shared tile store (see tile_cache.py).
+    Returns True only if every tile was available.
     """
     try:
         if fig is None or not fig.axes:
-            return
+            return False
+        from . import tile_cache
         ax = fig.axes[0]
-        cx.add_basemap(ax, source=cx.providers.OpenStreetMap.Mapnik)
+        (west, east), (south, north) = ax.get_xlim(), ax.get_ylim()
+        zoom = tile_cache.zoom_for_extent(east - west, config.EXPORT_BASEMAP_PIXELS)
+        image, extent, missing = tile_cache.default_store().basemap(
+            config.EXPORT_TILE_SERVER, west, south, east, north, zoom)
+        ax.imshow(image, extent=extent, interpolation='bilinear', zorder=0)
+        ax.set_xlim(west, east)
+        ax.set_ylim(south, north)
+        if missing:
+            print(f"Basemap: {missing} tiles unavailable (offline or not cached).")
         print("Basemap added to figure for export.")
+        return not missing
     except Exception as e:
-        print(f"Failed to add basemap: {e}")
\ No newline at end of file
+        print(f"Failed to add basemap: {e}")
+        return False
@@ -2,47 +2,161 @@
 Handles the creation of 2D plots.
 MODIFIED to return figure objects for Tkinter GUI.
 FIXED to be thread-safe by avoiding pyplot.
+Lines are drawn through LodSeries, which keeps the full-resolution data
+and only hands matplotlib about four points per pixel of the visible range.
 """
 
 from matplotlib.figure import Figure
+from matplotlib.collections import PolyCollection
 import matplotlib.dates as mdates
+import numpy as np
 import warnings
+from . import decimate
+from . import instrument
 
 warnings.filterwarnings("ignore", category=UserWarning, module="matplotlib")
 
-def plot_altitude(df):
+# Size of the altitude and RC figures; part of the render cache key of exported images
+PLOT_FIGSIZE = (10, 4)
+
+class LodSeries:
+    """
+    One decimated line (optionally filled down to zero) on an axes.
+    Re-decimates from the full data whenever the axes' x-range changes,
+    so zooming in shows the raw samples.
+    """
+
+    def __init__(self, ax, x, y, fill=None, **kwargs):
+        self.ax = ax
+        self.fill = fill
+        self.fill_artist = None
+        self.pixels = None
+        self.line, = ax.plot([], [], **kwargs)
+        if not hasattr(ax, 'lod_series'):
+            ax.lod_series = []
+            ax.callbacks.connect('xlim_changed', _on_xlim_changed)
+        ax.lod_series.append(self)
+        self.set_data(x, y)
+
+    def set_data(self, x, y):
+        """Replaces the full-resolution data; drawn on the next redraw()."""
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+
+    def redraw(self, full=False):
+        pixels = self.pixels or max(int(self.ax.get_window_extent().width), 100)
+        x0, x1 = (None, None) if full else self.ax.get_xlim()
+        keep = decimate.minmax_indices(self.x, self.y, pixels, x0, x1)
+        x, y = self.x[keep], self.y[keep]
+        self.line.set_data(x, y)
+        if self.fill is not None:
+            self._redraw_fill(x, y)
+
+    def _redraw_fill(self, x, y):
+        # Kept out of autoscaling: fill_between would rescale the axes and call back into redraw()
+        valid = ~np.isnan(y)
+        x, y = x[valid], y[valid]
+        verts = np.column_stack([np.r_[x[:1], x, x[-1:]], np.r_[0.0, y, 0.0]]) if len(x) else np.empty((0, 2))
+        if self.fill_artist is None:
+            self.fill_artist = PolyCollection([verts], **self.fill)
+            self.ax.add_collection(self.fill_artist, autolim=False)
+        else:
+            self.fill_artist.set_verts([verts])
+
+def _on_xlim_changed(ax):
+    for series in ax.lod_series:
+        series.redraw()
+
+def redecimate(fig, pixels=None):
+    """
+    Re-decimates every line of fig for a pixel budget (e.g. the PDF export
+    resolution); pixels=None goes back to the on-screen axes width.
+    """
+    for ax in fig.axes:
+        for series in getattr(ax, 'lod_series', []):
+            series.pixels = pixels
+            series.redraw()
+
+@instrument.traced('plot.save')
+def save_figure(fig, path, dpi):
+    """
+    Saves fig as PNG (to a path or file object) decimated for the output
+    resolution rather than the screen, then puts the on-screen level of detail back.
+    Only call it from the thread that owns fig: export threads draw their own figures.
+    """
+    scale = dpi / fig.dpi
+    for ax in fig.axes:
+        for series in getattr(ax, 'lod_series', []):
+            series.pixels = max(int(ax.get_window_extent().width * scale), 100)
+            series.redraw()
     try:
-        fig = Figure(figsize=(10, 4))
+        fig.savefig(path, format='png', dpi=dpi, bbox_inches='tight')
+    finally:
+        redecimate(fig)
+
+def _rescale(ax):
+    for series in ax.lod_series:
+        series.redraw(full=True)
+    ax.relim()
+    ax.autoscale_view()
+
+@instrument.traced('plot.altitude')
+def plot_altitude(tables):
+    try:
+        gps = tables['GLOBAL_POSITION_INT']
+        instrument.current().rows = len(gps)
+        fig = Figure(figsize=PLOT_FIGSIZE)
         ax = fig.add_subplot(1, 1, 1)
 
-        ax.plot(df['timestamp'], df['GLOBAL_POSITION_INT.alt'] / 100.0, color='#2980b9', linewidth=2)
-        ax.fill_between(df['timestamp'], df['GLOBAL_POSITION_INT.alt'] / 100.0, alpha=0.1, color='#2980b9')
+        # GLOBAL_POSITION_INT.alt is in millimetres
+        LodSeries(ax, gps['timestamp'], gps['alt'] / 1000.0, color='#2980b9', linewidth=2,
+                  fill=dict(alpha=0.1, color='#2980b9'))
+        _rescale(ax)
         ax.set_title('Altitude Profile (MSL)', fontweight='bold')
         ax.set_xlabel('Flight Time (s)')
         ax.set_ylabel('Altitude (m)')
         ax.grid(True, linestyle='--', alpha=0.5)
-        
+
         return fig
     except Exception as e:
         print(f"Altitude plot error: {e}")
         return None
 
-def plot_rc_channels(df):
+@instrument.traced('plot.rc')
+def plot_rc_channels(tables):
     try:
-        fig = Figure(figsize=(10, 4))
+        rc = tables['RC_CHANNELS']
+        instrument.current().rows = len(rc)
+        fig = Figure(figsize=PLOT_FIGSIZE)
         ax = fig.add_subplot(1, 1, 1)
 
-        ax.plot(df['timestamp'], df['RC_CHANNELS.chan1_raw'], label='Roll (Ch1)', alpha=0.7)
-        ax.plot(df['timestamp'], df['RC_CHANNELS.chan2_raw'], label='Pitch (Ch2)', alpha=0.7)
-        ax.plot(df['timestamp'], df['RC_CHANNELS.chan3_raw'], label='Throttle (Ch3)', linewidth=2, color='black')
-        ax.plot(df['timestamp'], df['RC_CHANNELS.chan4_raw'], label='Yaw (Ch4)', alpha=0.7)
+        LodSeries(ax, rc['timestamp'], rc['chan1_raw'], label='Roll (Ch1)', alpha=0.7)
+        LodSeries(ax, rc['timestamp'], rc['chan2_raw'], label='Pitch (Ch2)', alpha=0.7)
+        LodSeries(ax, rc['timestamp'], rc['chan3_raw'], label='Throttle (Ch3)', linewidth=2, color='black')
+        LodSeries(ax, rc['timestamp'], rc['chan4_raw'], label='Yaw (Ch4)', alpha=0.7)
+        _rescale(ax)
         ax.set_title('Pilot Inputs (RC Raw)', fontweight='bold')
         ax.set_xlabel('Flight Time (s)')
         ax.set_ylabel('PWM Value (1000-2000)')
         ax.legend(loc='upper right', ncol=4)
         ax.grid(True, linestyle='--', alpha=0.5)
-        
+
         return fig
     except Exception as e:
         print(f"RC plot error: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def update_altitude(fig, tables):
+    """Live mode: swaps the altitude data into an existing figure instead of rebuilding it."""
+    gps = tables['GLOBAL_POSITION_INT']
+    ax = fig.axes[0]
+    ax.lod_series[0].set_data(gps['timestamp'], gps['alt'] / 1000.0)
+    _rescale(ax)
+
+def update_rc_channels(fig, tables):
+    """Live mode: swaps the RC data into an existing figure instead of rebuilding it."""
+    rc = tables['RC_CHANNELS']
+    ax = fig.axes[0]
+    for series, channel in zip(ax.lod_series, ('chan1_raw', 'chan2_raw', 'chan3_raw', 'chan4_raw')):
+        series.set_data(rc['timestamp'], rc[channel])
+    _rescale(ax)
@@ -38,7 +38,7 @@ def generate_forensic_report(output_pdf_path, log_file_name, summary_stats, time
     pdf.set_auto_page_break(auto=True, margin=15)
 
     pdf.set_fill_color(240, 240, 240)
-    pdf.rect(10, 25, 190, 25, 'F')
+    pdf.rect(10, 25, 190, 33, 'F')
     pdf.set_y(28)
     pdf.set_font('Arial', 'B', 12)
     pdf.cell(20, 8, 'File:', 0, 0)
@@ -49,6 +49,13 @@ def generate_forensic_report(output_pdf_path, log_file_name, summary_stats, time
     pdf.cell(25, 8, 'Duration:', 0, 0)
     pdf.set_font('Arial', '', 12)
     pdf.cell(0, 8, f"{summary_stats.get('duration_sec', 0):.2f} seconds", 0, 1)
+    
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(25, 8, 'Track:', 0, 0)
+    pdf.set_font('Arial', '', 12)
+    pdf.cell(0, 8, f"{summary_stats.get('total_distance_m', 0):.0f} m flown, "
+                   f"max range {summary_stats.get('max_range_m', 0):.0f} m, "
+                   f"max speed {summary_stats.get('max_speed_mps', 0):.1f} m/s", 0, 1)
     pdf.ln(10)
     
     pdf.set_font('Arial', 'B', 14)
@@ -0,0 +1,134 @@
+"""
+Resampling of message streams onto one common time grid.
+Each series (e.g. 'ATTITUDE.roll') is joined as-of onto the grid with
+np.searchsorted, so streams at 50 Hz, 10 Hz and 5 Hz come out as one frame
+of len(grid) rows at a known rate, instead of the one-row-per-timestamp
+wide() view. A grid value is left empty (NaN) when the samples it would
+come from are older than max_age.
+"""
+
+import numpy as np
+import pandas as pd
+from . import config
+from .column_store import INTEGER, TEXT
+
+PREVIOUS = 'previous'
+NEAREST = 'nearest'
+LINEAR = 'linear'
+METHODS = (PREVIOUS, NEAREST, LINEAR)
+
+def time_grid(tables, rate_hz=None, start=None, end=None):
+    """Timestamps at rate_hz (RESAMPLE_RATE_HZ by default) from start to end, both defaulting to the log's bounds."""
+    rate_hz = config.RESAMPLE_RATE_HZ if rate_hz is None else rate_hz
+    if rate_hz <= 0:
+        raise ValueError(f"rate must be positive, got {rate_hz}")
+    start = tables.start_time if start is None else start
+    end = tables.end_time if end is None else end
+    if not np.isfinite(start) or not np.isfinite(end) or end < start:
+        return np.empty(0)
+    return start + np.arange(int(np.floor((end - start) * rate_hz)) + 1) / rate_hz
+
+def expand_series(tables, series=None):
+    """
+    'TYPE.field' names for series, which may mix full names and bare message
+    types (every field of that type). None means every non-text field.
+    """
+    if series is None:
+        return [f'{type_}.{attr}' for type_, attrs in tables.fields.items() for attr in attrs
+                if tables.kinds[type_][attr] != TEXT]
+    names = []
+    for name in series:
+        type_, _, attr = name.partition('.')
+        if type_ not in tables.fields:
+            raise ValueError(f"unknown message type {type_!r}")
+        if not attr:
+            names.extend(f'{type_}.{a}' for a in tables.fields[type_])
+        elif attr in tables.fields[type_]:
+            names.append(name)
+        else:
+            raise ValueError(f"{type_} has no field {attr!r}")
+    return names
+
+def _setting(value, name, default):
+    if isinstance(value, dict):
+        for key in (name, name.partition('.')[0], '*'):
+            if key in value:
+                return value[key]
+        return default
+    return default if value is None else value
+
+def resample(tables, series=None, rate_hz=None, grid=None, method=None, max_age=None):
+    """
+    DataFrame with a 'timestamp' column (the grid) and one column per series.
+    grid: explicit timestamps; otherwise time_grid(tables, rate_hz).
+    method: 'previous' (last sample at or before the grid time), 'nearest'
+    or 'linear'; text fields always use 'previous' or 'nearest'.
+    max_age: seconds; 'previous' and 'nearest' drop samples farther than
+    this from the grid time, 'linear' does not interpolate across gaps
+    longer than this.
+    method and max_age may be dicts keyed by 'TYPE.field', 'TYPE' or '*'
+    (everything else), most specific first.
+    """
+    grid = time_grid(tables, rate_hz) if grid is None else np.asarray(grid, dtype=np.float64)
+    data = {'timestamp': grid}
+    for name in expand_series(tables, series):
+        type_, _, attr = name.partition('.')
+        how = _setting(method, name, config.RESAMPLE_METHOD)
+        if how not in METHODS:
+            raise ValueError(f"unknown method {how!r} for {name}, expected one of {', '.join(METHODS)}")
+        age = _setting(max_age, name, config.RESAMPLE_MAX_AGE_SEC)
+        data[name] = _resample_column(tables.columns[type_]['timestamp'], tables.columns[type_][attr],
+                                      tables.kinds[type_][attr], grid, how, age)
+    return pd.DataFrame(data)
+
+def _resample_column(ts, values, kind, grid, how, max_age):
+    text = kind == TEXT
+    ts = np.asarray(ts, dtype=np.float64)
+    if not text:
+        values = np.asarray(values, dtype=np.float64)
+    if len(ts) and np.any(ts[1:] < ts[:-1]):
+        order = np.argsort(ts, kind='stable')
+        ts, values = ts[order], values[order]
+
+    n = len(grid)
+    if not len(ts):
+        return np.full(n, None if text else np.nan, dtype=object if text else np.float64)
+    max_age = np.inf if max_age is None else max_age
+
+    # side='right' makes the last of several equal timestamps win, like the dense forward fill
+    prev = np.searchsorted(ts, grid, side='right') - 1
+    nxt = np.minimum(prev + 1, len(ts) - 1)
+    has_prev = prev >= 0
+    prev_c = np.maximum(prev, 0)
+    prev_age = np.where(has_prev, grid - ts[prev_c], np.inf)
+    next_age = np.where(ts[nxt] >= grid, ts[nxt] - grid, np.inf)
+
+    if how == LINEAR and not text:
+        out = np.full(n, np.nan)
+        exact = prev_age == 0
+        out[exact] = values[prev_c[exact]]
+        inner = has_prev & ~exact & np.isfinite(next_age) & (ts[nxt] - ts[prev_c] <= max_age)
+        t0, t1 = ts[prev_c[inner]], ts[nxt[inner]]
+        v0, v1 = values[prev_c[inner]], values[nxt[inner]]
+        out[inner] = v0 + (v1 - v0) * (grid[inner] - t0) / (t1 - t0)
+        return out
+
+    # A missing neighbour has an infinite age, which max_age=inf must not accept
+    if how == NEAREST:
+        use_next = next_age < prev_age
+        pick = np.where(use_next, nxt, prev_c)
+        age = np.minimum(prev_age, next_age)
+    else:
+        pick = prev_c
+        age = prev_age
+    ok = np.isfinite(age) & (age <= max_age)
+
+    if text:
+        out = np.full(n, None, dtype=object)
+        out[ok] = values[pick[ok]]
+        return out
+    out = np.full(n, np.nan)
+    out[ok] = values[pick[ok]]
+    if kind == INTEGER and not np.isnan(out).any():
+        out = out.astype(np.int64)
+    return out
@@ -0,0 +1,115 @@
+"""
+Sparse seek index for .tlog files: the byte offset of the first record at
+least SEEK_INDEX_INTERVAL_SEC after the previous entry. Building it walks
+record headers only (nothing is decoded), once per log content; it is kept
+in the cache directory so the log itself is never written to. A time
+window then maps to a byte range, and parsing costs time proportional to
+the window instead of the file.
+"""
+
+import mmap
+import os
+import struct
+import numpy as np
+from . import config
+from . import cache
+from . import instrument
+from .tlog_scanner import TIMESTAMP_LEN, find_record_start, frame_info
+
+_timestamp = struct.Struct('>Q')
+
+class SeekIndex:
+    def __init__(self, times, offsets, size):
+        self.times = times
+        self.offsets = offsets
+        self.size = size
+
+    @property
+    def start_time(self):
+        return float(self.times[0]) if len(self.times) else None
+
+    @property
+    def end_time(self):
+        """Time of the last indexed record; the log runs up to SEEK_INDEX_INTERVAL_SEC past it."""
+        return float(self.times[-1]) if len(self.times) else None
+
+    def byte_range(self, t0=None, t1=None):
+        """
+        (start, stop) covering every record timestamped in [t0, t1], assuming
+        timestamps never go backwards. It overshoots by up to one index
+        interval on each side, so callers still filter by timestamp.
+        """
+        start, stop = 0, self.size
+        if t0 is not None:
+            i = np.searchsorted(self.times, t0, side='left') - 1
+            if i >= 0:
+                start = int(self.offsets[i])
+        if t1 is not None:
+            i = np.searchsorted(self.times, t1, side='right')
+            if i < len(self.offsets):
+                stop = int(self.offsets[i])
+        return start, max(start, stop)
+
+def build(log_file, interval=None):
+    """Walks the record headers of log_file into a SeekIndex."""
+    interval = config.SEEK_INDEX_INTERVAL_SEC if interval is None else interval
+    times, offsets = [], []
+    with open(log_file, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return SeekIndex(np.empty(0), np.empty(0, dtype=np.int64), 0)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                pos, next_time, latest = 0, -np.inf, -np.inf
+                while pos + TIMESTAMP_LEN < size:
+                    try:
+                        info = frame_info(view, pos, size)
+                    except ValueError:
+                        pos = find_record_start(view, pos + 1, size)
+                        continue
+                    if info is None:
+                        break
+                    t = _timestamp.unpack_from(view, pos)[0] * 1.0e-6
+                    # Entries stay sorted even if a clock steps back for a moment
+                    if t > latest:
+                        latest = t
+                        if t >= next_time:
+                            times.append(t)
+                            offsets.append(pos)
+                            next_time = t + interval
+                    pos += info[1]
+            finally:
+                view.release()
+    return SeekIndex(np.array(times, dtype=np.float64), np.array(offsets, dtype=np.int64), size)
+
+def load_or_build(log_file):
+    """The seek index of log_file from the cache, building and storing it on first use."""
+    path = cache.seek_index_path(log_file)
+    size = os.path.getsize(log_file)
+    try:
+        with np.load(path) as data:
+            if int(data['size']) == size and float(data['interval']) == config.SEEK_INDEX_INTERVAL_SEC:
+                index = SeekIndex(data['times'], data['offsets'], size)
+                # Marks it as recently used for evict_seek_indexes()
+                os.utime(path)
+                return index
+    except (OSError, KeyError, ValueError):
+        pass
+
+    with instrument.span('seek_index', file=os.path.basename(str(log_file))) as s:
+        index = build(log_file)
+        s.rows, s.bytes = len(index.times), size
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Same as cache.store: a '.npz.tmp' name stays out of the eviction glob while it is written
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez(f, times=index.times, offsets=index.offsets, size=size,
+                     interval=config.SEEK_INDEX_INTERVAL_SEC)
+        os.replace(tmp, path)
+        cache.evict_seek_indexes()
+    except OSError as e:
+        print(f"Seek index not saved: {e}")
+    print(f"Seek index built for {os.path.basename(str(log_file))}: {len(index.times)} entries")
+    return index
@@ -0,0 +1,210 @@
+"""
+Spatial-temporal index of flight tracks, stored in the flight catalog.
+Each track is simplified (Douglas-Peucker within SPATIAL_TOLERANCE_M, plus
+a point at least every SPATIAL_MAX_SEGMENT_SEC so times stay accurate
+while hovering) and every segment goes into an SQLite R-tree over
+(lat, lon, UTC time). Radius, bounding-box and polygon queries read the
+R-tree for candidates and then clip the candidate segments exactly,
+returning the time spans each flight spent inside the area.
+"""
+
+import numpy as np
+from . import config
+from . import detectors
+from . import flight_path
+from . import geodesy
+
+METRES_PER_DEG = np.pi * geodesy.EARTH_RADIUS_M / 180.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    flight_id INTEGER NOT NULL REFERENCES flights (id) ON DELETE CASCADE,
+    lat0 REAL NOT NULL, lon0 REAL NOT NULL, t0 REAL NOT NULL,
+    lat1 REAL NOT NULL, lon1 REAL NOT NULL, t1 REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_flight ON segments (flight_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_rtree USING rtree (
+    id, min_lat, max_lat, min_lon, max_lon, start_utc, end_utc
+);
+"""
+
+def track_segments(tables, tolerance_m=None, max_segment_sec=None):
+    """
+    Simplified track as an (n, 6) array of segments
+    [lat0, lon0, t0, lat1, lon1, t1], times in UTC (or the log's own
+    timestamps when it has no time reference).
+    """
+    tolerance_m = config.SPATIAL_TOLERANCE_M if tolerance_m is None else tolerance_m
+    max_segment_sec = config.SPATIAL_MAX_SEGMENT_SEC if max_segment_sec is None else max_segment_sec
+    t, lat, lon = flight_path.extract_track(tables)
+    if not len(lat):
+        return np.empty((0, 6))
+    t = np.asarray(t, dtype=np.float64) + (detectors.utc_offset(tables) or 0.0)
+    if len(lat) == 1:
+        return np.array([[lat[0], lon[0], t[0], lat[0], lon[0], t[0]]])
+
+    x, y = geodesy.web_mercator(lat, lon)
+    # Web Mercator metres are stretched by 1/cos(lat) relative to ground metres
+    keep = flight_path.dp_significance(x, y) * np.cos(np.radians(lat.mean())) > tolerance_m
+    bucket = np.floor((t - t[0]) / max_segment_sec)
+    keep[1:] |= bucket[1:] != bucket[:-1]
+    lat, lon, t = lat[keep], lon[keep], t[keep]
+    return np.column_stack([lat[:-1], lon[:-1], t[:-1], lat[1:], lon[1:], t[1:]])
+
+def insert(db, flight_id, segments):
+    """Adds a flight's segments (from track_segments) to both tables. Runs inside the caller's transaction."""
+    if not len(segments):
+        return
+    first = db.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM segments').fetchone()[0]
+    ids = np.arange(first, first + len(segments))
+    lat, lon, t = segments[:, [0, 3]], segments[:, [1, 4]], segments[:, [2, 5]]
+    db.executemany('INSERT INTO segments VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                   [(int(i), flight_id, *seg) for i, seg in zip(ids, segments.tolist())])
+    boxes = np.column_stack([ids, lat.min(1), lat.max(1), lon.min(1), lon.max(1), t.min(1), t.max(1)])
+    db.executemany('INSERT INTO segments_rtree VALUES (?, ?, ?, ?, ?, ?, ?)',
+                   [(int(row[0]), *row[1:]) for row in boxes.tolist()])
+
+def copy(db, source_id, flight_id):
+    """Gives flight_id the segments of source_id (a log with the same content). Runs inside the caller's transaction."""
+    rows = db.execute('SELECT lat0, lon0, t0, lat1, lon1, t1 FROM segments WHERE flight_id=? ORDER BY id',
+                      (source_id,)).fetchall()
+    insert(db, flight_id, np.array([tuple(row) for row in rows], dtype=np.float64).reshape(-1, 6))
+
+def delete(db, flight_ids):
+    """Removes the R-tree entries of flights about to be deleted (the segments rows cascade)."""
+    for flight_id in flight_ids:
+        db.execute('DELETE FROM segments_rtree WHERE id IN (SELECT id FROM segments WHERE flight_id=?)', (flight_id,))
+
+def _candidates(db, min_lat, min_lon, max_lat, max_lon, after, before):
+    """(flight ids, (n, 6) segment array) for segments whose boxes overlap the query box and time window."""
+    sql = ('SELECT s.flight_id, s.lat0, s.lon0, s.t0, s.lat1, s.lon1, s.t1 FROM segments_rtree r '
+           'JOIN segments s ON s.id = r.id '
+           'WHERE r.max_lat >= ? AND r.min_lat <= ? AND r.max_lon >= ? AND r.min_lon <= ?')
+    args = [min_lat, max_lat, min_lon, max_lon]
+    if after is not None:
+        sql += ' AND r.end_utc >= ?'
+        args.append(after)
+    if before is not None:
+        sql += ' AND r.start_utc <= ?'
+        args.append(before)
+    rows = np.array(db.execute(sql, args).fetchall(), dtype=np.float64).reshape(-1, 7)
+    return rows[:, 0].astype(np.int64), rows[:, 1:]
+
+def _spans(db, flight_ids, segments, s0, s1, after, before, distance=None):
+    """
+    Turns the inside part [s0, s1] (fractions along each segment, s0 > s1
+    where a segment never enters the area) into merged per-flight time spans.
+    """
+    inside = s0 <= s1
+    flight_ids, segments, s0, s1 = flight_ids[inside], segments[inside], s0[inside], s1[inside]
+    t0, dt = segments[:, 2], segments[:, 5] - segments[:, 2]
+    start, end = t0 + s0 * dt, t0 + s1 * dt
+    if after is not None:
+        start = np.maximum(start, after)
+    if before is not None:
+        end = np.minimum(end, before)
+    valid = start <= end
+    flight_ids, start, end = flight_ids[valid], start[valid], end[valid]
+    distance = distance[inside][valid] if distance is not None else np.full(len(start), np.nan)
+
+    spans = []
+    for i in np.lexsort((start, flight_ids)):
+        fid = int(flight_ids[i])
+        if spans and spans[-1]['flight_id'] == fid and start[i] <= spans[-1]['end_utc'] + config.SPATIAL_MERGE_GAP_SEC:
+            last = spans[-1]
+            last['end_utc'] = max(last['end_utc'], float(end[i]))
+            last['min_distance_m'] = float(np.fmin(last['min_distance_m'], distance[i]))
+            continue
+        spans.append({'flight_id': fid, 'start_utc': float(start[i]), 'end_utc': float(end[i]),
+                      'min_distance_m': float(distance[i])})
+
+    names = dict(db.execute('SELECT id, path FROM flights WHERE id IN (%s)' % ','.join('?' * len(spans)),
+                            [s['flight_id'] for s in spans]).fetchall()) if spans else {}
+    for span in spans:
+        span['path'] = names.get(span['flight_id'])
+        if np.isnan(span['min_distance_m']):
+            del span['min_distance_m']
+    return sorted(spans, key=lambda s: (s['start_utc'], s['flight_id']))
+
+def near(db, lat, lon, radius_m, after=None, before=None):
+    """Time spans during which each flight was within radius_m metres of (lat, lon)."""
+    dlat = radius_m / METRES_PER_DEG
+    dlon = radius_m / (METRES_PER_DEG * max(np.cos(np.radians(lat)), 1e-6))
+    flight_ids, seg = _candidates(db, lat - dlat, lon - dlon, lat + dlat, lon + dlon, after, before)
+
+    # Local flat-earth metres around the query point; fine at search radii
+    kx = METRES_PER_DEG * np.cos(np.radians(lat))
+    px, py = (seg[:, 1] - lon) * kx, (seg[:, 0] - lat) * METRES_PER_DEG
+    dx, dy = (seg[:, 4] - seg[:, 1]) * kx, (seg[:, 3] - seg[:, 0]) * METRES_PER_DEG
+    a = dx * dx + dy * dy
+    b = 2 * (px * dx + py * dy)
+    c = px * px + py * py - radius_m ** 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        root = np.sqrt(b * b - 4 * a * c)
+        s0 = np.where(a > 0, (-b - root) / (2 * a), np.where(c <= 0, 0.0, np.inf))
+        s1 = np.where(a > 0, (-b + root) / (2 * a), np.where(c <= 0, 1.0, -np.inf))
+        closest = np.clip(np.where(a > 0, -b / (2 * a), 0.0), 0, 1)
+    s0, s1 = np.nan_to_num(s0, nan=np.inf), np.nan_to_num(s1, nan=-np.inf)
+    distance = np.hypot(px + closest * dx, py + closest * dy)
+    return _spans(db, flight_ids, seg, np.maximum(s0, 0), np.minimum(s1, 1), after, before, distance)
+
+def within_bbox(db, min_lat, min_lon, max_lat, max_lon, after=None, before=None):
+    """Time spans during which each flight was inside the box (Liang-Barsky clipping of each segment)."""
+    flight_ids, seg = _candidates(db, min_lat, min_lon, max_lat, max_lon, after, before)
+    s0, s1 = np.zeros(len(seg)), np.ones(len(seg))
+    for start, delta, low, high in ((seg[:, 0], seg[:, 3] - seg[:, 0], min_lat, max_lat),
+                                    (seg[:, 1], seg[:, 4] - seg[:, 1], min_lon, max_lon)):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            enter, leave = (low - start) / delta, (high - start) / delta
+        moving = delta != 0
+        s0 = np.where(moving, np.maximum(s0, np.minimum(enter, leave)), s0)
+        s1 = np.where(moving, np.minimum(s1, np.maximum(enter, leave)), s1)
+        outside = ~moving & ((start < low) | (start > high))
+        s0[outside], s1[outside] = np.inf, -np.inf
+    return _spans(db, flight_ids, seg, s0, s1, after, before)
+
+def _inside_polygon(lat, lon, poly_lat, poly_lon):
+    """Even-odd rule for points against one polygon ring (vertices not repeated)."""
+    lat, lon = np.asarray(lat)[:, None], np.asarray(lon)[:, None]
+    lat_a, lon_a = poly_lat[None, :], poly_lon[None, :]
+    lat_b, lon_b = np.roll(poly_lat, -1)[None, :], np.roll(poly_lon, -1)[None, :]
+    crosses = (lat_a > lat) != (lat_b > lat)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x = lon_a + (lat - lat_a) * (lon_b - lon_a) / (lat_b - lat_a)
+    return (crosses & (lon < x)).sum(axis=1) % 2 == 1
+
+def within_polygon(db, polygon, after=None, before=None):
+    """
+    Time spans during which each flight was inside a polygon given as
+    [(lat, lon), ...]. A segment is split where it crosses the polygon's
+    edges and each piece is tested at its midpoint.
+    """
+    poly = np.asarray(polygon, dtype=np.float64)
+    if len(poly) > 3 and np.array_equal(poly[0], poly[-1]):
+        poly = poly[:-1]
+    poly_lat, poly_lon = poly[:, 0], poly[:, 1]
+    flight_ids, seg = _candidates(db, poly_lat.min(), poly_lon.min(), poly_lat.max(), poly_lon.max(), after, before)
+
+    ax, ay = poly_lon, poly_lat
+    ex, ey = np.roll(poly_lon, -1) - ax, np.roll(poly_lat, -1) - ay
+    pieces = [[], [], []]
+    for i, (lat0, lon0, _, lat1, lon1, _) in enumerate(seg):
+        dx, dy = lon1 - lon0, lat1 - lat0
+        denom = dx * ey - dy * ex
+        with np.errstate(invalid='ignore', divide='ignore'):
+            s = ((ax - lon0) * ey - (ay - lat0) * ex) / denom
+            u = ((ax - lon0) * dy - (ay - lat0) * dx) / denom
+        cuts = s[(denom != 0) & (s > 0) & (s < 1) & (u >= 0) & (u <= 1)]
+        bounds = np.unique(np.r_[0.0, cuts, 1.0])
+        mid = (bounds[:-1] + bounds[1:]) / 2 if len(bounds) > 1 else np.array([0.0])
+        inside = _inside_polygon(lat0 + mid * dy, lon0 + mid * dx, poly_lat, poly_lon)
+        if len(bounds) == 1:
+            bounds = np.array([0.0, 0.0])
+        for j in np.flatnonzero(inside):
+            pieces[0].append(i)
+            pieces[1].append(bounds[j])
+            pieces[2].append(bounds[j + 1])
+    index = np.array(pieces[0], dtype=np.int64)
+    return _spans(db, flight_ids[index], seg[index].reshape(-1, 6),
+                  np.array(pieces[1], dtype=np.float64), np.array(pieces[2], dtype=np.float64), after, before)
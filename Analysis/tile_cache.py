@@ -0,0 +1,215 @@
+"""
+Shared on-disk map tile store.
+Tiles for both the GUI map widget and the PDF basemap are kept in one
+SQLite file (same tiles table layout as tkintermapview's offline database,
+plus a last_used column), evicted least recently used first once the
+store grows past TILE_CACHE_MAX_BYTES. In offline mode tiles are only
+ever served from the store.
+"""
+
+import http.client
+import io
+import math
+import sqlite3
+import threading
+import time
+import urllib.request
+from pathlib import Path
+import numpy as np
+from . import config
+from . import geodesy
+
+TILE_SIZE = 256
+EARTH_CIRCUMFERENCE_M = 2 * math.pi * geodesy.EARTH_RADIUS_M
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tiles (
+    zoom INTEGER NOT NULL,
+    x INTEGER NOT NULL,
+    y INTEGER NOT NULL,
+    server VARCHAR(300) NOT NULL,
+    tile_image BLOB NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (zoom, x, y, server)
+);
+CREATE INDEX IF NOT EXISTS tiles_last_used ON tiles (last_used);
+"""
+
+def tile_range(lat_min, lon_min, lat_max, lon_max, zoom):
+    """Inclusive (x0, y0, x1, y1) of the tiles covering a lat/lon box at zoom."""
+    x0, y1 = lonlat_to_tile(lon_min, lat_min, zoom)
+    x1, y0 = lonlat_to_tile(lon_max, lat_max, zoom)
+    return x0, y0, x1, y1
+
+def lonlat_to_tile(lon, lat, zoom):
+    n = 2 ** zoom
+    lat = max(min(lat, geodesy.MAX_MERCATOR_LAT), -geodesy.MAX_MERCATOR_LAT)
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+def tile_bounds_mercator(x, y, zoom):
+    """(west, south, east, north) of a tile in Web Mercator metres."""
+    size = EARTH_CIRCUMFERENCE_M / 2 ** zoom
+    west = x * size - EARTH_CIRCUMFERENCE_M / 2
+    north = EARTH_CIRCUMFERENCE_M / 2 - y * size
+    return west, north - size, west + size, north
+
+class TileStore:
+    """
+    Tile bytes keyed by (server, zoom, x, y). Safe to share between threads:
+    each thread gets its own SQLite connection.
+    """
+
+    def __init__(self, path=None, max_bytes=None, offline=None):
+        self.path = str(path or config.TILE_CACHE_PATH)
+        self.max_bytes = config.TILE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.offline = config.TILES_OFFLINE if offline is None else offline
+        self._local = threading.local()
+        self._puts = 0
+        self._lock = threading.Lock()
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            self._local.db = db
+        return db
+
+    def lookup(self, server, zoom, x, y):
+        """Cached tile bytes or None, marking the tile as just used."""
+        db = self._connection()
+        row = db.execute('SELECT tile_image FROM tiles WHERE zoom=? AND x=? AND y=? AND server=?',
+                         (zoom, x, y, server)).fetchone()
+        if row is None:
+            return None
+        db.execute('UPDATE tiles SET last_used=? WHERE zoom=? AND x=? AND y=? AND server=?',
+                   (time.time(), zoom, x, y, server))
+        return row[0]
+
+    def put(self, server, zoom, x, y, data):
+        self._connection().execute('INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?, ?, ?)',
+                                   (zoom, x, y, server, sqlite3.Binary(data), time.time()))
+        with self._lock:
+            self._puts += 1
+            check = self._puts % config.TILE_EVICT_EVERY == 0
+        if check:
+            self.evict()
+
+    def get(self, server, zoom, x, y):
+        """Tile bytes from the store, downloading and storing them on a miss unless offline."""
+        data = self.lookup(server, zoom, x, y)
+        if data is not None or self.offline:
+            return data
+        data = fetch_tile(server, zoom, x, y)
+        if data is not None:
+            self.put(server, zoom, x, y, data)
+        return data
+
+    def size(self):
+        return self._connection().execute('SELECT COALESCE(SUM(LENGTH(tile_image)), 0) FROM tiles').fetchone()[0]
+
+    def usage(self):
+        """[(server, tile count, bytes), ...]"""
+        return self._connection().execute(
+            'SELECT server, COUNT(*), SUM(LENGTH(tile_image)) FROM tiles GROUP BY server').fetchall()
+
+    def evict(self, max_bytes=None):
+        """Deletes least recently used tiles until the store fits in max_bytes. Returns tiles removed."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        db = self._connection()
+        excess = self.size() - max_bytes
+        if excess <= 0:
+            return 0
+        removed = 0
+        for zoom, x, y, server, length in db.execute(
+                'SELECT zoom, x, y, server, LENGTH(tile_image) FROM tiles ORDER BY last_used').fetchall():
+            if excess <= 0:
+                break
+            db.execute('DELETE FROM tiles WHERE zoom=? AND x=? AND y=? AND server=?', (zoom, x, y, server))
+            excess -= length
+            removed += 1
+        return removed
+
+    def prefetch(self, server, box, zooms):
+        """
+        Downloads every missing tile covering box (lat_min, lon_min, lat_max, lon_max)
+        at each zoom. Returns (already cached, downloaded, failed) counts.
+        """
+        cached = downloaded = failed = 0
+        for zoom in zooms:
+            x0, y0, x1, y1 = tile_range(*box, zoom)
+            for x in range(x0, x1 + 1):
+                for y in range(y0, y1 + 1):
+                    if self.lookup(server, zoom, x, y) is not None:
+                        cached += 1
+                        continue
+                    data = None if self.offline else fetch_tile(server, zoom, x, y)
+                    if data is None:
+                        failed += 1
+                        continue
+                    self.put(server, zoom, x, y, data)
+                    downloaded += 1
+        self.evict()
+        return cached, downloaded, failed
+
+    def basemap(self, server, west, south, east, north, zoom):
+        """
+        Stitches the tiles covering a Web Mercator box into one RGB array.
+        Returns (image, (west, east, south, north)) for imshow and the
+        number of tiles that could not be had (left blank).
+        """
+        from PIL import Image
+
+        (lat_min, lat_max), (lon_min, lon_max) = geodesy.inverse_web_mercator([west, east], [south, north])
+        x0, y0, x1, y1 = tile_range(lat_min, lon_min, lat_max, lon_max, zoom)
+        image = np.full(((y1 - y0 + 1) * TILE_SIZE, (x1 - x0 + 1) * TILE_SIZE, 3), 255, dtype=np.uint8)
+        missing = 0
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                data = self.get(server, zoom, x, y)
+                try:
+                    tile = Image.open(io.BytesIO(data)).convert('RGB').resize((TILE_SIZE, TILE_SIZE))
+                except Exception:
+                    missing += 1
+                    continue
+                row, col = (y - y0) * TILE_SIZE, (x - x0) * TILE_SIZE
+                image[row:row + TILE_SIZE, col:col + TILE_SIZE] = np.asarray(tile)
+        left, _, _, top = tile_bounds_mercator(x0, y0, zoom)
+        _, bottom, right, _ = tile_bounds_mercator(x1, y1, zoom)
+        return image, (left, right, bottom, top), missing
+
+def zoom_for_extent(width_m, pixels, max_zoom=19):
+    """Zoom at which width_m metres of map span about `pixels` tile pixels."""
+    if width_m <= 0:
+        return max_zoom
+    zoom = math.log2(pixels * EARTH_CIRCUMFERENCE_M / (TILE_SIZE * width_m))
+    return int(min(max(round(zoom), 0), max_zoom))
+
+def fetch_tile(server, zoom, x, y):
+    """Downloads one tile; None on any network or HTTP error."""
+    url = server.replace('{x}', str(x)).replace('{y}', str(y)).replace('{z}', str(zoom))
+    request = urllib.request.Request(url, headers={'User-Agent': 'BirdHunt'})
+    try:
+        with urllib.request.urlopen(request, timeout=config.TILE_FETCH_TIMEOUT_SEC) as response:
+            if response.status != 200:
+                return None
+            data = response.read()
+    except (OSError, http.client.HTTPException, ValueError):
+        # URLError/HTTPError (e.g. 404) are OSErrors; ValueError is a malformed URL
+        return None
+    return data or None
+
+_store = None
+_store_lock = threading.Lock()
+
+def default_store():
+    """The process-wide TileStore at TILE_CACHE_PATH."""
+    global _store
+    with _store_lock:
+        if _store is None or _store.path != str(config.TILE_CACHE_PATH):
+            _store = TileStore()
+        return _store
@@ -0,0 +1,235 @@
+"""
+Fast pre-filtering reader for MAVLink .tlog files.
+Reads each record's 8-byte timestamp and the MAVLink v1/v2 header,
+and only hands frames whose msgid is wanted to pymavlink for decoding.
+"""
+
+import mmap
+import os
+import struct
+
+MARKER_V1 = 0xFE
+MARKER_V2 = 0xFD
+IFLAG_SIGNED = 0x01
+SIGNATURE_LEN = 13
+TIMESTAMP_LEN = 8
+MAX_RECORD_LEN = TIMESTAMP_LEN + 10 + 255 + 2 + SIGNATURE_LEN
+
+_timestamp = struct.Struct('>Q')
+
+def frame_info(buf, pos, end):
+    """
+    Inspects the record starting at pos (timestamp + frame header).
+    Returns (msgid, record_len), None if the record is truncated at end,
+    or raises ValueError if there is no MAVLink start marker after the timestamp.
+    """
+    header = pos + TIMESTAMP_LEN
+    if header >= end:
+        return None
+    marker = buf[header]
+    if marker == MARKER_V1:
+        if header + 6 > end:
+            return None
+        msgid = buf[header + 5]
+        frame_len = 6 + buf[header + 1] + 2
+    elif marker == MARKER_V2:
+        if header + 10 > end:
+            return None
+        msgid = buf[header + 7] | (buf[header + 8] << 8) | (buf[header + 9] << 16)
+        frame_len = 10 + buf[header + 1] + 2
+        if buf[header + 2] & IFLAG_SIGNED:
+            frame_len += SIGNATURE_LEN
+    else:
+        raise ValueError('no start marker')
+    return msgid, TIMESTAMP_LEN + frame_len
+
+def find_record_start(buf, pos, end, checks=4):
+    """
+    Resyncs on a record boundary: the first offset >= pos where a start
+    marker follows the 8-byte timestamp and `checks` consecutive records
+    chain cleanly (or run off the end of the buffer).
+    """
+    while pos + TIMESTAMP_LEN < end:
+        if buf[pos + TIMESTAMP_LEN] in (MARKER_V1, MARKER_V2) and _chains(buf, pos, end, checks):
+            return pos
+        pos += 1
+    return end
+
+def _chains(buf, pos, end, checks):
+    for _ in range(checks):
+        try:
+            info = frame_info(buf, pos, end)
+        except ValueError:
+            return False
+        if info is None:
+            return True
+        pos += info[1]
+        if pos >= end:
+            return True
+    return True
+
+def iter_records(buf, pos=0, end=None):
+    """
+    Yields (offset, timestamp, frame) for every record in buf, frame being
+    a slice of buf with the raw MAVLink bytes. Bytes that do not start a
+    record are stepped over.
+    """
+    end = len(buf) if end is None else end
+    while pos + TIMESTAMP_LEN < end:
+        try:
+            info = frame_info(buf, pos, end)
+        except ValueError:
+            pos += 1
+            continue
+        if info is None or pos + info[1] > end:
+            return
+        yield pos, _timestamp.unpack_from(buf, pos)[0] * 1.0e-6, buf[pos + TIMESTAMP_LEN:pos + info[1]]
+        pos += info[1]
+
+class TlogScanner:
+    """
+    Iterates decoded messages of the wanted msgids.
+    Frames of other types are skipped by header alone; frames that fail
+    to decode (bad CRC, bad length) or have no start marker count as
+    corrupt and the scanner resyncs on the next offset where several
+    records chain cleanly.
+    """
+
+    def __init__(self, log_file, mav, msgids, block_size=1 << 20, byte_range=None, backend='stream'):
+        """
+        byte_range: (start, stop) to scan only the records whose first byte
+        lies in [start, stop); scanning resyncs on the first record boundary
+        at or after start.
+        backend: 'stream' reads the file in block_size pieces; 'mmap' maps it
+        and walks records as memoryview slices, copying only decoded frames.
+        """
+        self.log_file = str(log_file)
+        self.mav = mav
+        self.msgids = frozenset(msgids)
+        self.block_size = block_size
+        self.byte_range = byte_range
+        self.backend = backend
+        self.decoded = 0
+        self.skipped = 0
+        self.corrupt = 0
+        self.bytes_consumed = 0
+        self.position = 0
+        self._base = 0
+        self.first_record = None
+        self.end_offset = None
+
+    def __iter__(self):
+        if self.backend == 'mmap':
+            yield from self._iter_mmap()
+        elif self.byte_range is not None:
+            yield from self._iter_range(*self.byte_range)
+        else:
+            yield from self._iter_stream()
+
+    def _iter_stream(self):
+        with open(self.log_file, 'rb') as f:
+            buf = b''
+            while True:
+                chunk = f.read(self.block_size)
+                final = not chunk
+                buf += chunk
+                self._base = self.bytes_consumed
+                pos = yield from self.walk(buf, 0, len(buf), final)
+                self.bytes_consumed += pos
+                buf = buf[pos:]
+                if final:
+                    break
+        self.first_record = 0
+        self.end_offset = self.bytes_consumed
+
+    def _iter_range(self, start, stop):
+        with open(self.log_file, 'rb') as f:
+            f.seek(start)
+            buf = f.read(stop - start + MAX_RECORD_LEN)
+        final = start + len(buf) < stop + MAX_RECORD_LEN
+        pos = find_record_start(buf, 0, len(buf)) if start > 0 else 0
+        self.first_record = start + pos
+        self._base = start
+        pos = yield from self.walk(buf, pos, len(buf), final, stop=stop - start)
+        self.bytes_consumed = pos
+        self.end_offset = start + pos
+
+    def _iter_mmap(self):
+        with open(self.log_file, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            start, stop = self.byte_range or (0, size)
+            if size == 0:
+                self.first_record = self.end_offset = 0
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    pos = find_record_start(view, start, size) if start > 0 else 0
+                    self.first_record = pos
+                    pos = yield from self.walk(view, pos, size, True, stop=stop)
+                    self.bytes_consumed = pos - self.first_record
+                    self.end_offset = pos
+                finally:
+                    view.release()
+
+    @staticmethod
+    def _resync(buf, pos, end, final):
+        """
+        Next record boundary after a bad record at pos. A lone marker byte
+        inside a payload is not enough: the records after it must chain (see
+        find_record_start), otherwise skipping unwanted frames by their length
+        byte would jump by garbage and lose wanted frames. When more data is
+        still to come, the last few bytes are kept for the next walk.
+        """
+        found = find_record_start(buf, pos + 1, end)
+        if final:
+            return found
+        return min(found, max(pos + 1, end - TIMESTAMP_LEN))
+
+    def walk(self, buf, pos, end, final=True, stop=None):
+        """
+        Yields messages from buf[pos:end] and returns the offset of the first
+        unconsumed byte (a partial record at the end when final is False).
+        Records starting at or after stop are left unconsumed.
+        position tracks the file offset reached, for progress reporting.
+        """
+        in_sync = True
+        base = self._base
+        decode = self.mav.decode
+        msgids = self.msgids
+        limit = end if stop is None else min(stop, end)
+        while pos < limit and pos + TIMESTAMP_LEN < end:
+            try:
+                info = frame_info(buf, pos, end)
+            except ValueError:
+                if in_sync:
+                    self.corrupt += 1
+                    in_sync = False
+                pos = self._resync(buf, pos, end, final)
+                continue
+            if info is None or pos + info[1] > end:
+                break
+            msgid, record_len = info
+            if msgid in msgids:
+                try:
+                    msg = decode(bytearray(buf[pos + TIMESTAMP_LEN:pos + record_len]))
+                except Exception:
+                    if in_sync:
+                        self.corrupt += 1
+                        in_sync = False
+                    pos = self._resync(buf, pos, end, final)
+                    continue
+                msg._timestamp = _timestamp.unpack_from(buf, pos)[0] * 1.0e-6
+                self.decoded += 1
+                in_sync = True
+                pos += record_len
+                self.position = base + pos
+                yield msg
+            else:
+                self.skipped += 1
+                in_sync = True
+                pos += record_len
+        if final and pos < limit:
+            self.corrupt += 1
+            pos = end
+        return pos
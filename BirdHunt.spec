@@ -6,8 +6,8 @@ a = Analysis(
     ['Main.py'],
     pathex=[],
     binaries=[],
-    datas=[('logo.png', '.'), ('Analysis', 'Analysis'), ('GUI', 'GUI')],
-    hiddenimports=['PIL._tkinter_finder', 'babel.numbers', 'tkintermapview', 'rasterio', 'rasterio.sample', 'fiona', 'shapely'],
+    datas=[('logo.png', '.'), ('Analysis', 'Analysis'), ('GUI', 'GUI'), ('CLI', 'CLI')],
+    hiddenimports=['PIL._tkinter_finder', 'babel.numbers', 'tkintermapview'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,111 @@
+"""
+Headless batch processing of a directory of .tlog files.
+Each log runs process_log_file and generate_pdf_export
+in its own worker process; one failing log does not stop the batch,
+even when it kills its worker process outright.
+"""
+
+import datetime
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+SUMMARY_FILE = 'batch_summary.json'
+
+def _process_one(log_path, out_dir):
+    """Worker: full pipeline for one log. Never raises; returns a status dict."""
+    import matplotlib
+    matplotlib.use('Agg')
+    from GUI import gui_helpers
+
+    log_path = Path(log_path)
+    result = {'file': str(log_path), 'status': 'ok', 'timings': {}}
+    start = time.perf_counter()
+    try:
+        t0 = time.perf_counter()
+        tables, stats, timeline = gui_helpers.process_log_file(log_path, jobs=1)
+        result['timings']['process_sec'] = time.perf_counter() - t0
+
+        pdf_path = Path(out_dir) / f'{log_path.stem}.forensic.pdf'
+        t0 = time.perf_counter()
+        gui_helpers.generate_pdf_export(
+            output_pdf_path=pdf_path,
+            log_file_name=log_path.name,
+            summary_stats=stats,
+            timeline_data=timeline,
+            tables=tables,
+            log_file_path=log_path
+        )
+        result['timings']['pdf_sec'] = time.perf_counter() - t0
+        result['pdf'] = str(pdf_path)
+        result['flight_duration_sec'] = float(stats.get('duration_sec', 0))
+        result['events'] = len(timeline)
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['total_sec'] = time.perf_counter() - start
+    return result
+
+def find_logs(log_dir, recursive=False):
+    pattern = '**/*.tlog' if recursive else '*.tlog'
+    return sorted(p for p in Path(log_dir).glob(pattern) if p.is_file())
+
+def run_batch(log_dir, out_dir, jobs=1, recursive=False):
+    """Processes every log in log_dir and writes SUMMARY_FILE into out_dir."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    logs = find_logs(log_dir, recursive)
+    print(f"Batch: {len(logs)} logs from {log_dir} with {jobs} workers")
+
+    started = datetime.datetime.now(datetime.timezone.utc)
+    start = time.perf_counter()
+    results = []
+    # One single-worker pool per job: a log that kills its worker (a segfault, the
+    # OOM killer) breaks only its own pool, so the crash is pinned on that log and
+    # the pool is rebuilt for the logs still queued, instead of failing them all
+    queue = list(logs)
+    idle = [ProcessPoolExecutor(max_workers=1) for _ in range(max(1, min(jobs, len(logs))))]
+    running = {}
+    try:
+        while queue or running:
+            while idle and queue:
+                pool, log = idle.pop(), queue.pop(0)
+                running[pool.submit(_process_one, str(log), str(out_dir))] = pool, log
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                pool, log = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'file': str(log), 'status': 'failed',
+                              'error': f"Worker crashed: {type(e).__name__}: {e}", 'timings': {}}
+                    if isinstance(e, BrokenProcessPool):
+                        pool.shutdown(wait=False)
+                        pool = ProcessPoolExecutor(max_workers=1)
+                idle.append(pool)
+                results.append(result)
+                print(f"[{len(results)}/{len(logs)}] {result['status'].upper()}: {result['file']}"
+                      + (f" ({result['error']})" if result['status'] != 'ok' else ''))
+    finally:
+        for pool in idle + [pool for pool, _ in running.values()]:
+            pool.shutdown(cancel_futures=True)
+
+    results.sort(key=lambda r: r['file'])
+    failed = sum(r['status'] != 'ok' for r in results)
+    summary = {
+        'started_utc': started.isoformat(),
+        'log_dir': str(log_dir),
+        'out_dir': str(out_dir),
+        'jobs': jobs,
+        'total': len(results),
+        'succeeded': len(results) - failed,
+        'failed': failed,
+        'wall_sec': time.perf_counter() - start,
+        'files': results,
+    }
+    summary_path = out_dir / SUMMARY_FILE
+    summary_path.write_text(json.dumps(summary, indent=2))
+    print(f"Batch complete: {summary['succeeded']} ok, {failed} failed. Summary: {summary_path}")
+    return summary
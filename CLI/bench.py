@@ -0,0 +1,193 @@
+"""
+End-to-end pipeline benchmark: times and memory-profiles each stage
+(parse, DataFrame build, timeline, stats, plots, map, PDF) on one log and
+compares the result with this machine's stored baselines; with --check a
+stage that regresses past the threshold fails the run. Without a log it
+benchmarks a synthetic one (see synth.py).
+Parsing always bypasses the disk cache and the map is rendered from an
+empty, offline tile store so runs are repeatable.
+"""
+
+import gc
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from Analysis import config
+
+STAGES = ['parse', 'dataframe', 'timeline', 'stats', 'plots', 'map', 'pdf']
+
+def _pipeline(log_file, scratch, jobs, backend):
+    """Yields (stage, function) in order; each function runs one stage on the previous stages' output."""
+    from Analysis import log_converter, analysis, plotting, reporting
+    from Analysis.column_store import MessageTables
+    from GUI import gui_helpers
+
+    state = {}
+
+    def parse():
+        state['tables'] = log_converter.TlogParser(log_file, backend=backend).to_tables(jobs=jobs)
+
+    def dataframe():
+        # wide() is built once per MessageTables, so time it on a fresh one over the same columns
+        tables = state['tables']
+        MessageTables(tables.fields, tables.kinds, tables.columns, tables.row_timestamps).wide()
+
+    def timeline():
+        state['timeline'] = analysis.calculate_timeline_events(state['tables'])
+
+    def stats():
+        state['stats'] = analysis.calculate_summary_stats(state['tables'])
+
+    def plots():
+        state['alt'], _ = gui_helpers.render_plot(plotting.plot_altitude, state['tables'], scratch / 'alt.png')
+        state['rc'], _ = gui_helpers.render_plot(plotting.plot_rc_channels, state['tables'], scratch / 'rc.png')
+
+    def map_():
+        state['map'], _ = gui_helpers.render_map(state['tables'], scratch / 'map.png')
+
+    def pdf():
+        reporting.generate_forensic_report(str(scratch / 'report.pdf'), Path(log_file).name, state['stats'],
+                                           state['timeline'], state['map'], state['alt'], state['rc'])
+
+    return list(zip(STAGES, [parse, dataframe, timeline, stats, plots, map_, pdf]))
+
+def _run_once(log_file, jobs, memory, backend):
+    """{stage: seconds} or, with memory, {stage: peak traced MB} for one pass over the pipeline."""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='birdhunt_bench_') as scratch:
+        for stage, func in _pipeline(log_file, Path(scratch), jobs, backend):
+            gc.collect()
+            if memory:
+                tracemalloc.start()
+                func()
+                results[stage] = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+                tracemalloc.stop()
+            else:
+                start = time.perf_counter()
+                func()
+                results[stage] = time.perf_counter() - start
+    return results
+
+def measure(log_file, repeat=3, jobs=1, memory=True, backend=None):
+    """
+    {stage: {'seconds': best of repeat timed passes, 'peak_mb': ...}}.
+    backend: TlogParser reader backend, READER_BACKEND by default.
+    The best run is the one least disturbed by the rest of the machine.
+    Memory is traced in a separate pass, since tracemalloc slows Python-heavy
+    stages down too much to time them at the same time.
+    """
+    backend = backend or config.READER_BACKEND
+    # An empty offline tile store: the basemap costs the same on every run and machine
+    saved = config.TILE_CACHE_PATH, config.TILES_OFFLINE
+    with tempfile.TemporaryDirectory(prefix='birdhunt_bench_tiles_') as tiles:
+        config.TILE_CACHE_PATH, config.TILES_OFFLINE = Path(tiles) / 'tiles.db', True
+        try:
+            timed = [_run_once(log_file, jobs, False, backend) for _ in range(repeat)]
+            peaks = _run_once(log_file, jobs, True, backend) if memory else {}
+        finally:
+            config.TILE_CACHE_PATH, config.TILES_OFFLINE = saved
+    results = {}
+    for stage in STAGES:
+        results[stage] = {'seconds': min(run[stage] for run in timed)}
+        if stage in peaks:
+            results[stage]['peak_mb'] = peaks[stage]
+    return results
+
+def compare(results, baseline, threshold):
+    """Lines describing each stage against its baseline, and whether any stage regressed."""
+    lines = []
+    regressed = False
+    for stage in STAGES:
+        now, base = results.get(stage, {}), baseline.get(stage, {})
+        parts = []
+        for metric, unit, floor in (('seconds', 's', config.BENCH_MIN_SECONDS), ('peak_mb', ' MB', config.BENCH_MIN_MB)):
+            if metric not in now:
+                continue
+            text = f"{now[metric]:.2f}{unit}"
+            if metric in base:
+                ratio = now[metric] / base[metric] if base[metric] else float('inf')
+                text += f" ({base[metric]:.2f}{unit} baseline, {ratio - 1:+.0%})"
+                # Small absolute changes are noise, however large the ratio
+                if now[metric] > base[metric] * (1 + threshold) and now[metric] - base[metric] > floor:
+                    text += " REGRESSED"
+                    regressed = True
+            parts.append(text)
+        lines.append(f"  {stage:<10} " + ", ".join(parts))
+    return lines, regressed
+
+def _load_baselines(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _host():
+    return platform.node() or 'unknown'
+
+def synthetic_name(size, seed):
+    return f"synthetic-{size}-seed{seed}"
+
+def stored_baseline(name, baselines=None):
+    """{stage: metrics} recorded for name on this machine, {} if there is none."""
+    stored = _load_baselines(Path(baselines or config.BENCH_BASELINES))
+    return stored.get(_host(), {}).get(name, {}).get('stages', {})
+
+def run(log_file=None, size='20MB', seed=0, baselines=None, name=None, threshold=None,
+        repeat=3, jobs=1, memory=True, update=False, backend=None, check=False):
+    """
+    Benchmarks one log (or a synthetic one of `size`) and prints it against
+    this machine's baseline. Returns the exit code: with check, 1 on a
+    regression; a missing baseline skips the check instead of failing it.
+    """
+    from . import synth
+
+    baselines = Path(baselines or config.BENCH_BASELINES)
+    threshold = config.BENCH_THRESHOLD if threshold is None else threshold
+    backend = backend or config.READER_BACKEND
+    derived_name = name is None
+    with tempfile.TemporaryDirectory(prefix='birdhunt_bench_log_') as workdir:
+        if log_file is None:
+            log_file = Path(workdir) / 'synthetic.tlog'
+            name = name or synthetic_name(size, seed)
+            print(f"Generating {size} synthetic log...")
+            synth.generate(log_file, synth.parse_size(size), seed=seed)
+        name = name or Path(log_file).name
+        if derived_name and backend != config.READER_BACKEND:
+            # Parse times differ per reader, so each keeps its own baseline
+            name += f"-{backend}"
+        print(f"Benchmarking {name} ({os.path.getsize(log_file) / 1024 ** 2:.1f} MB, "
+              f"{repeat} run(s), {jobs} parse job(s), {backend} reader)...")
+        results = measure(log_file, repeat=repeat, jobs=jobs, memory=memory, backend=backend)
+
+    # Timings only compare on the machine that recorded them, so baselines are kept per host
+    host = _host()
+    stored = _load_baselines(baselines)
+    baseline = stored.get(host, {}).get(name, {}).get('stages', {})
+    lines, regressed = compare(results, baseline, threshold)
+    print(f"Results for {name} on {host}" + ("" if baseline else " (no baseline yet)") + ":")
+    print("\n".join(lines))
+
+    if update:
+        stored.setdefault(host, {})[name] = {'machine': platform.platform(), 'python': platform.python_version(),
+                                             'recorded': time.strftime('%Y-%m-%d'), 'stages': results}
+        baselines.parent.mkdir(parents=True, exist_ok=True)
+        with open(baselines, 'w') as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+        print(f"Baseline for {name} on {host} written to {baselines}")
+        return 0
+    if not check:
+        return 0
+    if not baseline:
+        print(f"SKIP: no baseline for {name} on {host}, record one with --update")
+        return 0
+    if regressed:
+        print(f"FAIL: at least one stage is more than {threshold:.0%} slower or larger than its baseline")
+        return 1
+    print("PASS")
+    return 0
@@ -0,0 +1,187 @@
+"""
+Flight catalog maintenance and queries: index a directory of logs
+(incrementally, in worker processes) and search the catalog without
+reparsing anything. Commands return the process exit code.
+"""
+
+import datetime
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from Analysis import config
+from Analysis.catalog import default_catalog
+
+def parse_duration(text):
+    """'90', '90s', '30m' or '1.5h' -> seconds."""
+    text = str(text).strip().lower()
+    scale = {'s': 1, 'm': 60, 'h': 3600}.get(text[-1:], None)
+    return float(text[:-1]) * scale if scale else float(text)
+
+def parse_time(text):
+    """ISO date or date-time (UTC unless it carries an offset) -> UNIX seconds."""
+    value = datetime.datetime.fromisoformat(text)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
+
+def _format_utc(unix_time):
+    if unix_time is None:
+        return f"{'no UTC time':<19}"
+    return datetime.datetime.fromtimestamp(unix_time, datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+def _open_catalog(must_exist=True):
+    """The catalog, or None after saying why there is none to use."""
+    if config.CATALOG_PATH is None:
+        print("Catalog is disabled (CATALOG_PATH is None).")
+        return None
+    # Opening a missing catalog would silently create an empty one
+    if must_exist and not Path(config.CATALOG_PATH).is_file():
+        print(f"No catalog at {config.CATALOG_PATH}. Run 'catalog index <log dir>' first.")
+        return None
+    return default_catalog()
+
+def _index_one(log_path, force):
+    """Worker: brings one log's catalog entry up to date. Never raises; returns (status, detail)."""
+    import matplotlib
+    matplotlib.use('Agg')
+    from Analysis import cache
+    from GUI import gui_helpers
+
+    try:
+        flights = default_catalog()
+        row = flights.lookup(log_path)
+        file_hash = cache.file_hash(log_path)
+        if row is not None and not force and row['file_hash'] == file_hash:
+            flights.touch(log_path)
+            return 'unchanged', ''
+        twin = None if force else flights.lookup_hash(file_hash, exclude=log_path)
+        if twin is not None:
+            # Same bytes as a log already catalogued: copy its entry instead of parsing again
+            flights.record_copy(log_path, twin)
+            return 'unchanged', f"same content as {twin['path']}"
+        current = flights.is_current(log_path)
+        # process_log_file records the log itself unless its entry is current
+        tables, stats, timeline = gui_helpers.process_log_file(log_path, jobs=1)
+        if current:
+            flights.record(log_path, file_hash, tables, stats, timeline)
+        return 'indexed', f"{float(stats.get('duration_sec', 0)):.0f}s, {len(timeline)} events"
+    except Exception as e:
+        return 'failed', f"{type(e).__name__}: {e}"
+
+def index_directory(log_dir, recursive=False, jobs=1, force=False):
+    """Catalogs every .tlog in log_dir, skipping logs whose size and mtime are unchanged. Returns the failure count."""
+    from .batch import find_logs
+
+    flights = _open_catalog(must_exist=False)
+    if flights is None:
+        return 1
+    logs = find_logs(log_dir, recursive)
+    todo = [log for log in logs if force or not flights.is_current(log)]
+    print(f"Catalog: {len(logs)} logs in {log_dir}, {len(logs) - len(todo)} unchanged, "
+          f"{len(todo)} to check with {jobs} workers")
+
+    start = time.perf_counter()
+    counts = {'indexed': 0, 'unchanged': len(logs) - len(todo), 'failed': 0}
+    with ProcessPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = {pool.submit(_index_one, str(log), force): log for log in todo}
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                status, detail = future.result()
+            except Exception as e:
+                status, detail = 'failed', f"Worker crashed: {type(e).__name__}: {e}"
+            counts[status] += 1
+            print(f"[{done}/{len(todo)}] {status.upper()}: {futures[future]}" + (f" ({detail})" if detail else ''))
+    print(f"Catalog updated in {time.perf_counter() - start:.1f}s: {counts['indexed']} indexed, "
+          f"{counts['unchanged']} unchanged, {counts['failed']} failed. {flights.count()} flights at {flights.path}")
+    return counts['failed']
+
+def query(mode=None, event=None, min_duration=None, max_duration=None, after=None, before=None,
+          name=None, limit=None, as_json=False, with_events=False):
+    flights = _open_catalog()
+    if flights is None:
+        return 1
+    start = time.perf_counter()
+    rows = flights.find(mode=mode, event=event,
+                        min_duration=None if min_duration is None else parse_duration(min_duration),
+                        max_duration=None if max_duration is None else parse_duration(max_duration),
+                        after=None if after is None else parse_time(after),
+                        before=None if before is None else parse_time(before),
+                        name=name, limit=limit)
+    elapsed = time.perf_counter() - start
+    for row in rows:
+        row['modes'] = flights.modes(row['id'])
+        if with_events:
+            row['events'] = flights.events(row['id'])
+
+    if as_json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    for row in rows:
+        alt = '' if row['max_rel_alt_m'] is None else f"{row['max_rel_alt_m']:6.0f} m"
+        print(f"{_format_utc(row['start_utc'])}  {row['duration_sec'] / 60:7.1f} min  {alt:>8}  "
+              f"{','.join(row['modes']) or '-':<30}  {row['path']}")
+        for event in row.get('events', []):
+            when = _format_utc(event['utc']) if event['utc'] is not None else f"log time {event['log_time']:.1f}"
+            print(f"    {when}  {event['label']}")
+    print(f"{len(rows)} flight(s) of {flights.count()} ({elapsed * 1000:.1f} ms)")
+    return 0
+
+def parse_polygon(text):
+    """'lat,lon;lat,lon;...' -> [(lat, lon), ...]"""
+    polygon = [tuple(float(v) for v in vertex.split(',')) for vertex in text.split(';') if vertex.strip()]
+    if len(polygon) < 3 or any(len(vertex) != 2 for vertex in polygon):
+        raise ValueError(f"Polygon needs three or more 'lat,lon' vertices: {text!r}")
+    return polygon
+
+def _print_spans(spans, elapsed, as_json):
+    if as_json:
+        print(json.dumps(spans, indent=2))
+        return 0
+    for span in spans:
+        closest = f"{span['min_distance_m']:6.0f} m" if 'min_distance_m' in span else ''
+        print(f"{_format_utc(span['start_utc'])} - {_format_utc(span['end_utc'])[11:]}  "
+              f"{span['end_utc'] - span['start_utc']:7.1f} s  {closest:>8}  {span['path']}")
+    print(f"{len(spans)} span(s) in {len({s['flight_id'] for s in spans})} flight(s) ({elapsed * 1000:.1f} ms)")
+    return 0
+
+def near(lat, lon, radius_m, after=None, before=None, as_json=False):
+    flights = _open_catalog()
+    if flights is None:
+        return 1
+    start = time.perf_counter()
+    spans = flights.near(lat, lon, radius_m,
+                                   after=None if after is None else parse_time(after),
+                                   before=None if before is None else parse_time(before))
+    return _print_spans(spans, time.perf_counter() - start, as_json)
+
+def within(bbox=None, polygon=None, after=None, before=None, as_json=False):
+    """bbox: (south, west, north, east); polygon: 'lat,lon;lat,lon;...'"""
+    after = None if after is None else parse_time(after)
+    before = None if before is None else parse_time(before)
+    flights = _open_catalog()
+    if flights is None:
+        return 1
+    start = time.perf_counter()
+    if bbox is not None:
+        spans = flights.within_bbox(*bbox, after=after, before=before)
+    else:
+        spans = flights.within_polygon(parse_polygon(polygon), after=after, before=before)
+    return _print_spans(spans, time.perf_counter() - start, as_json)
+
+def modes():
+    flights = _open_catalog()
+    if flights is None:
+        return 1
+    for mode, count in flights.modes():
+        print(f"{mode:<20} {count} flight(s)")
+    return 0
+
+def prune():
+    flights = _open_catalog()
+    if flights is None:
+        return 1
+    removed = flights.prune()
+    print(f"Removed {removed} catalog entries for missing logs.")
+    return 0
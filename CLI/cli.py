@@ -0,0 +1,217 @@
+"""
+Headless command line for BirdHunt.
+Run as `BirdHunt <command>` (packaged app), `python Main.py <command>`
+or `python -m CLI <command>`. Nothing here imports Tk.
+"""
+
+import argparse
+import os
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='birdhunt', description='BirdHunt Forensic Analyzer (headless)')
+    parser.add_argument('--offline', action='store_true', help='Serve map tiles only from the local tile store')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    batch = commands.add_parser('batch', help='Process every .tlog in a directory into PDF reports')
+    batch.add_argument('log_dir', help='Directory containing .tlog files')
+    batch.add_argument('--out', default='Exports', help='Output directory for reports and the summary JSON')
+    batch.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Number of worker processes')
+    batch.add_argument('--recursive', action='store_true', help='Also search subdirectories')
+    batch.set_defaults(handler=_run_batch)
+
+    startup = commands.add_parser('startup-bench', help='Time the GUI cold start and check it against a budget')
+    startup.add_argument('--budget', type=float, default=None, help='Seconds allowed to the first window')
+    startup.add_argument('--runs', type=int, default=3)
+    startup.add_argument('--app', default=None, help='Packaged executable to launch instead of Main.py')
+    startup.set_defaults(handler=_run_startup_bench)
+
+    synth = commands.add_parser('synth', help='Write a synthetic .tlog for benchmarking')
+    synth.add_argument('out', help='Output .tlog path')
+    synth.add_argument('--size', default='100MB', help='Target size, e.g. 1MB, 500MB, 4GB')
+    synth.add_argument('--seed', type=int, default=0)
+    synth.add_argument('--rate', action='append', metavar='TYPE=HZ',
+                       help='Override a message rate (0 drops the type); repeatable')
+    synth.add_argument('--mavlink', type=int, choices=[1, 2], default=2, help='MAVLink wire protocol version')
+    synth.set_defaults(handler=_run_synth)
+
+    bench = commands.add_parser('bench', help='Time and memory-profile each pipeline stage against baselines')
+    bench.add_argument('log_file', nargs='?', help='Log to benchmark (default: a synthetic log of --size)')
+    bench.add_argument('--size', default='20MB', help='Size of the synthetic log')
+    bench.add_argument('--seed', type=int, default=0)
+    bench.add_argument('--name', default=None, help='Baseline entry name (default: derived from the log)')
+    bench.add_argument('--baselines', default=None, help='Baselines JSON (default BENCH_BASELINES)')
+    bench.add_argument('--threshold', type=float, default=None, help='Allowed slowdown, e.g. 0.25 for 25%%')
+    bench.add_argument('--repeat', type=int, default=3, help='Timed runs per stage (the fastest is kept)')
+    bench.add_argument('--jobs', type=int, default=1, help='Parser worker processes')
+    bench.add_argument('--backend', choices=['mmap', 'stream'], default=None,
+                       help='Parser reader backend (default READER_BACKEND)')
+    bench.add_argument('--no-memory', action='store_true', help='Skip the memory-tracing pass')
+    bench.add_argument('--update', action='store_true', help='Record the results as the new baseline')
+    bench.add_argument('--check', action='store_true',
+                       help='Exit with status 1 on a regression (skipped when this machine has no baseline)')
+    bench.set_defaults(handler=_run_bench)
+
+    window = commands.add_parser('window', help='Timeline and report for one time window of a log, without parsing the rest')
+    window.add_argument('log_file')
+    window.add_argument('--start', help='Seconds into the log (90, 2m, 1.5h) or a UTC date-time (ISO format)')
+    window.add_argument('--end', help='Same forms as --start')
+    window.add_argument('--out', help='Also export the window to this PDF')
+    window.add_argument('--jobs', type=int, default=None, help='Parser worker processes (default: all cores for large windows)')
+    window.set_defaults(handler=_run_window)
+
+    resample = commands.add_parser('resample', help='Align message fields onto a common time grid and write them as CSV')
+    resample.add_argument('log_file')
+    resample.add_argument('series', nargs='*', help='TYPE.field or TYPE (all its fields); default every numeric field')
+    resample.add_argument('--rate', type=float, default=None, help='Grid rate in Hz (default RESAMPLE_RATE_HZ)')
+    resample.add_argument('--method', action='append', metavar='[NAME=]METHOD',
+                          help='previous, nearest or linear, for everything or for one TYPE / TYPE.field; repeatable')
+    resample.add_argument('--max-age', action='append', metavar='[NAME=]SEC',
+                          help='Leave a gap where the samples are older than this; repeatable like --method')
+    resample.add_argument('--out', help='Output CSV (default: <log>.resampled.csv)')
+    resample.add_argument('--jobs', type=int, default=None, help='Parser worker processes (default: all cores for large logs)')
+    resample.set_defaults(handler=_run_resample)
+
+    convert = commands.add_parser('convert', help='Stream a log into Parquet or Arrow IPC files in bounded memory')
+    convert.add_argument('log_file')
+    convert.add_argument('--format', choices=['parquet', 'arrow'], default='parquet')
+    convert.add_argument('--layout', choices=['wide', 'tables'], default='wide',
+                         help='wide: one forward-filled file; tables: one file per message type in a directory')
+    convert.add_argument('--out', help='Output file (wide) or directory (tables); default next to the log')
+    convert.add_argument('--batch-rows', type=int, default=None, help='Rows per row group / record batch (default EXPORT_BATCH_ROWS)')
+    convert.add_argument('--start', help='Only from this point: seconds into the log (90, 2m) or a UTC date-time')
+    convert.add_argument('--end', help='Only up to this point, same forms as --start')
+    convert.set_defaults(handler=_run_convert)
+
+    replay = commands.add_parser('replay', help='Replay a .tlog over UDP or into a growing file (live mode testing)')
+    replay.add_argument('log_file')
+    replay.add_argument('--udp', metavar='HOST:PORT', help='Send each frame as a UDP datagram')
+    replay.add_argument('--append-to', metavar='TLOG', help='Append records to this file as they come due')
+    replay.add_argument('--speed', type=float, default=1.0, help='Playback speed factor; 0 sends as fast as possible')
+    replay.set_defaults(handler=_run_replay)
+
+    tiles = commands.add_parser('tiles', help='Manage the offline map tile store')
+    tile_commands = tiles.add_subparsers(dest='tiles_command', required=True)
+    prefetch = tile_commands.add_parser('prefetch', help="Download the tiles around a flight's track")
+    prefetch.add_argument('log_file')
+    prefetch.add_argument('--zooms', default='12-18', help='Zoom level or range, e.g. 12-18')
+    prefetch.add_argument('--server', choices=['map', 'export', 'both'], default='both',
+                          help='GUI map tiles, PDF basemap tiles, or both')
+    prefetch.add_argument('--margin', type=float, default=0.5, help='Extra area around the track, as a fraction of its size')
+    tile_commands.add_parser('info', help='Show what the tile store holds')
+    evict = tile_commands.add_parser('evict', help='Trim the tile store, least recently used tiles first')
+    evict.add_argument('--max-mb', type=float, default=None, help='Target size (default TILE_CACHE_MAX_BYTES)')
+    tiles.set_defaults(handler=_run_tiles)
+
+    catalog = commands.add_parser('catalog', help='Index logs into the flight catalog and search it')
+    catalog_commands = catalog.add_subparsers(dest='catalog_command', required=True)
+    index = catalog_commands.add_parser('index', help='Catalog every .tlog in a directory (unchanged logs are skipped)')
+    index.add_argument('log_dir')
+    index.add_argument('--recursive', action='store_true', help='Also search subdirectories')
+    index.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Number of worker processes')
+    index.add_argument('--force', action='store_true', help='Reprocess logs even if they look unchanged')
+    query = catalog_commands.add_parser('query', help='List catalogued flights matching every given filter')
+    query.add_argument('--mode', help='Flew in this mode, e.g. AUTO')
+    query.add_argument('--event', help='Has a timeline event containing this text, e.g. Takeoff')
+    query.add_argument('--min-duration', help='e.g. 30m, 1h, 90s')
+    query.add_argument('--max-duration')
+    query.add_argument('--after', help='Flight ends after this UTC date/time (ISO format)')
+    query.add_argument('--before', help='Flight starts before this UTC date/time (ISO format)')
+    query.add_argument('--name', help='File name pattern (SQL LIKE, e.g. %%_survey%%)')
+    query.add_argument('--limit', type=int)
+    query.add_argument('--events', action='store_true', help='Also list each flight\'s timeline')
+    query.add_argument('--json', action='store_true', help='Print the results as JSON')
+    near = catalog_commands.add_parser('near', help='Flights that came within a radius of a point, with the times they did')
+    near.add_argument('lat', type=float)
+    near.add_argument('lon', type=float)
+    near.add_argument('--radius', type=float, default=100.0, help='Metres (default 100)')
+    within = catalog_commands.add_parser('within', help='Flights that entered an area, with the times they did')
+    area = within.add_mutually_exclusive_group(required=True)
+    area.add_argument('--bbox', type=float, nargs=4, metavar=('S', 'W', 'N', 'E'), help='Latitude/longitude box')
+    area.add_argument('--polygon', metavar='LAT,LON;LAT,LON;...', help='Polygon vertices (three or more); write --polygon="..." when it starts with a minus sign')
+    for spatial in (near, within):
+        spatial.add_argument('--after', help='Only time spent after this UTC date/time (ISO format)')
+        spatial.add_argument('--before', help='Only time spent before this UTC date/time (ISO format)')
+        spatial.add_argument('--json', action='store_true', help='Print the results as JSON')
+    catalog_commands.add_parser('modes', help='Flight modes seen across the catalog')
+    catalog_commands.add_parser('prune', help='Drop entries for logs that no longer exist')
+    catalog.set_defaults(handler=_run_catalog)
+
+    return parser
+
+def _run_catalog(args):
+    from . import catalog
+    if args.catalog_command == 'index':
+        return 0 if catalog.index_directory(args.log_dir, args.recursive, args.jobs, args.force) == 0 else 1
+    if args.catalog_command == 'query':
+        return catalog.query(args.mode, args.event, args.min_duration, args.max_duration, args.after, args.before,
+                             args.name, args.limit, as_json=args.json, with_events=args.events)
+    if args.catalog_command == 'near':
+        return catalog.near(args.lat, args.lon, args.radius, args.after, args.before, as_json=args.json)
+    if args.catalog_command == 'within':
+        return catalog.within(bbox=args.bbox, polygon=args.polygon, after=args.after, before=args.before,
+                              as_json=args.json)
+    if args.catalog_command == 'modes':
+        return catalog.modes()
+    return catalog.prune()
+
+def _run_tiles(args):
+    from . import tiles
+    if args.tiles_command == 'prefetch':
+        return 0 if tiles.prefetch(args.log_file, tiles.parse_zooms(args.zooms), args.server, args.margin) == 0 else 1
+    if args.tiles_command == 'info':
+        tiles.info()
+    else:
+        tiles.evict(args.max_mb)
+    return 0
+
+def _run_window(args):
+    from . import window
+    return window.run(args.log_file, args.start, args.end, args.out, args.jobs)
+
+def _run_resample(args):
+    from . import resample
+    return resample.run(args.log_file, args.series or None, args.rate, args.method, args.max_age, args.out, args.jobs)
+
+def _run_convert(args):
+    from . import convert
+    return convert.run(args.log_file, args.format, args.layout, args.out, args.batch_rows, args.start, args.end)
+
+def _run_replay(args):
+    from . import replay
+    if not args.udp and not args.append_to:
+        print("replay: give --udp and/or --append-to")
+        return 2
+    replay.replay(args.log_file, udp=args.udp, append_to=args.append_to, speed=args.speed)
+    return 0
+
+def _run_synth(args):
+    from . import synth
+    written, messages, flights = synth.generate(args.out, synth.parse_size(args.size), synth.parse_rates(args.rate),
+                                                seed=args.seed, mavlink_version=args.mavlink)
+    print(f"Wrote {args.out}: {written / 1024 ** 2:.1f} MB, {messages} messages, {flights} flight(s)")
+    return 0
+
+def _run_bench(args):
+    from . import bench
+    return bench.run(args.log_file, size=args.size, seed=args.seed, baselines=args.baselines, name=args.name,
+                     threshold=args.threshold, repeat=args.repeat, jobs=args.jobs,
+                     memory=not args.no_memory, update=args.update, backend=args.backend,
+                     check=args.check)
+
+def _run_startup_bench(args):
+    from . import startup_bench
+    return startup_bench.run(budget=args.budget, runs=args.runs, app=args.app)
+
+def _run_batch(args):
+    from . import batch
+    summary = batch.run_batch(args.log_dir, args.out, jobs=args.jobs, recursive=args.recursive)
+    return 0 if summary['failed'] == 0 else 1
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.offline:
+        # Environment too, so batch worker processes pick it up when they import config
+        os.environ['BIRDHUNT_OFFLINE'] = '1'
+        from Analysis import config
+        config.TILES_OFFLINE = True
+    return args.handler(args)
@@ -0,0 +1,37 @@
+"""
+Converts a log to Parquet or Arrow IPC for downstream tools, streaming it
+in fixed-size batches (see Analysis/columnar_export.py) so even multi-GB
+logs convert in bounded memory.
+"""
+
+import time
+from pathlib import Path
+
+from Analysis import columnar_export
+from Analysis import seek_index
+from .window import parse_bound
+
+def default_out(log_file, fmt, layout):
+    log_file = Path(log_file)
+    if layout == 'tables':
+        return log_file.with_name(f'{log_file.stem}_{fmt}')
+    return log_file.with_suffix(columnar_export.FORMATS[fmt])
+
+def run(log_file, fmt='parquet', layout='wide', out=None, batch_rows=None, start=None, end=None):
+    begin = time.perf_counter()
+    out = Path(out) if out else default_out(log_file, fmt, layout)
+    try:
+        time_range = None
+        if start is not None or end is not None:
+            log_start = seek_index.load_or_build(log_file).start_time
+            time_range = (None if start is None else parse_bound(start, log_start),
+                          None if end is None else parse_bound(end, log_start))
+        written = columnar_export.export(log_file, out, fmt, layout, batch_rows, time_range)
+    except Exception as e:
+        print(f"Conversion failed: {e}")
+        return 1
+
+    for path, rows in written.items():
+        print(f"  {path}: {rows} rows")
+    print(f"Converted {Path(log_file).name} to {fmt} ({layout}) in {time.perf_counter() - begin:.2f}s")
+    return 0
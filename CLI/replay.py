@@ -0,0 +1,52 @@
+"""
+Replays a recorded .tlog in (scaled) real time, either as UDP datagrams
+or by appending records to a growing .tlog, to feed BirdHunt's live mode.
+"""
+
+import socket
+import time
+from Analysis import tlog_scanner
+
+def _parse_target(target):
+    host, _, port = target.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+def replay(log_file, udp=None, append_to=None, speed=1.0):
+    """
+    Sends every record of log_file, sleeping so the gaps between their
+    timestamps are kept (divided by speed; speed <= 0 sends as fast as possible).
+    Returns the number of records sent.
+    """
+    with open(log_file, 'rb') as f:
+        data = f.read()
+    sock = out = None
+    if udp:
+        address = _parse_target(udp)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    if append_to:
+        out = open(append_to, 'ab')
+
+    sent = 0
+    first_timestamp = None
+    start = time.perf_counter()
+    try:
+        for offset, timestamp, frame in tlog_scanner.iter_records(data):
+            if first_timestamp is None:
+                first_timestamp = timestamp
+            if speed > 0:
+                delay = (timestamp - first_timestamp) / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            if sock is not None:
+                sock.sendto(frame, address)
+            if out is not None:
+                out.write(data[offset:offset + tlog_scanner.TIMESTAMP_LEN + len(frame)])
+                out.flush()
+            sent += 1
+    finally:
+        if sock is not None:
+            sock.close()
+        if out is not None:
+            out.close()
+    print(f"Replayed {sent} records from {log_file}")
+    return sent
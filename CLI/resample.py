@@ -0,0 +1,39 @@
+"""
+Aligns chosen message fields of a log onto a common time grid (see
+Analysis/resample.py) and writes them as one CSV at a known rate.
+"""
+
+import time
+from pathlib import Path
+
+from Analysis import resample
+
+def parse_settings(items, convert=str):
+    """['linear', 'GPS_RAW_INT=nearest'] -> {'*': 'linear', 'GPS_RAW_INT': 'nearest'}; None if nothing given."""
+    if not items:
+        return None
+    settings = {}
+    for item in items:
+        name, sep, value = item.rpartition('=')
+        settings[name if sep else '*'] = convert(value)
+    return settings
+
+def run(log_file, series=None, rate=None, methods=None, max_ages=None, out=None, jobs=None):
+    from GUI import gui_helpers
+
+    begin = time.perf_counter()
+    try:
+        method = parse_settings(methods)
+        max_age = parse_settings(max_ages, float)
+        tables, _, _ = gui_helpers.process_log_file(log_file, jobs=jobs)
+        frame = resample.resample(tables, series, rate_hz=rate, method=method, max_age=max_age)
+    except Exception as e:
+        print(f"Resample failed: {e}")
+        return 1
+
+    out = Path(out) if out else Path(log_file).with_suffix('.resampled.csv')
+    frame.to_csv(out, index=False)
+    print(f"{tables.message_count()} messages -> {len(frame)} rows x {len(frame.columns) - 1} series "
+          f"({time.perf_counter() - begin:.2f}s)")
+    print(f"Written to {out.resolve()}")
+    return 0
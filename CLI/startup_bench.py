@@ -0,0 +1,58 @@
+"""
+Cold-start benchmark: launches the GUI with the startup probe enabled,
+times how long it takes for the first window to be drawn, and fails
+when the median goes over the budget.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from Analysis import config
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+def _launch_command(app=None):
+    if app:
+        return [str(app)]
+    if getattr(sys, 'frozen', False):
+        return [sys.executable]
+    return [sys.executable, str(REPO_ROOT / 'Main.py')]
+
+def time_to_first_window(app=None, timeout=60):
+    """
+    Seconds from process launch until the app reports its first window.
+    The app prints the wall-clock time it drew the window, so the output
+    only has to be read once it exits, and a hung app is killed after timeout.
+    """
+    env = dict(os.environ, **{config.STARTUP_PROBE_ENV: '1'})
+    start = time.time()
+    try:
+        proc = subprocess.run(_launch_command(app), cwd=REPO_ROOT, env=env, timeout=timeout,
+                              stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    except subprocess.TimeoutExpired as e:
+        raise RuntimeError(f"App did not exit within {timeout}s") from e
+    lines = proc.stdout.splitlines()
+    for line in lines:
+        marker, _, drawn = line.partition(' ')
+        if marker == config.STARTUP_PROBE_MARKER:
+            return float(drawn) - start
+    raise RuntimeError("App exited without showing a window:\n" + '\n'.join(lines[-20:]))
+
+def run(budget=None, runs=3, app=None):
+    budget = config.STARTUP_BUDGET_SEC if budget is None else budget
+    times = []
+    for i in range(runs):
+        try:
+            times.append(time_to_first_window(app))
+        except RuntimeError as e:
+            print(f"Startup benchmark error: {e}")
+            return 1
+        print(f"Run {i + 1}/{runs}: first window after {times[-1]:.2f}s")
+    median = statistics.median(times)
+    passed = median <= budget
+    print(f"Median time to first window: {median:.2f}s (budget {budget:.2f}s) -> {'PASS' if passed else 'FAIL'}")
+    return 0 if passed else 1
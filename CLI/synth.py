@@ -0,0 +1,271 @@
+"""
+Synthetic .tlog generator for benchmarking.
+Writes a plausible copter session with pymavlink's encoders: a parameter
+and mission download, then back-to-back flights from one home point
+(arm, climb, circuits, RTL, land, disarm), each circuit turned a little
+further round than the last, until the file reaches
+the requested size. Message rates follow a typical ArduPilot telemetry
+stream and can be overridden per type.
+"""
+
+import math
+import random
+import struct
+import time
+from pathlib import Path
+
+# Messages per second. The last group is not in FORENSIC_FIELDS; it is in
+# the stream so the parser has frames to skip, as with a real log.
+DEFAULT_RATES = {
+    'ATTITUDE': 10,
+    'GLOBAL_POSITION_INT': 5,
+    'GPS_RAW_INT': 5,
+    'VFR_HUD': 5,
+    'RC_CHANNELS': 5,
+    'SIMSTATE': 10,
+    'HEARTBEAT': 1,
+    'SYSTEM_TIME': 1,
+    'HOME_POSITION': 0.2,
+    'SYS_STATUS': 2,
+    'RAW_IMU': 10,
+    'SERVO_OUTPUT_RAW': 5,
+}
+
+TICK_HZ = 50
+FLIGHT_SEC = 300
+CRUISE_ALT_M = 40.0
+CIRCUIT_RADIUS_M = 150.0
+CRUISE_SPEED_MPS = 10.0
+CIRCUIT_TURN_DEG = 40.0
+DEFAULT_HOME = (-35.363262, 149.165237, 584.0)
+DEFAULT_START_UNIX = 1717200000.0  # 2024-06-01 00:00 UTC
+
+# Copter custom_mode numbers and the phases of one flight (start second, mode)
+LOITER, GUIDED, AUTO, RTL, LAND = 5, 4, 3, 6, 9
+PHASES = [(0, LOITER), (20, GUIDED), (40, AUTO), (FLIGHT_SEC - 60, RTL), (FLIGHT_SEC - 40, LAND)]
+ARM_AT, DISARM_AT = 15, FLIGHT_SEC - 5
+
+MAV_TYPE_QUADROTOR = 2
+MAV_TYPE_GCS = 6
+MAV_AUTOPILOT_ARDUPILOTMEGA = 3
+MAV_AUTOPILOT_INVALID = 8
+MAV_CMD_COMPONENT_ARM_DISARM = 400
+MAV_CMD_NAV_WAYPOINT = 16
+MAV_FRAME_GLOBAL_RELATIVE_ALT_INT = 6
+MAV_MODE_FLAG_SAFETY_ARMED = 128
+BASE_MODE = 89
+METRES_PER_DEG = 111320.0
+
+def parse_size(text):
+    """'1MB', '2.5GB', '300k' or a plain byte count -> bytes."""
+    text = str(text).strip().upper().rstrip('B')
+    scale = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}.get(text[-1:], 1)
+    if scale > 1:
+        text = text[:-1]
+    return int(float(text) * scale)
+
+def parse_rates(items):
+    """['ATTITUDE=20', 'RAW_IMU=0'] -> DEFAULT_RATES with those overrides (0 drops a type)."""
+    rates = dict(DEFAULT_RATES)
+    for item in items or ():
+        type_, _, hz = item.partition('=')
+        rates[type_.strip().upper()] = float(hz)
+    return {type_: hz for type_, hz in rates.items() if hz > 0}
+
+def _offset(lat, lon, north_m, east_m):
+    return (lat + north_m / METRES_PER_DEG,
+            lon + east_m / (METRES_PER_DEG * math.cos(math.radians(lat))))
+
+class FlightState:
+    """Position, attitude and mode of the simulated vehicle at a time within one flight."""
+
+    def __init__(self, home, bearing_deg=0.0):
+        self.home = home
+        self.bearing = math.radians(bearing_deg)
+
+    def at(self, t):
+        """t: seconds since this flight started (0 <= t < FLIGHT_SEC)."""
+        mode = [m for start, m in PHASES if t >= start][-1]
+        armed = ARM_AT <= t < DISARM_AT
+        north = east = alt = 0.0
+        vn = ve = climb = 0.0
+        circuit_start, rtl_start, land_start = PHASES[2][0], PHASES[3][0], PHASES[4][0]
+        omega = CRUISE_SPEED_MPS / CIRCUIT_RADIUS_M
+
+        if PHASES[1][0] <= t < circuit_start:
+            climb = CRUISE_ALT_M / (circuit_start - PHASES[1][0])
+            alt = climb * (t - PHASES[1][0])
+        elif circuit_start <= t < rtl_start:
+            angle = omega * (t - circuit_start)
+            north, east = CIRCUIT_RADIUS_M * (1 - math.cos(angle)), CIRCUIT_RADIUS_M * math.sin(angle)
+            vn, ve = CRUISE_SPEED_MPS * math.sin(angle), CRUISE_SPEED_MPS * math.cos(angle)
+            alt = CRUISE_ALT_M + 3.0 * math.sin(angle * 3)
+        elif rtl_start <= t < land_start:
+            angle = omega * (rtl_start - circuit_start)
+            left = 1 - (t - rtl_start) / (land_start - rtl_start)
+            north0, east0 = CIRCUIT_RADIUS_M * (1 - math.cos(angle)), CIRCUIT_RADIUS_M * math.sin(angle)
+            north, east = north0 * left, east0 * left
+            vn, ve = -north0 / (land_start - rtl_start), -east0 / (land_start - rtl_start)
+            alt = CRUISE_ALT_M
+        elif land_start <= t < DISARM_AT - 5:
+            climb = -CRUISE_ALT_M / (DISARM_AT - 5 - land_start)
+            alt = CRUISE_ALT_M + climb * (t - land_start)
+
+        cos_b, sin_b = math.cos(self.bearing), math.sin(self.bearing)
+        north, east = north * cos_b - east * sin_b, north * sin_b + east * cos_b
+        vn, ve = vn * cos_b - ve * sin_b, vn * sin_b + ve * cos_b
+        lat, lon = _offset(self.home[0], self.home[1], north, east)
+        heading = math.degrees(math.atan2(ve, vn)) % 360 if (vn or ve) else 0.0
+        return {
+            'mode': mode, 'armed': armed, 'lat': lat, 'lon': lon, 'rel_alt': max(alt, 0.0),
+            'vn': vn, 've': ve, 'climb': climb, 'heading': heading,
+            'roll': 0.2 if mode == AUTO else 0.0, 'pitch': -0.1 if (vn or ve) else 0.0,
+        }
+
+class TlogWriter:
+    """Appends timestamped, encoded MAVLink frames to a .tlog."""
+
+    def __init__(self, path, mavlink_version=2):
+        if mavlink_version == 1:
+            from pymavlink.dialects.v10 import ardupilotmega as dialect
+        else:
+            from pymavlink.dialects.v20 import ardupilotmega as dialect
+        self.vehicle = dialect.MAVLink(None, srcSystem=1, srcComponent=1)
+        self.gcs = dialect.MAVLink(None, srcSystem=255, srcComponent=190)
+        self.file = open(path, 'wb', buffering=1 << 20)
+        self.bytes_written = 0
+        self.messages = 0
+        self.last_usec = 0
+
+    def write(self, unix_time, msg, mav=None):
+        # Receive timestamps never go backwards
+        self.last_usec = max(self.last_usec, int(unix_time * 1e6))
+        record = struct.pack('>Q', self.last_usec) + msg.pack(mav or self.vehicle)
+        self.file.write(record)
+        self.bytes_written += len(record)
+        self.messages += 1
+
+    def close(self):
+        self.file.close()
+
+def _preamble(out, now, home, rng):
+    """Parameter download and a circuit mission, as a GCS does right after connecting."""
+    v = out.vehicle
+    count = 400
+    for i in range(count):
+        out.write(now + i * 0.002, v.param_value_encode(f'PARAM_{i:04d}'.encode(), rng.uniform(-100, 100), 9, count, i))
+    now += count * 0.002
+    for seq in range(8):
+        angle = seq * math.pi / 4
+        lat, lon = _offset(home[0], home[1], CIRCUIT_RADIUS_M * (1 - math.cos(angle)), CIRCUIT_RADIUS_M * math.sin(angle))
+        out.write(now + seq * 0.01, v.mission_item_int_encode(255, 190, seq, MAV_FRAME_GLOBAL_RELATIVE_ALT_INT,
+                                                             MAV_CMD_NAV_WAYPOINT, 0, 1, 0, 0, 0, 0,
+                                                             int(lat * 1e7), int(lon * 1e7), CRUISE_ALT_M))
+    return now + 0.1
+
+def _encode(v, type_, s, boot_ms, unix_time, home, rng):
+    lat, lon = int(s['lat'] * 1e7), int(s['lon'] * 1e7)
+    alt_mm = int((home[2] + s['rel_alt']) * 1000)
+    speed = math.hypot(s['vn'], s['ve'])
+    noise = rng.gauss
+    if type_ == 'ATTITUDE':
+        return v.attitude_encode(boot_ms, s['roll'] + noise(0, 0.01), s['pitch'] + noise(0, 0.01),
+                                 math.radians(s['heading']) - math.pi, 0, 0, 0)
+    if type_ == 'GLOBAL_POSITION_INT':
+        return v.global_position_int_encode(boot_ms, lat, lon, alt_mm, int(s['rel_alt'] * 1000),
+                                            int(s['vn'] * 100), int(s['ve'] * 100), int(-s['climb'] * 100),
+                                            int(s['heading'] * 100))
+    if type_ == 'GPS_RAW_INT':
+        return v.gps_raw_int_encode(int(boot_ms * 1000), 3, lat, lon, alt_mm, 80, 120, int(speed * 100),
+                                    int(s['heading'] * 100), 14)
+    if type_ == 'VFR_HUD':
+        return v.vfr_hud_encode(speed, speed, int(s['heading']), 55 if s['armed'] else 0,
+                                home[2] + s['rel_alt'], s['climb'])
+    if type_ == 'RC_CHANNELS':
+        throttle = 1500 + int(s['climb'] * 50) if s['armed'] else 1000
+        return v.rc_channels_encode(boot_ms, 8, 1500 + int(s['roll'] * 500), 1500 - int(s['pitch'] * 500),
+                                    throttle, 1500, 1000, 1000, 1000, 1000, *([65535] * 10), 255)
+    if type_ == 'SIMSTATE':
+        return v.simstate_encode(s['roll'], s['pitch'], math.radians(s['heading']), 0, 0, -9.81, 0, 0, 0, lat, lon)
+    if type_ == 'HEARTBEAT':
+        base = BASE_MODE | (MAV_MODE_FLAG_SAFETY_ARMED if s['armed'] else 0)
+        return v.heartbeat_encode(MAV_TYPE_QUADROTOR, MAV_AUTOPILOT_ARDUPILOTMEGA, base, s['mode'],
+                                  4 if s['armed'] else 3)
+    if type_ == 'SYSTEM_TIME':
+        return v.system_time_encode(int(unix_time * 1e6), boot_ms)
+    if type_ == 'HOME_POSITION':
+        return v.home_position_encode(int(home[0] * 1e7), int(home[1] * 1e7), int(home[2] * 1000),
+                                      0, 0, 0, [1, 0, 0, 0], 0, 0, 0)
+    if type_ == 'SYS_STATUS':
+        return v.sys_status_encode(0x3FFFFF, 0x3FFFFF, 0x3FFFFF, 300, 15800, 1200 if s['armed'] else 50,
+                                   90, 0, 0, 0, 0, 0, 0)
+    if type_ == 'RAW_IMU':
+        return v.raw_imu_encode(int(boot_ms * 1000), int(noise(0, 5)), int(noise(0, 5)), -1000,
+                                0, 0, 0, 200, 50, -400)
+    if type_ == 'SERVO_OUTPUT_RAW':
+        pwm = 1500 if s['armed'] else 1000
+        # time_usec is 32-bit here and wraps after ~71 minutes, as on the vehicle
+        return v.servo_output_raw_encode(int(boot_ms * 1000) & 0xFFFFFFFF, 0, pwm, pwm, pwm, pwm, 0, 0, 0, 0)
+    raise ValueError(f"No synthetic encoder for {type_}")
+
+def _events(out, now, s, prev):
+    """Status texts and command acks around arming and mode changes."""
+    v = out.vehicle
+    if prev is None:
+        return
+    if s['armed'] and not prev['armed']:
+        out.write(now, v.command_ack_encode(MAV_CMD_COMPONENT_ARM_DISARM, 0))
+        out.write(now, v.statustext_encode(6, b'Arming motors'))
+    elif prev['armed'] and not s['armed']:
+        out.write(now, v.statustext_encode(6, b'Disarming motors'))
+    if s['mode'] != prev['mode'] and s['mode'] == LAND:
+        out.write(now, v.statustext_encode(4, b'Landing'))
+
+def generate(path, size, rates=None, seed=0, mavlink_version=2, start_unix=DEFAULT_START_UNIX, home=DEFAULT_HOME):
+    """
+    Writes a synthetic .tlog of at least `size` bytes (stopping at the end
+    of the tick that crosses it). Returns (bytes written, messages, flights).
+    """
+    rates = DEFAULT_RATES if rates is None else rates
+    rng = random.Random(seed)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    out = TlogWriter(path, mavlink_version)
+    started = time.perf_counter()
+    report_every = max(size // 10, 1)
+    next_report = report_every
+
+    try:
+        now = _preamble(out, start_unix, home, rng)
+        boot_start = now - 30.0
+        tick = 0
+        flights = 0
+        state = prev = None
+        while out.bytes_written < size:
+            flight, t = divmod(tick / TICK_HZ, FLIGHT_SEC)
+            if state is None or int(flight) != flights:
+                flights = int(flight)
+                state = FlightState(home, CIRCUIT_TURN_DEG * flights)
+            now = start_unix + tick / TICK_HZ
+            s = state.at(t)
+            boot_ms = int((now - boot_start) * 1000)
+            _events(out, now, s, prev)
+
+            for type_, hz in rates.items():
+                due = int((tick + 1) * hz / TICK_HZ) - int(tick * hz / TICK_HZ)
+                for _ in range(due):
+                    # Receive jitter: a tlog stamps frames when the GCS reads them
+                    stamp = now + abs(rng.gauss(0, 0.002))
+                    out.write(stamp, _encode(out.vehicle, type_, s, boot_ms, now, state.home, rng))
+            if tick % TICK_HZ == 0:
+                out.write(now, out.gcs.heartbeat_encode(MAV_TYPE_GCS, MAV_AUTOPILOT_INVALID, 0, 0, 0))
+
+            prev = s
+            tick += 1
+            if out.bytes_written >= next_report:
+                print(f"  {out.bytes_written / 1024 ** 2:.0f} MB, {out.messages} messages "
+                      f"({time.perf_counter() - started:.0f}s)")
+                next_report += report_every
+    finally:
+        out.close()
+    return out.bytes_written, out.messages, flights + 1
@@ -0,0 +1,51 @@
+"""
+Tile store maintenance: prefetch the tiles around a flight so the map and
+the PDF basemap work offline, and report or trim the store.
+"""
+
+from Analysis import config
+from Analysis import tile_cache
+
+SERVERS = {'map': [config.MAP_TILE_SERVER], 'export': [config.EXPORT_TILE_SERVER],
+           'both': [config.MAP_TILE_SERVER, config.EXPORT_TILE_SERVER]}
+
+def parse_zooms(text):
+    """'12-18' or '15' to a range of zoom levels."""
+    low, _, high = text.partition('-')
+    return range(int(low), int(high or low) + 1)
+
+def flight_box(log_file, margin):
+    """Bounding box (lat_min, lon_min, lat_max, lon_max) of a log's track, grown by margin (fraction)."""
+    from Analysis import flight_path
+    from GUI import gui_helpers
+
+    tables, _, _ = gui_helpers.process_log_file(log_file)
+    path = flight_path.FlightPath.from_tables(tables)
+    if not len(path):
+        raise ValueError(f"No GPS positions in {log_file}")
+    lat_min, lon_min, lat_max, lon_max = path.bounds()
+    pad_lat = max((lat_max - lat_min) * margin, 1e-4)
+    pad_lon = max((lon_max - lon_min) * margin, 1e-4)
+    return lat_min - pad_lat, lon_min - pad_lon, lat_max + pad_lat, lon_max + pad_lon
+
+def prefetch(log_file, zooms, servers='both', margin=0.5):
+    box = flight_box(log_file, margin)
+    store = tile_cache.default_store()
+    failed_total = 0
+    for server in SERVERS[servers]:
+        cached, downloaded, failed = store.prefetch(server, box, zooms)
+        failed_total += failed
+        print(f"{server}: {cached} cached, {downloaded} downloaded, {failed} failed")
+    print(f"Tile store: {store.size() / 1024 ** 2:.1f} MB at {store.path}")
+    return failed_total
+
+def info():
+    store = tile_cache.default_store()
+    for server, count, size in store.usage():
+        print(f"{server}: {count} tiles, {size / 1024 ** 2:.1f} MB")
+    print(f"Total {store.size() / 1024 ** 2:.1f} MB of {store.max_bytes / 1024 ** 2:.0f} MB at {store.path}")
+
+def evict(max_mb):
+    store = tile_cache.default_store()
+    removed = store.evict(None if max_mb is None else int(max_mb * 1024 ** 2))
+    print(f"Evicted {removed} tiles; {store.size() / 1024 ** 2:.1f} MB left.")
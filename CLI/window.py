@@ -0,0 +1,56 @@
+"""
+Report on one time window of a log, e.g. the two minutes around a crash.
+Only the records in the window are read (through the log's seek index),
+so a window of a multi-GB log costs about as much as the window itself.
+"""
+
+import os
+import time
+from pathlib import Path
+
+from Analysis import seek_index
+from .catalog import parse_duration, parse_time
+
+def parse_bound(text, log_start):
+    """Seconds into the log ('90', '2m', '1.5h') or an ISO UTC date-time -> log timestamp."""
+    try:
+        return log_start + parse_duration(text)
+    except ValueError:
+        return parse_time(text)
+
+def run(log_file, start=None, end=None, out=None, jobs=None):
+    import matplotlib
+    matplotlib.use('Agg')
+    from GUI import gui_helpers
+
+    begin = time.perf_counter()
+    index = seek_index.load_or_build(log_file)
+    if index.start_time is None:
+        print(f"{log_file}: no records")
+        return 1
+    t0 = None if start is None else parse_bound(start, index.start_time)
+    t1 = None if end is None else parse_bound(end, index.start_time)
+    first, last = index.byte_range(t0, t1)
+    print(f"Window {_relative(t0, index, 'start')} to {_relative(t1, index, 'end')}: bytes {first}-{last} "
+          f"of {index.size} ({(last - first) / max(index.size, 1):.1%})")
+
+    try:
+        tables, stats, timeline = gui_helpers.process_log_file(log_file, jobs=jobs, time_range=(t0, t1))
+    except Exception as e:
+        print(f"Window failed: {e}")
+        return 1
+    print(f"{tables.message_count()} messages, {stats['duration_sec']:.1f} s, "
+          f"{stats.get('total_distance_m', 0.0):.0f} m flown ({time.perf_counter() - begin:.2f}s)")
+    for row in timeline:
+        print(f"  T+{float(row['Time (s)']) - index.start_time:8.1f}s  {row['Real Time (UTC)']:>8}  {row['Event']}")
+
+    if out:
+        # Not passing log_file_path: cached renders are of the whole log, not this window
+        gui_helpers.generate_pdf_export(out, os.path.basename(log_file), stats, timeline, tables)
+        print(f"Report written to {Path(out).resolve()}")
+    return 0
+
+def _relative(t, index, missing):
+    if t is None:
+        return f'the {missing}'
+    return f"T+{t - index.start_time:.1f}s"
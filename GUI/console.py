@@ -0,0 +1,109 @@
+"""
+Console tab plumbing.
+print() from any thread only appends to a queue; the Tk main loop drains
+it every CONSOLE_DRAIN_MS, writes the whole batch to a rotating log file
+and shows it in the Text widget, which keeps just the last
+CONSOLE_MAX_LINES lines.
+"""
+
+import logging
+import logging.handlers
+import queue
+import sys
+import tkinter as tk
+
+from Analysis import config
+
+class ConsoleRedirector(object):
+    """sys.stdout/sys.stderr stand-in. Never touches Tk, so any thread may write."""
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    def write(self, s):
+        if s:
+            self.sink.queue.put(s)
+        return len(s)
+
+    def flush(self):
+        pass
+
+class ConsoleSink:
+    def __init__(self, widget, max_lines=None, drain_ms=None, log_path=None):
+        self.widget = widget
+        self.max_lines = max_lines or config.CONSOLE_MAX_LINES
+        self.drain_ms = drain_ms or config.CONSOLE_DRAIN_MS
+        self.queue = queue.SimpleQueue()
+        self.log_file = _rotating_file(log_path or config.CONSOLE_LOG_PATH)
+        self._after_id = None
+
+    def redirect(self):
+        sys.stdout = ConsoleRedirector(self)
+        sys.stderr = ConsoleRedirector(self)
+        self._after_id = self.widget.after(self.drain_ms, self.drain)
+
+    def _take(self):
+        chunks = []
+        while True:
+            try:
+                chunks.append(self.queue.get_nowait())
+            except queue.Empty:
+                return ''.join(chunks)
+
+    def drain(self):
+        """Main thread only: moves everything queued so far to the log file and the widget."""
+        text = self._take()
+        if text:
+            self._spill(text)
+            self._show(text)
+        self._after_id = self.widget.after(self.drain_ms, self.drain)
+
+    def _spill(self, text):
+        if self.log_file is None:
+            return
+        try:
+            self.log_file.emit(logging.makeLogRecord({'msg': text}))
+        except Exception:
+            pass
+
+    def _show(self, text):
+        lines = text.split('\n')
+        if len(lines) > self.max_lines:
+            text = '\n'.join(lines[-self.max_lines:])
+        # Only follow the output if the user hasn't scrolled up to read something
+        at_bottom = self.widget.yview()[1] >= 0.999
+        self.widget.configure(state='normal')
+        self.widget.insert(tk.END, text)
+        excess = int(self.widget.index('end-1c').split('.')[0]) - self.max_lines
+        if excess > 0:
+            self.widget.delete('1.0', f'{excess + 1}.0')
+        self.widget.configure(state='disabled')
+        if at_bottom:
+            self.widget.see(tk.END)
+
+    def close(self):
+        """Restores the real streams and writes out whatever is still queued."""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+        text = self._take()
+        if text:
+            self._spill(text)
+        if self.log_file is not None:
+            self.log_file.close()
+
+def _rotating_file(path):
+    """Size-rotated log file handler that writes batches verbatim, or None if it can't be opened."""
+    if path is None:
+        return None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=config.CONSOLE_LOG_MAX_BYTES,
+                                                       backupCount=config.CONSOLE_LOG_BACKUPS,
+                                                       encoding='utf-8')
+    except OSError:
+        return None
+    handler.terminator = ''
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    return handler
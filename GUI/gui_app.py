@@ -4,36 +4,42 @@ This file contains the main Tkinter application class (the "View").
 """
 
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, filedialog, messagebox, simpledialog
 from ttkthemes import ThemedTk
 from pathlib import Path
+import importlib
 import threading
+import time
 import sys
 import os
-import pandas as pd
-from PIL import Image, ImageTk, ImageDraw
 
+from Analysis import config
+from Analysis import instrument
+from .console import ConsoleSink
+from .jobs import JobManager, DONE, CANCELLED
 
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import (
-    FigureCanvasTkAgg, NavigationToolbar2Tk)
+# The analysis, plotting, map and PDF stacks are imported on first use,
+# and warmed in a background thread once the window is up.
+WARMUP_MODULES = (
+    'GUI.gui_helpers',
+    'Analysis.mapping',
+    'matplotlib.backends.backend_tkagg',
+    'GUI.map_view',
+)
+MAP_ZOOM_POLL_MS = 300
+PERF_PANEL_ROWS = 200
 
-import contextily as cx 
-import tkintermapview
-from . import gui_helpers
+class LoadedLog:
+    """One opened log and everything derived from it, as handed back by a load job."""
 
-class ConsoleRedirector(object):
-    def __init__(self, widget):
-        self.widget = widget
-
-    def write(self, s):
-        self.widget.configure(state='normal')
-        self.widget.insert(tk.END, s)
-        self.widget.see(tk.END)
-        self.widget.configure(state='disabled')
-    
-    def flush(self):
-        pass
+    def __init__(self, path, name, tables, summary_stats, timeline_data, alt_fig, rc_fig):
+        self.path = path
+        self.name = name
+        self.tables = tables
+        self.summary_stats = summary_stats
+        self.timeline_data = timeline_data
+        self.alt_fig = alt_fig
+        self.rc_fig = rc_fig
 
 class BirdHuntApp(ThemedTk):
 
@@ -54,6 +60,7 @@ class BirdHuntApp(ThemedTk):
         self.log_file_path = None
         self.summary_stats = None
         self.timeline_data = None
+        self.tables = None
         
         self.map_fig = None
         self.map_widget = None
@@ -61,8 +68,59 @@ class BirdHuntApp(ThemedTk):
         self.path_line = None
         self.alt_fig = None
         self.rc_fig = None
+        self.alt_canvas = None
+        self.rc_canvas = None
+        
+        self.live = None
+        
+        self.jobs = JobManager()
+        self.logs = {}
+        self.polling_jobs = False
+        self.shown_job = None
         
         self.create_widgets()
+        self.protocol('WM_DELETE_WINDOW', self.on_close)
+        
+        if os.environ.get(config.STARTUP_PROBE_ENV):
+            # A binding on the root also sees the Expose events of every widget in it
+            self.bind('<Expose>', self.on_first_expose)
+        else:
+            self.after(250, self.start_warmup)
+
+    def start_warmup(self):
+        threading.Thread(target=self.run_warmup_thread, daemon=True).start()
+
+    def run_warmup_thread(self):
+        start = time.perf_counter()
+        for name in WARMUP_MODULES:
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                print(f"Warm-up import of {name} failed: {e}")
+        print(f"Analysis modules ready ({time.perf_counter() - start:.1f}s).")
+
+    def on_close(self):
+        if self.live is not None:
+            self.stop_live()
+        self.jobs.shutdown()
+        self.console.close()
+        self.destroy()
+
+    def on_first_expose(self, event):
+        """
+        Startup benchmark hook. The first Expose means the window is mapped and
+        on screen; Tk redraws exposed widgets in idle callbacks queued as the
+        events are handled, so an idle callback queued here runs once that
+        first frame has been drawn.
+        """
+        self.unbind('<Expose>')
+        self.after_idle(self.report_first_window)
+
+    def report_first_window(self):
+        """Reports the wall-clock time the first frame was drawn, then exits."""
+        sys.__stdout__.write(f"{config.STARTUP_PROBE_MARKER} {time.time()!r}\n")
+        sys.__stdout__.flush()
+        self.destroy()
 
     def create_widgets(self):
         branding_frame = ttk.Frame(self, padding=5)
@@ -94,9 +152,25 @@ class BirdHuntApp(ThemedTk):
         self.export_button = ttk.Button(header_frame, text="Export to PDF", command=self.export_pdf, state='disabled')
         self.export_button.pack(side='left', padx=5)
         
+        self.live_button = ttk.Button(header_frame, text="Go Live", command=self.toggle_live)
+        self.live_button.pack(side='left', padx=5)
+        
+        self.log_selector = ttk.Combobox(header_frame, state='readonly', width=30)
+        self.log_selector.bind('<<ComboboxSelected>>', self.on_log_selected)
+        self.log_selector.pack(side='left', padx=5)
+        
         self.status_label = ttk.Label(header_frame, text="Ready. Please load a .tlog file.")
         self.status_label.pack(side='left', padx=10, fill='x', expand=True)
         
+        job_frame = ttk.Frame(self, padding=(10, 0))
+        job_frame.pack(fill='x')
+        self.job_bar = ttk.Progressbar(job_frame, length=300, maximum=100)
+        self.job_bar.pack(side='left', padx=5)
+        self.cancel_button = ttk.Button(job_frame, text="Cancel", command=self.cancel_job, state='disabled')
+        self.cancel_button.pack(side='left', padx=5)
+        self.job_label = ttk.Label(job_frame, text="")
+        self.job_label.pack(side='left', padx=10, fill='x', expand=True)
+        
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill='both', expand=True, padx=5, pady=5)
         
@@ -113,9 +187,15 @@ class BirdHuntApp(ThemedTk):
         self.tab_rc = ttk.Frame(self.notebook)
         self.notebook.add(self.tab_rc, text='RC Inputs')
 
+        self.tab_perf = ttk.Frame(self.notebook, padding=10)
+        self.notebook.add(self.tab_perf, text='Performance')
+        self.create_perf_tab()
+
         self.tab_console = ttk.Frame(self.notebook)
         self.notebook.add(self.tab_console, text='Console')
         self.create_console_tab()
+        
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
 
     def create_summary_tab(self):
         stats_frame = ttk.Labelframe(self.tab_summary, text="Summary", padding=10)
@@ -136,123 +216,390 @@ class BirdHuntApp(ThemedTk):
             
         self.timeline_tree.pack(fill='both', expand=True)
 
+    def create_perf_tab(self):
+        cols = ('Span', 'Wall (s)', 'CPU (s)', 'Peak RSS +MB', 'Rows', 'Bytes', 'File')
+        self.perf_tree = ttk.Treeview(self.tab_perf, columns=cols, show='headings')
+        for col in cols:
+            self.perf_tree.heading(col, text=col)
+            self.perf_tree.column(col, width=220 if col == 'Span' else 110, anchor='w' if col in ('Span', 'File') else 'e')
+        self.perf_tree.pack(fill='both', expand=True)
+        
+        log_path = config.SPAN_LOG_PATH or 'disabled'
+        ttk.Label(self.tab_perf, text=f"Newest first. Every span is also appended to {log_path}",
+                  foreground="gray").pack(anchor='w', pady=(5, 0))
+
+    def on_tab_changed(self, event=None):
+        if self.notebook.select() == str(self.tab_perf):
+            self.show_perf()
+
+    def show_perf(self):
+        for i in self.perf_tree.get_children():
+            self.perf_tree.delete(i)
+        
+        def fmt(value, spec):
+            return '' if value is None else format(value, spec)
+        
+        for record in reversed(instrument.recent(PERF_PANEL_ROWS)):
+            name = ('    ' if record['parent'] else '') + record['span'] + ('' if record['ok'] else ' (failed)')
+            self.perf_tree.insert("", "end", values=(
+                name,
+                fmt(record['wall_s'], '.3f'),
+                fmt(record['cpu_s'], '.3f'),
+                fmt(record['peak_rss_delta_mb'], '.1f'),
+                fmt(record['rows'], ','),
+                fmt(record['bytes'], ','),
+                record.get('file', '')
+            ))
+
     def create_console_tab(self):
         console_text = tk.Text(self.tab_console, wrap='word', height=10, state='disabled')
         console_text.pack(fill='both', expand=True, padx=5, pady=5)
         
-        sys.stdout = ConsoleRedirector(console_text)
-        sys.stderr = ConsoleRedirector(console_text)
+        self.console = ConsoleSink(console_text)
+        self.console.redirect()
         print("Application ready. Console initialized.")
 
     def load_log(self):
-        file_path = filedialog.askopenfilename(
-            title="Select .tlog file",
+        file_paths = filedialog.askopenfilenames(
+            title="Select .tlog file(s)",
             filetypes=[("MAVLink Logs", "*.tlog"), ("All Files", "*.*")],
             initialdir="Logs/"
         )
-        if not file_path:
+        if not file_paths:
             return
-            
-        self.log_file_name = Path(file_path).name
-        self.log_file_path = file_path
-        self.status_label.config(text=f"Processing {self.log_file_name}...")
-        
-        self.load_button.config(state='disabled')
-        self.export_button.config(state='disabled')
         
+        for file_path in file_paths:
+            self.submit_job(f"Load {Path(file_path).name}", self.run_load_job, file_path,
+                            key=('load', file_path), on_done=self.on_load_done)
+        self.status_label.config(text=f"Processing {', '.join(Path(p).name for p in file_paths)}...")
         self.notebook.select(self.tab_console)
+
+    def run_load_job(self, job, file_path):
+        """Worker thread: parses and plots one log. Only returns data; the GUI is updated in on_load_done."""
+        from . import gui_helpers
+        job.set_stage("parsing")
+        tables, summary_stats, timeline_data = gui_helpers.process_log_file(file_path, progress=job.progress)
+        job.set_stage("plotting")
+        alt_fig, rc_fig = gui_helpers.generate_plots(tables)
+        return LoadedLog(file_path, Path(file_path).name, tables, summary_stats, timeline_data, alt_fig, rc_fig)
+
+    def on_load_done(self, job):
+        file_path = job.key[1]
+        if job.state == CANCELLED:
+            self.status_label.config(text=f"Loading {Path(file_path).name} cancelled.")
+            return
+        if job.state != DONE:
+            self.show_error(f"Failed to process log: {job.error}")
+            return
         
-        threading.Thread(target=self.run_processing_thread, args=(file_path,), daemon=True).start()
+        self.logs[file_path] = job.result
+        self.log_selector.config(values=[log.name for log in self.logs.values()])
+        if self.live is None:
+            self.show_log(file_path)
 
-    def run_processing_thread(self, file_path):
-        try:
-            df, self.summary_stats, self.timeline_data = gui_helpers.process_log_file(file_path)
-            self.df = df
-            
-            self.alt_fig, self.rc_fig = gui_helpers.generate_plots(df)
-            
-            self.after(0, self.update_gui_with_data)
-            
-        except Exception as e:
-            error_msg = f"Failed to process log: {e}"
-            self.after(0, self.show_error, error_msg)
+    def on_log_selected(self, event=None):
+        name = self.log_selector.get()
+        for file_path, log in self.logs.items():
+            if log.name == name:
+                self.show_log(file_path)
+                return
+
+    def show_log(self, file_path):
+        log = self.logs[file_path]
+        self.log_file_name = log.name
+        self.log_file_path = log.path
+        self.tables = log.tables
+        self.summary_stats = log.summary_stats
+        self.timeline_data = log.timeline_data
+        self.alt_fig, self.rc_fig = log.alt_fig, log.rc_fig
+        self.log_selector.set(log.name)
+        self.update_gui_with_data()
 
     def update_gui_with_data(self):
+        with instrument.span('display', file=self.log_file_name):
+            self.show_summary()
+            self.show_timeline()
+                
+            self.embed_map_plot(self.tab_map)
+            self.alt_canvas = self.embed_plot(self.alt_fig, self.tab_alt)
+            self.rc_canvas = self.embed_plot(self.rc_fig, self.tab_rc)
+        
+        self.export_button.config(state='normal')
+        self.status_label.config(text=f"Successfully loaded {self.log_file_name}")
+        self.notebook.select(self.tab_summary)
+
+    def submit_job(self, name, func, *args, key=None, on_done=None):
+        job = self.jobs.submit(name, func, *args, key=key, on_done=on_done)
+        if not self.polling_jobs:
+            self.polling_jobs = True
+            self.after(0, self.poll_jobs)
+        return job
+
+    def poll_jobs(self):
+        """Main thread: hands finished jobs to their on_done and shows the oldest active job's progress."""
+        for job in self.jobs.finished():
+            if job.on_done is not None:
+                try:
+                    job.on_done(job)
+                except Exception as e:
+                    print(f"Error finishing {job.name}: {e}")
+        
+        active = self.jobs.active()
+        if not active:
+            self.polling_jobs = False
+            self.shown_job = None
+            self.job_bar.stop()
+            self.job_bar.config(mode='determinate', value=0)
+            self.job_label.config(text="")
+            self.cancel_button.config(state='disabled')
+            return
+        
+        self.shown_job = job = active[0]
+        fraction = job.fraction
+        if fraction is None:
+            if str(self.job_bar.cget('mode')) != 'indeterminate':
+                self.job_bar.config(mode='indeterminate')
+                self.job_bar.start()
+        else:
+            if str(self.job_bar.cget('mode')) != 'determinate':
+                self.job_bar.stop()
+                self.job_bar.config(mode='determinate')
+            self.job_bar.config(value=fraction * 100)
+        more = f"  (+{len(active) - 1} more)" if len(active) > 1 else ""
+        self.job_label.config(text=job.describe() + more)
+        self.cancel_button.config(state='normal')
+        self.after(config.JOB_POLL_MS, self.poll_jobs)
+
+    def cancel_job(self):
+        if self.shown_job is not None:
+            self.shown_job.cancel()
+            self.job_label.config(text=f"{self.shown_job.name}: cancelling...")
+
+    def show_summary(self):
         self.summary_text.set(
             f"File: {self.log_file_name}\n"
-            f"Duration: {self.summary_stats.get('duration_sec', 0):.2f} seconds"
+            f"Duration: {self.summary_stats.get('duration_sec', 0):.2f} seconds\n"
+            f"Distance: {self.summary_stats.get('total_distance_m', 0):.0f} m | "
+            f"Max range: {self.summary_stats.get('max_range_m', 0):.0f} m | "
+            f"Max speed: {self.summary_stats.get('max_speed_mps', 0):.1f} m/s"
         )
-        
+
+    def show_timeline(self):
         for i in self.timeline_tree.get_children():
             self.timeline_tree.delete(i)
         
         for row in self.timeline_data:
-            self.timeline_tree.insert("", "end", values=(
-                row['Real Time (UTC)'],
-                f"T+{float(row['Time (s)']):.1f}s",
-                row['Event']
-            ))
-            
+            self.insert_timeline_row(row)
+
+    def insert_timeline_row(self, row):
+        self.timeline_tree.insert("", "end", values=(
+            row['Real Time (UTC)'],
+            f"T+{float(row['Time (s)']):.1f}s",
+            row['Event']
+        ))
+
+    def toggle_live(self):
+        if self.live is not None:
+            self.stop_live()
+            return
+        
+        port = simpledialog.askstring("Go Live", "UDP port to listen on\n(leave empty to follow a .tlog that is being written):",
+                                      parent=self)
+        if port is None:
+            return
+        from Analysis import live
+        try:
+            if port.strip():
+                self.live = live.LiveSession.listen_udp(int(port))
+                self.log_file_name = f"UDP port {int(port)} (live)"
+            else:
+                file_path = filedialog.askopenfilename(
+                    title="Select growing .tlog file",
+                    filetypes=[("MAVLink Logs", "*.tlog"), ("All Files", "*.*")],
+                    initialdir="Logs/"
+                )
+                if not file_path:
+                    return
+                self.live = live.LiveSession.follow_tlog(file_path)
+                self.log_file_name = f"{Path(file_path).name} (live)"
+        except (OSError, ValueError) as e:
+            self.live = None
+            self.show_error(f"Could not start live mode: {e}")
+            return
+        
+        self.log_file_path = None
+        self.tables = None
+        self.alt_fig = self.rc_fig = None
+        self.alt_canvas = self.rc_canvas = None
+        self.path_line = None
+        self.timeline_data = None
         self.embed_map_plot(self.tab_map)
-        self.embed_plot(self.alt_fig, self.tab_alt)
-        self.embed_plot(self.rc_fig, self.tab_rc)
         
-        self.export_button.config(state='normal')
-        self.load_button.config(state='normal')
-        self.status_label.config(text=f"Successfully loaded {self.log_file_name}")
+        self.live.start()
+        self.live_button.config(text="Stop Live")
+        self.load_button.config(state='disabled')
+        self.log_selector.config(state='disabled')
+        self.export_button.config(state='disabled')
+        self.status_label.config(text=f"Live: waiting for data from {self.log_file_name}...")
         self.notebook.select(self.tab_summary)
+        self.after(0, self.live_tick)
+
+    def live_tick(self):
+        """Redraws from the live session at a fixed rate, however fast messages arrive."""
+        if self.live is None:
+            return
+        self.after(int(1000 / config.LIVE_REDRAW_HZ), self.live_tick)
+        snapshot = self.live.latest()
+        if snapshot is None:
+            return
+        try:
+            self.show_live_snapshot(snapshot)
+        except Exception as e:
+            print(f"Live redraw error: {e}")
+
+    def show_live_snapshot(self, snapshot):
+        """Draws a snapshot the live session's worker thread already analyzed."""
+        from Analysis import plotting
+        self.tables, self.summary_stats, timeline = snapshot
+        self.show_summary()
+        self.extend_live_timeline(timeline)
+        
+        if self.alt_canvas is None:
+            self.alt_fig = plotting.plot_altitude(self.tables)
+            self.alt_canvas = self.embed_plot(self.alt_fig, self.tab_alt)
+        else:
+            plotting.update_altitude(self.alt_fig, self.tables)
+            self.alt_canvas.draw_idle()
+        if self.rc_canvas is None:
+            self.rc_fig = plotting.plot_rc_channels(self.tables)
+            self.rc_canvas = self.embed_plot(self.rc_fig, self.tab_rc)
+        else:
+            plotting.update_rc_channels(self.rc_fig, self.tables)
+            self.rc_canvas.draw_idle()
+        
+        self.extend_live_path()
+        self.status_label.config(text=f"Live: {self.live.messages} messages from {self.log_file_name}")
+
+    def extend_live_timeline(self, timeline):
+        """
+        Live timelines only grow, apart from the trailing 'Log End' row, so
+        that row is replaced and only the new events are inserted.
+        """
+        shown = self.timeline_data
+        self.timeline_data = timeline
+        if not shown or not timeline or shown[0] != timeline[0] or len(timeline) < len(shown):
+            self.show_timeline()
+            return
+        rows = self.timeline_tree.get_children()
+        if rows:
+            self.timeline_tree.delete(rows[-1])
+        for row in timeline[len(shown) - 1:]:
+            self.insert_timeline_row(row)
+
+    def extend_live_path(self):
+        """Adds only the positions received since the last redraw to the map path."""
+        cols = self.tables.columns['GLOBAL_POSITION_INT']
+        lats = cols['lat'][len(self.all_path_coords) + self.live_path_skipped:] / 1e7
+        lons = cols['lon'][len(self.all_path_coords) + self.live_path_skipped:] / 1e7
+        new_coords = [(lat, lon) for lat, lon in zip(lats.tolist(), lons.tolist())
+                      if lat == lat and lon == lon and lat != 0 and lon != 0]
+        self.live_path_skipped += len(lats) - len(new_coords)
+        if not new_coords:
+            return
+        first = not self.all_path_coords
+        self.all_path_coords.extend(new_coords)
+        if self.path_line is None:
+            if len(self.all_path_coords) < 2:
+                return
+            self.path_line = self.map_widget.set_path(list(self.all_path_coords), color="red", width=2)
+        else:
+            for lat, lon in new_coords:
+                self.path_line.add_position(lat, lon)
+            self.path_line.draw()
+        if self.drone_marker is None:
+            self.drone_marker = self.map_widget.set_marker(*self.all_path_coords[-1], text="Live")
+        else:
+            self.drone_marker.set_position(*self.all_path_coords[-1])
+        if first:
+            self.map_widget.set_position(*self.all_path_coords[-1])
+            self.map_widget.set_zoom(18)
+
+    def stop_live(self):
+        live, self.live = self.live, None
+        live.stop()
+        snapshot = live.snapshot()
+        self.live_button.config(text="Go Live")
+        self.load_button.config(state='normal')
+        self.log_selector.config(state='readonly')
+        if snapshot is None:
+            self.status_label.config(text="Live mode stopped. No data received.")
+            return
+        self.tables, self.summary_stats, self.timeline_data = snapshot
+        self.show_summary()
+        self.show_timeline()
+        self.export_button.config(state='normal')
+        self.status_label.config(text=f"Live mode stopped after {live.messages} messages.")
 
     def embed_map_plot(self, tab_frame):
         """
         Embeds the LIVE MAP using tkintermapview.
         """
+        from Analysis import flight_path
+        from .map_view import CachedMapView
+        
         for widget in tab_frame.winfo_children():
             widget.destroy()
             
-        self.map_widget = tkintermapview.TkinterMapView(tab_frame, width=800, height=600, corner_radius=0)
+        self.map_widget = CachedMapView(tab_frame, width=800, height=600, corner_radius=0)
         self.map_widget.pack(fill="both", expand=True)
         
-        self.map_widget.set_tile_server("https://mt0.google.com/vt/lyrs=s&hl=en&x={x}&y={y}&z={z}&s=Ga", max_zoom=22)
+        self.map_widget.set_tile_server(config.MAP_TILE_SERVER, max_zoom=22)
+        self.all_path_coords = []
+        self.live_path_skipped = 0
+        self.drone_marker = None
+        self.path_line = None
+        self.flight_path = None
         
-        if not hasattr(self, 'df') or self.df is None:
+        if self.tables is None or 'GLOBAL_POSITION_INT' not in self.tables:
             return
 
-        path_coords = []
-        lats = self.df['GLOBAL_POSITION_INT.lat'] / 1e7
-        lons = self.df['GLOBAL_POSITION_INT.lon'] / 1e7
-        
-        self.all_path_coords = [] 
-        for lat, lon in zip(lats, lons):
-            if pd.notna(lat) and pd.notna(lon) and lat != 0 and lon != 0:
-                self.all_path_coords.append((lat, lon))
+        self.flight_path = flight_path.FlightPath.from_tables(self.tables)
+        if not len(self.flight_path):
+            return
         
-        if self.all_path_coords:
-            self.map_widget.set_path(self.all_path_coords, color="red", width=2)
-            
-            start_lat, start_lon = self.all_path_coords[0]
-            self.map_widget.set_marker(start_lat, start_lon, text="Start")
-            
-            end_lat, end_lon = self.all_path_coords[-1]
-            self.map_widget.set_marker(end_lat, end_lon, text="End")
-            
-            min_lat = min(p[0] for p in self.all_path_coords)
-            max_lat = max(p[0] for p in self.all_path_coords)
-            min_lon = min(p[1] for p in self.all_path_coords)
-            max_lon = max(p[1] for p in self.all_path_coords)
-            
-            center_lat = (min_lat + max_lat) / 2
-            center_lon = (min_lon + max_lon) / 2
-            self.map_widget.set_position(center_lat, center_lon)
-            self.map_widget.set_zoom(18)
+        box = self.flight_path.bounds()
+        self.map_widget.update_idletasks()
+        zoom = flight_path.zoom_for_bounds(box, max(self.map_widget.winfo_width(), 800),
+                                           max(self.map_widget.winfo_height(), 600))
+        self.map_widget.set_position((box[0] + box[2]) / 2, (box[1] + box[3]) / 2)
+        self.map_widget.set_zoom(zoom)
+        
+        self.path_zoom = round(self.map_widget.zoom)
+        self.path_line = self.map_widget.set_path(self.flight_path.for_zoom(self.path_zoom), color="red", width=2)
+        self.map_widget.set_marker(self.flight_path.lat[0], self.flight_path.lon[0], text="Start")
+        self.map_widget.set_marker(self.flight_path.lat[-1], self.flight_path.lon[-1], text="End")
+        self.after(MAP_ZOOM_POLL_MS, self.follow_map_zoom, self.flight_path)
+
+    def follow_map_zoom(self, path):
+        """Swaps in the path simplified for the map's current zoom level whenever it changes."""
+        if path is not self.flight_path:
+            return
+        zoom = round(self.map_widget.zoom)
+        if zoom != self.path_zoom:
+            self.path_zoom = zoom
+            self.path_line.set_position_list(path.for_zoom(zoom))
+        self.after(MAP_ZOOM_POLL_MS, self.follow_map_zoom, path)
 
     def embed_plot(self, fig, tab_frame):
         """Embeds a standard Matplotlib Figure object into a Tkinter tab."""
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        
         for widget in tab_frame.winfo_children():
             widget.destroy()
             
         if fig is None:
             ttk.Label(tab_frame, text="Plot unavailable.").pack(padx=20, pady=20)
-            return
+            return None
             
         canvas = FigureCanvasTkAgg(fig, master=tab_frame)
         canvas.draw()
@@ -261,6 +608,7 @@ class BirdHuntApp(ThemedTk):
         toolbar = NavigationToolbar2Tk(canvas, tab_frame)
         toolbar.update()
         canvas.get_tk_widget().pack(side='top', fill='both', expand=True)
+        return canvas
 
     def export_pdf(self):
         save_path = filedialog.asksaveasfilename(
@@ -276,24 +624,34 @@ class BirdHuntApp(ThemedTk):
         self.status_label.config(text=f"Exporting PDF to {save_path}...")
         self.notebook.select(self.tab_console)
         
-        threading.Thread(target=self.run_export_thread, args=(save_path,), daemon=True).start()
+        # The job keeps the log it was started for, even if another one is shown meanwhile.
+        # The on-screen figures stay with the Tk thread; the export draws its own.
+        log = LoadedLog(self.log_file_path, self.log_file_name, self.tables, self.summary_stats,
+                        self.timeline_data, None, None)
+        self.submit_job(f"Export {Path(save_path).name}", self.run_export_job, save_path, log,
+                        key=('export', save_path), on_done=self.on_export_done)
 
-    def run_export_thread(self, save_path):
-        try:
-            gui_helpers.generate_pdf_export(
-                output_pdf_path=save_path,
-                log_file_name=self.log_file_name,
-                summary_stats=self.summary_stats,
-                timeline_data=self.timeline_data,
-                df=self.df, 
-                alt_fig=self.alt_fig,
-                rc_fig=self.rc_fig
-            )
-            self.after(0, lambda: self.status_label.config(text="PDF Exported Successfully."))
-        except Exception as e:
-            error_msg = f"Failed to export PDF: {e}"
-            self.after(0, self.status_label.config, {"text": error_msg})
-            self.after(0, self.show_error, error_msg)
+    def run_export_job(self, job, save_path, log):
+        from . import gui_helpers
+        job.set_stage("rendering")
+        gui_helpers.generate_pdf_export(
+            output_pdf_path=save_path,
+            log_file_name=log.name,
+            summary_stats=log.summary_stats,
+            timeline_data=log.timeline_data,
+            tables=log.tables,
+            log_file_path=log.path,
+            progress=job.progress
+        )
+
+    def on_export_done(self, job):
+        if job.state == CANCELLED:
+            self.status_label.config(text="PDF export cancelled.")
+        elif job.state == DONE:
+            self.status_label.config(text="PDF Exported Successfully.")
+            self.on_tab_changed()
+        else:
+            self.show_error(f"Failed to export PDF: {job.error}")
 
     def show_error(self, message):
         print(f"ERROR: {message}")
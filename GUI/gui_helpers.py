@@ -4,10 +4,12 @@ It calls the processing functions and returns the data/figures.
 This is the "Controller" part of the application.
 """
 
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import tempfile
+import io
 import os
+import tempfile
+import time
 
 from Analysis import log_converter
 from Analysis import analysis
@@ -15,85 +17,221 @@ from Analysis import plotting
 from Analysis import mapping
 from Analysis import reporting
 from Analysis import config
+from Analysis import cache
+from Analysis import instrument
+from Analysis import catalog
+from .jobs import JobCancelled
 
-def process_log_file(tlog_file_path_str):
+def process_log_file(tlog_file_path_str, jobs=None, time_range=None, progress=None):
     """
     Runs the conversion and analysis steps.
-    Returns the stats, timeline, and dataframe for plotting.
+    Returns the per-message-type tables, stats, and timeline for plotting.
+    jobs: parser worker processes; None picks all cores for large logs.
+    time_range: (t0, t1) log timestamps to analyse only that window, read
+    through the log's seek index. Windows bypass the cache and the catalog.
+    progress: progress(bytes_done, bytes_total) callback for the parse; an
+    exception it raises aborts the load.
     """
-    print(f"Processing {tlog_file_path_str}...")
     tlog_file = Path(tlog_file_path_str)
+    with instrument.span('process_log', file=tlog_file.name) as span:
+        span.bytes = tlog_file.stat().st_size
+        if time_range is not None:
+            span.attrs['time_range'] = list(time_range)
+            result = _process_window(tlog_file, jobs, time_range, progress)
+        else:
+            result = _process_log_file(tlog_file, jobs, span, progress)
+        span.rows = result[0].message_count()
+    if time_range is None:
+        _update_catalog(tlog_file, *result)
+    return result
+
+def _update_catalog(tlog_file, tables, stats, timeline):
+    """Adds the log to the flight catalog; a catalog problem never fails the load."""
+    try:
+        flights = catalog.default_catalog()
+        if flights is not None and not flights.is_current(tlog_file):
+            with instrument.span('catalog.record', file=tlog_file.name):
+                flights.record(tlog_file, cache.file_hash(tlog_file), tables, stats, timeline)
+    except Exception as e:
+        print(f"Catalog update failed: {e}")
+
+def _process_log_file(tlog_file, jobs, span, progress=None):
+    key = cache.cache_key(tlog_file)
+    with instrument.span('cache.load'):
+        cached = cache.load(key)
+    span.attrs['cache_hit'] = cached is not None
+    if cached is not None:
+        print(f"Cache hit: loaded {tlog_file.name} from {config.CACHE_DIR}")
+        if progress is not None:
+            progress(span.bytes, span.bytes)
+        return cached
+    print(f"Cache miss: parsing {tlog_file.name}")
     
-    temp_dir = tempfile.gettempdir()
-    csv_path = Path(temp_dir) / f'{tlog_file.stem}_temp.csv'
+    tables, stats, timeline = _parse_and_analyze(log_converter.TlogParser(tlog_file), jobs, progress)
+    with instrument.span('cache.store'):
+        cache.store(key, tables, stats, timeline)
     
-    parser = log_converter.TlogParser(tlog_file)
-    if not parser.to_csv(csv_path):
-        raise Exception("Failed to convert .tlog to .csv")
+    print("Analysis complete.")
+    return tables, stats, timeline
+
+def _process_window(tlog_file, jobs, time_range, progress=None):
+    print(f"Parsing {tlog_file.name} from {time_range[0]} to {time_range[1]}")
+    result = _parse_and_analyze(log_converter.TlogParser(tlog_file, time_range=time_range), jobs, progress)
+    print("Analysis complete.")
+    return result
+
+def _parse_and_analyze(parser, jobs, progress=None):
+    if jobs is None:
+        jobs = 1
+        start, stop = parser.scanner.byte_range or (0, os.path.getsize(parser.log_file))
+        if stop - start >= config.PARALLEL_PARSE_MIN_BYTES:
+            jobs = os.cpu_count() or 1
     
-    print("Analyzing data...")
     try:
-        df = pd.read_csv(csv_path)
-        df['timestamp'] = pd.to_numeric(df['timestamp'], errors='coerce')
-        df = df.dropna(how='all', subset=df.columns.difference(['timestamp']))
-        if df.empty: raise ValueError("No valid data in CSV")
+        tables = parser.to_tables(jobs=jobs, progress=progress)
+    except JobCancelled:
+        raise
     except Exception as e:
-        raise Exception(f"Data Error: {e}")
-    
-    timeline = analysis.calculate_timeline_events(df)
-    stats = analysis.calculate_summary_stats(df)
+        raise Exception(f"Failed to parse .tlog: {e}")
     
-    os.remove(csv_path)
+    print("Analyzing data...")
+    if tables.empty:
+        raise Exception("Data Error: No valid data in log")
     
-    print("Analysis complete.")
-    return df, stats, timeline
+    timeline = analysis.calculate_timeline_events(tables)
+    stats = analysis.calculate_summary_stats(tables)
+    return tables, stats, timeline
 
-def generate_plots(df):
+@instrument.traced('plots')
+def generate_plots(tables):
     """
     Generates all plots and returns them as Figure objects.
     """
     print("Generating plots for GUI...")
-    alt_fig = plotting.plot_altitude(df)
-    rc_fig = plotting.plot_rc_channels(df)
+    alt_fig = plotting.plot_altitude(tables)
+    rc_fig = plotting.plot_rc_channels(tables)
     print("Plots generated.")
     return alt_fig, rc_fig
 
+def _timed(timings, stage, func, *args):
+    # Runs on pool threads, so the parent span is named rather than taken from this thread
+    start = time.perf_counter()
+    with instrument.span(f'export.{stage}', parent='export'):
+        try:
+            return func(*args)
+        finally:
+            timings[stage] = time.perf_counter() - start
+
+def _write_rgb_png(buffer, path):
+    """
+    Flattens a rendered PNG to RGB before it reaches fpdf, which otherwise
+    splits out the alpha channel pixel by pixel in Python (~1s per image).
+    """
+    from PIL import Image
+    buffer.seek(0)
+    Image.open(buffer).convert('RGB').save(path)
+    return path
+
+def render_map(tables, path):
+    """
+    Renders the PDF's flight path map (with basemap) to an RGB PNG at path.
+    Returns (image path or None, whether the image is complete enough to cache).
+    """
+    map_fig = mapping.create_flight_path_map(tables)
+    if map_fig is None:
+        return None, False
+    complete = mapping.add_basemap(map_fig)
+    buffer = io.BytesIO()
+    map_fig.savefig(buffer, format='png', dpi=config.MAP_EXPORT_DPI, bbox_inches='tight')
+    return _write_rgb_png(buffer, path), complete
+
+def render_plot(plot, tables, path):
+    """
+    Renders plot(tables), e.g. plotting.plot_altitude, to an RGB PNG at path the
+    way the PDF embeds it. Returns (image path or None, whether it can be cached).
+    """
+    # A figure of the export's own at the default view: on-screen figures belong to the Tk
+    # thread and may be zoomed in, and the render cache key assumes the full default view
+    fig = plot(tables)
+    if fig is None:
+        return None, False
+    buffer = io.BytesIO()
+    plotting.save_figure(fig, buffer, config.PDF_PLOT_DPI)
+    return _write_rgb_png(buffer, path), True
+
+def _render_cached(key, name, path, render, *args):
+    """Copies a cached render into path, or renders it and caches the result."""
+    if key is not None:
+        data = cache.load_render(key)
+        if data is not None:
+            print(f"Render cache hit: {name}")
+            path.write_bytes(data)
+            return path
+    image, cacheable = render(*args, path)
+    if image is not None and cacheable and key is not None:
+        cache.store_render(key, image.read_bytes())
+    return image
+
+# Progress steps of an export: the map, altitude and RC images, then the PDF itself
+EXPORT_STEPS = 4
+
 def generate_pdf_export(output_pdf_path, log_file_name, summary_stats, timeline_data,
-                        df, alt_fig, rc_fig):
+                        tables, log_file_path=None, progress=None):
     """
-    Saves the figures temporarily to disk, generates the PDF,
-    and then cleans up the temp images.
+    Renders the map, altitude and RC images in parallel into a scratch
+    directory private to this export, each from a figure drawn for it on its
+    worker thread (matplotlib figures are not thread-safe, so figures shown
+    in the GUI are never touched), builds the PDF from them, then
+    removes the directory. Stage timings are printed to the console.
+    log_file_path: the source .tlog; when given, finished images are reused
+    from the render cache on later exports of the same (unchanged) log.
+    progress: progress(steps_done, steps_total) callback, called as each of the
+    three images is finished and once more after the PDF is written; an
+    exception it raises from an image step stops the export before the PDF is written.
     """
     print(f"Generating PDF at {output_pdf_path}...")
+    start = time.perf_counter()
+    timings = {}
     
-    config.PLOT_DIR.mkdir(parents=True, exist_ok=True)
-    
-    map_path = config.PLOT_DIR / 'temp_map.png'
-    alt_path = config.PLOT_DIR / 'temp_alt.png'
-    rc_path = config.PLOT_DIR / 'temp_rc.png'
-    
-    print("Generating map for export...")
-    map_fig = mapping.create_flight_path_map(df)
-    
-    if map_fig: 
-        mapping.add_basemap(map_fig)
-        map_fig.savefig(map_path, bbox_inches='tight')
-    if alt_fig: alt_fig.savefig(alt_path, bbox_inches='tight')
-    if rc_fig: rc_fig.savefig(rc_path, bbox_inches='tight')
-    
-    reporting.generate_forensic_report(
-        output_pdf_path=str(output_pdf_path),
-        log_file_name=log_file_name,
-        summary_stats=summary_stats,
-        timeline_data=timeline_data,
-        map_image_path=map_path,
-        alt_plot_path=alt_path,
-        rc_plot_path=rc_path
-    )
+    with instrument.span('export', file=log_file_name) as span:
+        keys = {'map': None, 'alt': None, 'rc': None}
+        if log_file_path is not None:
+            log_key = cache.cache_key(log_file_path)
+            keys['map'] = cache.render_key(log_key, 'map', mapping.MAP_FIGSIZE, config.MAP_EXPORT_DPI,
+                                           config.EXPORT_TILE_SERVER, config.EXPORT_BASEMAP_PIXELS)
+            for name in ('alt', 'rc'):
+                keys[name] = cache.render_key(log_key, name, plotting.PLOT_FIGSIZE, config.PDF_PLOT_DPI)
     
-    if map_path.exists(): os.remove(map_path)
-    if alt_path.exists(): os.remove(alt_path)
-    if rc_path.exists(): os.remove(rc_path)
+        # fpdf only embeds images from files, so each export gets its own directory
+        with tempfile.TemporaryDirectory(prefix='birdhunt_export_', dir=config.EXPORT_SCRATCH_DIR) as scratch:
+            scratch = Path(scratch)
+            with ThreadPoolExecutor(max_workers=config.EXPORT_RENDER_WORKERS) as pool:
+                map_job = pool.submit(_timed, timings, 'map', _render_cached,
+                                      keys['map'], 'map', scratch / 'map.png', render_map, tables)
+                alt_job = pool.submit(_timed, timings, 'altitude', _render_cached,
+                                      keys['alt'], 'altitude', scratch / 'alt.png', render_plot,
+                                      plotting.plot_altitude, tables)
+                rc_job = pool.submit(_timed, timings, 'rc', _render_cached,
+                                     keys['rc'], 'rc', scratch / 'rc.png', render_plot,
+                                     plotting.plot_rc_channels, tables)
+                images = {}
+                for done, (name, job) in enumerate((('map', map_job), ('alt', alt_job), ('rc', rc_job)), 1):
+                    try:
+                        images[name] = job.result()
+                    except Exception as e:
+                        print(f"Rendering {name} image failed: {e}")
+                        images[name] = None
+                    if progress is not None:
+                        progress(done, EXPORT_STEPS)
+        
+            _timed(timings, 'assemble', reporting.generate_forensic_report,
+                   str(output_pdf_path), log_file_name, summary_stats, timeline_data,
+                   images['map'], images['alt'], images['rc'])
+            if progress is not None:
+                progress(EXPORT_STEPS, EXPORT_STEPS)
+        span.bytes = os.path.getsize(output_pdf_path)
     
+    timings['total'] = time.perf_counter() - start
+    print("Export timings: " + ", ".join(f"{stage} {sec:.2f}s" for stage, sec in timings.items()))
     print(f"PDF generation complete.")
-    return True
\ No newline at end of file
+    return True
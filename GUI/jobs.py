@@ -0,0 +1,153 @@
+"""
+Background jobs for the GUI.
+Loads and exports run on a bounded thread pool as Job objects. The job
+function gets its Job as first argument and reports through
+job.progress(done, total) (bytes for parsing) and job.set_stage(); both
+raise JobCancelled once cancel() was asked for, so the work stops at its
+next report. Jobs never touch Tk: the GUI polls them from its own loop
+and collects finished ones with JobManager.finished().
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Analysis import config
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+
+class JobCancelled(Exception):
+    """Raised inside a job at its next progress report after it was cancelled."""
+
+class Job:
+    def __init__(self, name, key=None, on_done=None):
+        self.name = name
+        self.key = key
+        self.on_done = on_done
+        self.state = QUEUED
+        self.stage = ''
+        self.done = 0
+        self.total = None
+        self.result = None
+        self.error = None
+        self.started = None
+        self.finished_at = None
+        self._stage_started = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise JobCancelled(self.name)
+
+    def set_stage(self, stage):
+        """Starts a new stage; its progress counts from zero and its total is unknown until reported."""
+        self.check()
+        self.stage = stage
+        self.done, self.total = 0, None
+        self._stage_started = time.perf_counter()
+
+    def progress(self, done, total=None):
+        self.check()
+        self.done = done
+        if total is not None:
+            self.total = total
+
+    @property
+    def fraction(self):
+        """Share of the current stage done, or None when its size is unknown."""
+        if not self.total:
+            return None
+        return min(self.done / self.total, 1.0)
+
+    def eta(self):
+        """Seconds left in the current stage, extrapolated from its rate so far, or None."""
+        fraction = self.fraction
+        if not fraction or self._stage_started is None:
+            return None
+        elapsed = time.perf_counter() - self._stage_started
+        return elapsed * (1 - fraction) / fraction
+
+    def describe(self):
+        text = f"{self.name}: {self.stage or self.state}"
+        fraction = self.fraction
+        if fraction is not None:
+            text += f" {fraction:.0%}"
+        eta = self.eta()
+        if eta is not None and fraction < 1:
+            text += f", {format_eta(eta)} left"
+        return text
+
+    def _run(self, func, args, kwargs):
+        self.state = RUNNING
+        self.started = time.perf_counter()
+        self._stage_started = self.started
+        try:
+            self.check()
+            self.result = func(self, *args, **kwargs)
+            self.state = DONE
+        except JobCancelled:
+            self.state = CANCELLED
+        except Exception as e:
+            self.error = e
+            self.state = FAILED
+        finally:
+            self.finished_at = time.perf_counter()
+
+class JobManager:
+    """
+    Runs jobs on at most max_workers threads (JOB_WORKERS by default).
+    A job submitted with the key of a job still queued or running cancels
+    that one, so loading the same file twice keeps only the newest load.
+    """
+
+    def __init__(self, max_workers=None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or config.JOB_WORKERS,
+                                        thread_name_prefix='birdhunt-job')
+        self._jobs = []
+        self._lock = threading.Lock()
+
+    def submit(self, name, func, *args, key=None, on_done=None, **kwargs):
+        """Queues func(job, *args, **kwargs). on_done(job) is called by finished()'s caller."""
+        job = Job(name, key, on_done)
+        with self._lock:
+            if key is not None:
+                for other in self._jobs:
+                    if other.key == key and other.finished_at is None:
+                        other.cancel()
+            self._jobs.append(job)
+        self._pool.submit(job._run, func, args, kwargs)
+        return job
+
+    def active(self):
+        """Jobs queued or running, oldest first."""
+        with self._lock:
+            return [job for job in self._jobs if job.finished_at is None]
+
+    def finished(self):
+        """Removes and returns the jobs that ended since the last call."""
+        with self._lock:
+            ended = [job for job in self._jobs if job.finished_at is not None]
+            self._jobs = [job for job in self._jobs if job.finished_at is None]
+        return ended
+
+    def cancel_all(self):
+        for job in self.active():
+            job.cancel()
+
+    def shutdown(self):
+        """Cancels everything and returns without waiting for running jobs to notice."""
+        self.cancel_all()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+def format_eta(seconds):
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60}:{seconds % 60:02d}"
@@ -0,0 +1,29 @@
+"""
+TkinterMapView that loads its tiles through the shared on-disk tile store,
+so tiles seen in the GUI are reused by the PDF basemap and offline mode
+works from tiles cached earlier (or prefetched with `birdhunt tiles prefetch`).
+"""
+
+import io
+from PIL import Image, ImageTk
+import tkintermapview
+
+from Analysis import tile_cache
+
+class CachedMapView(tkintermapview.TkinterMapView):
+
+    def __init__(self, *args, tile_store=None, **kwargs):
+        self.tile_store = tile_store or tile_cache.default_store()
+        super().__init__(*args, **kwargs)
+
+    def request_image(self, zoom, x, y, db_cursor=None):
+        """Called from the widget's loader threads; replaces its direct HTTP download."""
+        data = self.tile_store.get(self.tile_server, zoom, x, y)
+        if data is None or not self.running:
+            return self.empty_tile_image
+        try:
+            image_tk = ImageTk.PhotoImage(Image.open(io.BytesIO(data)))
+        except Exception:
+            return self.empty_tile_image
+        self.tile_image_cache[f"{zoom}{x}{y}"] = image_tk
+        return image_tk
@@ -1,6 +1,8 @@
 """
 Main entry point for the BirdHunt Forensic Analyzer GUI.
 This file starts the application.
+With arguments (e.g. `BirdHunt batch Logs/ --out Exports/`) it runs the
+headless command line instead, without importing Tk.
 """
 
 import ssl
@@ -11,28 +13,29 @@ try:
 except Exception as e:
     print(f"Warning: Could not apply SSL fix: {e}")
 
-import matplotlib
-matplotlib.use('Agg')
-
 import sys
 import os
+import multiprocessing
+
+# Same effect as matplotlib.use('Agg') without importing matplotlib at startup
+os.environ.setdefault('MPLBACKEND', 'Agg')
 
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
-try:
-    from GUI.gui_app import BirdHuntApp
-except ImportError as e:
-    print("Error: Could not import application modules.")
-    print("Please ensure all files are in the correct directories")
-    print(f"and all requirements from 'requirements.txt' are installed.")
-    print(f"\nImportError: {e}")
-    sys.exit(1)
-except Exception as e:
-    print(f"An unexpected error occurred: {e}")
-    sys.exit(1)
 
+def run_gui():
+    try:
+        from GUI.gui_app import BirdHuntApp
+    except ImportError as e:
+        print("Error: Could not import application modules.")
+        print("Please ensure all files are in the correct directories")
+        print(f"and all requirements from 'requirements.txt' are installed.")
+        print(f"\nImportError: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        sys.exit(1)
 
-if __name__ == "__main__":
     try:
         app = BirdHuntApp()
         app.mainloop()
@@ -45,4 +48,12 @@ if __name__ == "__main__":
             root.withdraw()
             messagebox.showerror("Fatal Error", f"Application failed to start:\n{e}")
         except Exception:
-            pass
\ No newline at end of file
+            pass
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    if len(sys.argv) > 1:
+        from CLI import cli
+        sys.exit(cli.main(sys.argv[1:]))
+    run_gui()
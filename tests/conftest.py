@@ -0,0 +1,69 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Analysis import config
+
+def pytest_addoption(parser):
+    parser.addoption('--run-bench', action='store_true', help='Also run the pipeline benchmark check (tests marked bench)')
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'bench: slow pipeline benchmark check, only run with --run-bench')
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--run-bench'):
+        return
+    skip = pytest.mark.skip(reason='benchmark check, run with --run-bench')
+    for item in items:
+        if 'bench' in item.keywords:
+            item.add_marker(skip)
+
+def redirect_home(monkeypatch, home):
+    """Points every per-user file the code writes (spans, cache, catalog, tiles) into home."""
+    monkeypatch.setattr(config, 'SPAN_LOG_PATH', home / 'spans.jsonl')
+    monkeypatch.setattr(config, 'CACHE_DIR', home / 'cache')
+    monkeypatch.setattr(config, 'CATALOG_PATH', home / 'catalog.db')
+    monkeypatch.setattr(config, 'TILE_CACHE_PATH', home / 'tiles.db')
+    monkeypatch.setattr(config, 'CONSOLE_LOG_PATH', home / 'console.log')
+    return home
+
+@pytest.fixture(scope='session', autouse=True)
+def isolated_session_home(tmp_path_factory):
+    # Module and session fixtures are set up before isolated_home, so they get a shared one
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        yield redirect_home(monkeypatch, tmp_path_factory.mktemp('birdhunt'))
+
+@pytest.fixture(autouse=True)
+def isolated_home(tmp_path, monkeypatch):
+    """Each test's own per-user files, under its tmp_path."""
+    return redirect_home(monkeypatch, tmp_path / 'birdhunt')
+
+@pytest.fixture(scope='session')
+def synthetic_tlog(tmp_path_factory):
+    """A small synthetic log (see CLI/synth.py) shared by the tests that only read it."""
+    from CLI import synth
+
+    path = tmp_path_factory.mktemp('logs') / 'synthetic.tlog'
+    synth.generate(path, 2 * 1024 ** 2, seed=1)
+    return path
+
+def assert_same_tables(expected, actual, check_dtype=True):
+    """
+    Same per-type columns (values and dtypes), row timestamps and dense frame.
+    check_dtype=False accepts float64 for integer columns, as in live snapshots.
+    """
+    assert expected.columns.keys() == actual.columns.keys()
+    for type_, columns in expected.columns.items():
+        assert columns.keys() == actual.columns[type_].keys()
+        for name, values in columns.items():
+            other = actual.columns[type_][name]
+            if check_dtype:
+                assert values.dtype == other.dtype, f'{type_}.{name}'
+            np.testing.assert_array_equal(values, other, err_msg=f'{type_}.{name}')
+    np.testing.assert_array_equal(expected.row_timestamps, actual.row_timestamps)
+    pd.testing.assert_frame_equal(expected.wide(), actual.wide(), check_dtype=check_dtype)
@@ -0,0 +1,35 @@
+"""Batch runs: a log that kills its worker process fails alone and the rest of the batch carries on."""
+
+import json
+import os
+
+import pytest
+
+from CLI import batch
+
+def fake_process_one(log_path, out_dir):
+    # Stands in for the full pipeline; 'crash' logs take their worker process down with them
+    if 'crash' in os.path.basename(log_path):
+        os._exit(1)
+    return {'file': log_path, 'status': 'ok', 'timings': {}}
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    # The worker processes are forked after this, so they run the stand-in too
+    monkeypatch.setattr(batch, '_process_one', fake_process_one)
+    logs = tmp_path / 'logs'
+    logs.mkdir()
+    for name in ['a', 'b', 'crash1', 'c', 'd', 'crash2', 'e', 'f']:
+        (logs / f'{name}.tlog').write_bytes(b'')
+    return logs
+
+@pytest.mark.parametrize('jobs', [1, 3])
+def test_only_the_crashing_logs_fail(log_dir, tmp_path, jobs):
+    summary = batch.run_batch(log_dir, tmp_path / 'out', jobs=jobs)
+    status = {os.path.basename(r['file']): r['status'] for r in summary['files']}
+    assert status == {'a.tlog': 'ok', 'b.tlog': 'ok', 'c.tlog': 'ok', 'd.tlog': 'ok', 'e.tlog': 'ok',
+                      'f.tlog': 'ok', 'crash1.tlog': 'failed', 'crash2.tlog': 'failed'}
+    assert (summary['succeeded'], summary['failed']) == (6, 2)
+    crashed = [r for r in summary['files'] if r['status'] == 'failed']
+    assert all('BrokenProcessPool' in r['error'] for r in crashed)
+    assert json.loads((tmp_path / 'out' / batch.SUMMARY_FILE).read_text())['failed'] == 2
@@ -0,0 +1,53 @@
+"""Per-machine benchmark baselines and the opt-in `bench --check` run (pytest --run-bench)."""
+
+import json
+
+import pytest
+
+from Analysis import config
+from CLI import bench
+
+def fake_results(seconds):
+    return {stage: {'seconds': seconds, 'peak_mb': 10.0} for stage in bench.STAGES}
+
+@pytest.fixture
+def measured(monkeypatch):
+    """bench.run on fake timings: set results['seconds'] to what the next measure() returns."""
+    results = {'seconds': 1.0}
+    monkeypatch.setattr(bench, 'measure', lambda *args, **kwargs: fake_results(results['seconds']))
+    return results
+
+def run(log, baselines, **kwargs):
+    return bench.run(log, baselines=baselines, name='log', repeat=1, memory=False, **kwargs)
+
+def test_check_is_skipped_without_a_baseline(synthetic_tlog, tmp_path, measured, capsys):
+    baselines = tmp_path / 'baselines.json'
+    assert run(synthetic_tlog, baselines, check=True) == 0
+    assert 'SKIP: no baseline' in capsys.readouterr().out
+    assert not baselines.exists()
+
+def test_baselines_are_kept_per_host(synthetic_tlog, tmp_path, measured, monkeypatch):
+    baselines = tmp_path / 'baselines.json'
+    monkeypatch.setattr(bench, '_host', lambda: 'fast-machine')
+    assert run(synthetic_tlog, baselines, update=True) == 0
+
+    measured['seconds'] = 2.0
+    assert run(synthetic_tlog, baselines, check=True) == 1
+    # Reported but not failed without --check
+    assert run(synthetic_tlog, baselines) == 0
+
+    # Another machine does not inherit the first one's timings
+    monkeypatch.setattr(bench, '_host', lambda: 'slow-machine')
+    assert bench.stored_baseline('log', baselines) == {}
+    assert run(synthetic_tlog, baselines, check=True) == 0
+    assert run(synthetic_tlog, baselines, update=True) == 0
+    assert run(synthetic_tlog, baselines, check=True) == 0
+    assert sorted(json.loads(baselines.read_text())) == ['fast-machine', 'slow-machine']
+
+@pytest.mark.bench
+def test_pipeline_has_not_regressed():
+    # The same run as `python Main.py bench --check`, against this machine's recorded baseline
+    if not bench.stored_baseline(bench.synthetic_name('20MB', 0)):
+        pytest.skip(f"no baseline for this machine in {config.BENCH_BASELINES}, "
+                    f"record one with `python Main.py bench --update`")
+    assert bench.run(check=True) == 0
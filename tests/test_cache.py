@@ -0,0 +1,76 @@
+"""Parsed-log cache: keys, store/load round trip and eviction (CACHE_DIR is a tmp_path, see conftest)."""
+
+import os
+
+import pytest
+
+from Analysis import analysis
+from Analysis import cache
+from Analysis import config
+from Analysis import log_converter
+from conftest import assert_same_tables
+
+@pytest.fixture(scope='module')
+def parsed(synthetic_tlog):
+    tables = log_converter.TlogParser(synthetic_tlog).to_tables()
+    return tables, analysis.calculate_summary_stats(tables), analysis.calculate_timeline_events(tables)
+
+def test_load_after_store_matches_a_fresh_parse(synthetic_tlog, parsed):
+    tables, stats, timeline = parsed
+    key = cache.cache_key(synthetic_tlog)
+    assert cache.load(key) is None
+    cache.store(key, tables, stats, timeline)
+
+    loaded_tables, loaded_stats, loaded_timeline = cache.load(key)
+    assert_same_tables(log_converter.TlogParser(synthetic_tlog).to_tables(), loaded_tables)
+    assert loaded_stats == pytest.approx({k: float(v) for k, v in stats.items()})
+    assert loaded_timeline == timeline
+
+@pytest.mark.parametrize('change', ['schema', 'version', 'dialect'])
+def test_key_changes_miss_the_cache(synthetic_tlog, parsed, monkeypatch, change):
+    key = cache.cache_key(synthetic_tlog)
+    cache.store(key, *parsed)
+    dialect = config.DEFAULT_DIALECT
+    if change == 'schema':
+        fields = {type_: list(attrs) for type_, attrs in config.FORENSIC_FIELDS.items()}
+        fields['ATTITUDE'].remove('yaw')
+        monkeypatch.setattr(config, 'FORENSIC_FIELDS', fields)
+    elif change == 'version':
+        monkeypatch.setattr(config, 'CACHE_VERSION', config.CACHE_VERSION + 1)
+    else:
+        dialect = 'common'
+
+    other = cache.cache_key(synthetic_tlog, dialect)
+    assert other != key
+    assert cache.load(other) is None
+
+def write_entry(path, size, mtime):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'x' * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+def test_evict_drops_the_oldest_parsed_entries_only():
+    entries = [write_entry(config.CACHE_DIR / f'entry{i}.npz', 100, 1000 + i) for i in range(5)]
+    render = write_entry(config.CACHE_DIR / 'renders' / 'old.png', 100, 1)
+    seek = write_entry(config.CACHE_DIR / 'seek' / 'old.npz', 100, 1)
+
+    assert cache.evict(max_bytes=250) == 3
+    assert [path.exists() for path in entries] == [False, False, False, True, True]
+    assert cache.evict(max_bytes=0) == 2
+    assert render.exists() and seek.exists()
+
+    assert cache.evict_renders(max_bytes=0) == 1
+    assert cache.evict_seek_indexes(max_bytes=0) == 1
+    assert not render.exists() and not seek.exists()
+
+def test_stale_temp_file_is_ignored(synthetic_tlog, parsed):
+    key = cache.cache_key(synthetic_tlog)
+    # Left behind by a writer that died mid-write
+    stale = write_entry(config.CACHE_DIR / f'{key}.npz.tmp', 5000, 1)
+
+    assert cache.load(key) is None
+    assert cache.evict(max_bytes=0) == 0
+    cache.store(key, *parsed)
+    assert cache.load(key) is not None
+    assert not stale.exists()
@@ -0,0 +1,33 @@
+"""Incremental catalog indexing, including logs with identical content at different paths."""
+
+import re
+import shutil
+
+from Analysis.catalog import default_catalog
+from CLI import catalog
+
+def index_counts(capsys, log_dir):
+    assert catalog.index_directory(log_dir, jobs=1) == 0
+    summary = capsys.readouterr().out.strip().splitlines()[-1]
+    return tuple(int(n) for n in re.search(r'(\d+) indexed, (\d+) unchanged, (\d+) failed', summary).groups())
+
+def test_duplicate_logs_are_each_catalogued_and_settle(synthetic_tlog, tmp_path, capsys):
+    log_dir = tmp_path / 'dup'
+    log_dir.mkdir()
+    shutil.copy(synthetic_tlog, log_dir / 'a.tlog')
+    shutil.copy(synthetic_tlog, log_dir / 'b.tlog')
+
+    # One of the pair is parsed, the other copies its entry
+    assert index_counts(capsys, log_dir) == (1, 1, 0)
+    assert index_counts(capsys, log_dir) == (0, 2, 0)
+
+    flights = default_catalog()
+    rows = flights.find()
+    assert sorted(row['name'] for row in rows) == ['a.tlog', 'b.tlog']
+    a, b = sorted(rows, key=lambda row: row['name'])
+    assert a['file_hash'] == b['file_hash']
+    assert a['duration_sec'] == b['duration_sec']
+    assert flights.events(a['id']) == flights.events(b['id'])
+    assert flights.modes(a['id']) == flights.modes(b['id'])
+    spans = flights.within_bbox(a['min_lat'], a['min_lon'], a['max_lat'], a['max_lon'])
+    assert {span['flight_id'] for span in spans} == {a['id'], b['id']}
@@ -0,0 +1,75 @@
+"""Streamed Parquet/Arrow export, read back with pyarrow and compared with the in-memory parse."""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from Analysis import columnar_export
+from Analysis import log_converter
+from CLI import convert
+
+pa = pytest.importorskip('pyarrow')
+import pyarrow.ipc
+import pyarrow.parquet
+
+# Small enough that every file is written as several row groups / record batches
+BATCH_ROWS = 1000
+
+@pytest.fixture(scope='module')
+def tables(synthetic_tlog):
+    return log_converter.TlogParser(synthetic_tlog).to_tables()
+
+def read(path, fmt):
+    if fmt == 'parquet':
+        return pyarrow.parquet.read_table(path), pyarrow.parquet.ParquetFile(path).num_row_groups
+    with pa.memory_map(str(path)) as source:
+        reader = pyarrow.ipc.open_file(source)
+        return reader.read_all(), reader.num_record_batches
+
+def same_frame(expected, table):
+    # Arrow has typed nulls where pandas has NaN in object and float columns
+    actual = table.to_pandas()
+    assert list(actual.columns) == list(expected.columns)
+    for name in expected.columns:
+        if expected[name].dtype == object:
+            assert actual[name].where(actual[name].notna(), None).tolist() == \
+                   expected[name].where(expected[name].notna(), None).tolist(), name
+        else:
+            pd.testing.assert_series_equal(expected[name], actual[name], check_dtype=False)
+
+@pytest.mark.parametrize('fmt', ['parquet', 'arrow'])
+def test_wide_export_matches_to_dataframe(synthetic_tlog, tables, tmp_path, fmt):
+    out = tmp_path / f'wide{columnar_export.FORMATS[fmt]}'
+    written = columnar_export.export(synthetic_tlog, out, fmt, 'wide', batch_rows=BATCH_ROWS)
+    dense = tables.wide()
+    assert written == {str(out): len(dense)}
+
+    table, batches = read(out, fmt)
+    assert batches == -(-len(dense) // BATCH_ROWS)
+    same_frame(dense, table)
+
+@pytest.mark.parametrize('fmt', ['parquet', 'arrow'])
+def test_tables_export_matches_message_tables(synthetic_tlog, tables, tmp_path, fmt):
+    written = columnar_export.export(synthetic_tlog, tmp_path, fmt, 'tables', batch_rows=BATCH_ROWS)
+    present = [type_ for type_ in tables.fields if type_ in tables]
+    assert sorted(Path(path).stem for path in written) == sorted(present)
+    assert sum(written.values()) == tables.message_count()
+
+    for type_ in present:
+        path = tmp_path / f'{type_}{columnar_export.FORMATS[fmt]}'
+        assert written[str(path)] == tables.message_count(type_)
+        table, _ = read(path, fmt)
+        same_frame(tables[type_], table)
+
+def test_convert_cli_exports_a_window(synthetic_tlog, tables, tmp_path):
+    out = tmp_path / 'window.parquet'
+    assert convert.run(synthetic_tlog, 'parquet', 'wide', out, BATCH_ROWS, start='100', end='200') == 0
+    expected = log_converter.TlogParser(synthetic_tlog, time_range=(tables.start_time + 100,
+                                                                    tables.start_time + 200)).to_dataframe()
+    assert len(expected)
+    same_frame(expected.reset_index(drop=True), pyarrow.parquet.read_table(out))
+
+def test_unknown_format_is_rejected(synthetic_tlog, tmp_path):
+    with pytest.raises(ValueError, match='unknown format'):
+        columnar_export.export(synthetic_tlog, tmp_path / 'out.csv', 'csv')
@@ -0,0 +1,134 @@
+"""Timeline detectors on small hand-built MessageTables."""
+
+import numpy as np
+import pytest
+
+from Analysis import config
+from Analysis import detectors
+from Analysis import log_converter
+from Analysis.column_store import TableBuilder
+
+NAN = float('nan')
+QUADROTOR, ARDUPILOT = 2, 3
+GCS, NO_AUTOPILOT = 6, 8
+ARMED = 128
+START = 1717200000.0  # 2024-06-01 00:00:00 UTC
+
+def make_tables(messages):
+    """messages: (timestamp, type, {field: value}) in time order; fields not given are NaN."""
+    builder = TableBuilder(config.FORENSIC_FIELDS, log_converter.column_kinds(config.FORENSIC_FIELDS))
+    for timestamp, type_, values in messages:
+        builder.append(type_, timestamp, [values.get(attr, NAN) for attr in config.FORENSIC_FIELDS[type_]])
+    return builder.finish()
+
+def altitude_log(metres):
+    """One GLOBAL_POSITION_INT a second at these heights above home (sent in mm, as MAVLink does)."""
+    return make_tables([(float(t), 'GLOBAL_POSITION_INT', {'relative_alt': m * 1000, 'alt': (100 + m) * 1000})
+                        for t, m in enumerate(metres)])
+
+def heartbeat(t, custom_mode=0, base_mode=0, type_=QUADROTOR, autopilot=ARDUPILOT):
+    return (t, 'HEARTBEAT', {'type': type_, 'autopilot': autopilot, 'base_mode': base_mode,
+                             'custom_mode': custom_mode, 'system_status': 4})
+
+@pytest.fixture(autouse=True)
+def thresholds(monkeypatch):
+    # Takeoff at 5 m, landing at 3 m
+    monkeypatch.setattr(config, 'ALT_THRESHOLD', 5.0)
+    monkeypatch.setattr(config, 'ALT_HYSTERESIS', 2.0)
+
+@pytest.mark.parametrize('metres, expected', [
+    ([0, 0, 6, 10, 10, 0, 0, 8, 8, 1], [(2, 'Takeoff'), (5, 'Landing'), (7, 'Takeoff'), (9, 'Landing')]),
+    # Dips that stay above 3 m are not landings
+    ([0, 6, 4, 5.5, 3.5, 6, 10, 0], [(1, 'Takeoff'), (7, 'Landing')]),
+    # Climbs that stay below 5 m are not takeoffs
+    ([0, 4.9, 3, 4.9, 2, 4.9, 0], []),
+    ([0, 2, 6, 10, 20], [(2, 'Takeoff')]),
+    ([10, 10, 2, 0], [(0, 'Airborne at Log Start'), (2, 'Landing')]),
+    ([10, 10, 10], [(0, 'Airborne at Log Start')]),
+    ([], []),
+], ids=['two-cycles', 'jitter-airborne', 'jitter-ground', 'ends-airborne', 'starts-airborne',
+        'airborne-throughout', 'empty'])
+def test_flight_cycles(metres, expected):
+    times, labels = detectors.flight_cycles(altitude_log(metres))
+    assert list(zip(times.tolist(), labels)) == expected
+
+def test_relative_altitude_is_read_in_millimetres():
+    # GLOBAL_POSITION_INT altitudes are millimetres: 600 mm is 0.6 m, not a takeoff
+    # (the original timeline divided by 100 and read it as 6 m)
+    tables = make_tables([(float(t), 'GLOBAL_POSITION_INT', {'relative_alt': mm})
+                          for t, mm in enumerate([0, 600, 600, 0])])
+    assert detectors.flight_cycles(tables)[1] == []
+    assert detectors.flight_cycles(altitude_log([0, 6, 6, 0]))[1] == ['Takeoff', 'Landing']
+
+def test_altitude_plot_is_in_metres():
+    from Analysis import plotting
+
+    fig = plotting.plot_altitude(altitude_log([0, 12.5, 40]))
+    np.testing.assert_array_equal(fig.axes[0].lod_series[0].y, [100, 112.5, 140])
+
+def test_mode_changes_follow_the_vehicle_only():
+    tables = make_tables([
+        heartbeat(0.0, custom_mode=0),
+        heartbeat(0.5, custom_mode=5, type_=GCS, autopilot=NO_AUTOPILOT),
+        heartbeat(1.0, custom_mode=0),
+        heartbeat(2.0, custom_mode=5),
+        heartbeat(3.0, custom_mode=5),
+        heartbeat(4.0, custom_mode=6),
+    ])
+    times, labels = detectors.mode_changes(tables)
+    assert times.tolist() == [0.0, 2.0, 4.0]
+    assert labels == ['Mode: STABILIZE', 'Mode: LOITER', 'Mode: RTL']
+
+@pytest.mark.parametrize('base_modes, expected', [
+    ([0, 0, ARMED, ARMED, 0], [(2, 'Armed'), (4, 'Disarmed')]),
+    ([ARMED | 1, ARMED, 0, ARMED], [(0, 'Armed'), (2, 'Disarmed'), (3, 'Armed')]),
+    ([1, 0, 0], []),
+])
+def test_arming(base_modes, expected):
+    tables = make_tables([heartbeat(float(t), base_mode=mode) for t, mode in enumerate(base_modes)]
+                         + [heartbeat(9.0, base_mode=ARMED, type_=GCS, autopilot=NO_AUTOPILOT)])
+    times, labels = detectors.arming(tables)
+    assert list(zip(times.tolist(), labels)) == expected
+
+@pytest.mark.parametrize('fix_types, expected', [
+    ([1, 1, 3, 3, 2, 4], [(2, 'GPS Lock'), (4, 'GPS Lost'), (5, 'GPS Lock')]),
+    ([3, 3, 0], [(0, 'GPS Lock'), (2, 'GPS Lost')]),
+    ([0, 1, 2], []),
+])
+def test_gps_fix(fix_types, expected):
+    tables = make_tables([(float(t), 'GPS_RAW_INT', {'fix_type': fix}) for t, fix in enumerate(fix_types)])
+    times, labels = detectors.gps_fix(tables)
+    assert list(zip(times.tolist(), labels)) == expected
+
+@pytest.mark.parametrize('messages, expected', [
+    # The first SYSTEM_TIME carrying a real clock sets the offset; earlier zero clocks are skipped
+    ([(5.0, 'SYSTEM_TIME', {'time_unix_usec': 0}), (10.0, 'SYSTEM_TIME', {'time_unix_usec': START * 1e6}),
+      (20.0, 'SYSTEM_TIME', {'time_unix_usec': (START + 99) * 1e6})], START - 10.0),
+    # No vehicle clock: timestamps that are already UNIX time are used as they are
+    ([(START, 'HEARTBEAT', {}), (START + 1, 'SYSTEM_TIME', {'time_unix_usec': 0})], 0.0),
+    ([(5.0, 'HEARTBEAT', {})], None),
+])
+def test_utc_offset(messages, expected):
+    assert detectors.utc_offset(make_tables(messages)) == expected
+
+def test_detect_events_orders_the_timeline_and_converts_to_utc():
+    tables = make_tables([
+        heartbeat(0.0),
+        (1.0, 'GPS_RAW_INT', {'fix_type': 3}),
+        (1.5, 'GLOBAL_POSITION_INT', {'relative_alt': 0}),
+        (2.0, 'SYSTEM_TIME', {'time_unix_usec': (START + 60) * 1e6}),
+        heartbeat(3.0, base_mode=ARMED),
+        (4.0, 'GLOBAL_POSITION_INT', {'relative_alt': 8000}),
+        (5.0, 'STATUSTEXT', {'severity': 6, 'text': 'Mission started'}),
+        (6.0, 'GLOBAL_POSITION_INT', {'relative_alt': 0}),
+        heartbeat(7.0),
+    ])
+    timeline = detectors.detect_events(tables)
+    assert [row['Event'] for row in timeline] == [
+        'Log Start', 'Mode: STABILIZE', 'GPS Lock', 'Armed', 'Takeoff', '[INFO] Mission started',
+        'Landing', 'Log End', 'Disarmed']
+    rows = {row['Event']: row for row in timeline}
+    assert rows['Takeoff']['Time (s)'] == '4.0'
+    # SYSTEM_TIME at log time 2.0 reads 00:01:00, so log time 4.0 is 00:01:02
+    assert rows['Takeoff']['Real Time (UTC)'] == '00:01:02'
+    assert np.all(np.diff([float(row['Time (s)']) for row in timeline]) >= 0)
@@ -0,0 +1,55 @@
+"""Live mode fed by replaying a recorded log into a growing .tlog."""
+
+import threading
+import time
+
+import pytest
+
+from Analysis import config
+from Analysis.live import LiveSession
+from CLI import replay
+from GUI import gui_helpers
+from conftest import assert_same_tables
+
+# The 2 MB synthetic log spans about 740 s of flight, so this replays it in about 4 s
+REPLAY_SPEED = 200
+
+def test_replayed_log_matches_a_normal_load(synthetic_tlog, tmp_path):
+    growing = tmp_path / 'growing.tlog'
+    growing.touch()
+    session = LiveSession.follow_tlog(growing)
+    session.start()
+    writer = threading.Thread(target=replay.replay, args=(synthetic_tlog,),
+                              kwargs={'append_to': growing, 'speed': REPLAY_SPEED})
+    writer.start()
+
+    counts = []
+    snapshot = None
+    while writer.is_alive():
+        latest = session.latest()
+        if latest is not None:
+            snapshot = latest
+            counts.append(snapshot[0].message_count())
+        time.sleep(1.0 / config.LIVE_REDRAW_HZ)
+    writer.join()
+
+    expected_tables, expected_stats, expected_timeline = gui_helpers.process_log_file(synthetic_tlog, jobs=1)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline and (snapshot is None or
+                                           snapshot[0].message_count() < expected_tables.message_count()):
+        snapshot = session.latest() or snapshot
+        time.sleep(0.05)
+    session.stop()
+
+    # Snapshots came while the log was still growing, each with more messages than the last
+    assert len(counts) >= 2
+    assert counts == sorted(counts) and counts[0] < counts[-1]
+    assert counts[0] < expected_tables.message_count()
+
+    tables, stats, timeline = snapshot
+    # Live snapshots are views of the growing float64 buffers, so integer fields stay float there
+    assert_same_tables(expected_tables, tables, check_dtype=False)
+    assert stats.keys() == expected_stats.keys()
+    for key, value in expected_stats.items():
+        assert stats[key] == pytest.approx(value, rel=1e-9), key
+    assert timeline == expected_timeline
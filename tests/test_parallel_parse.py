@@ -0,0 +1,53 @@
+"""The process-pool parse must give exactly what a serial parse gives."""
+
+import pytest
+
+from Analysis import config
+from Analysis import log_converter
+from conftest import assert_same_tables
+
+_parse_range = log_converter._parse_range
+
+def _misaligned_parse_range(*args, **kwargs):
+    # Module level so the process pool can pickle it by name
+    chunk = _parse_range(*args, **kwargs)
+    if args[2] > 0:
+        chunk['first_record'] += 1
+    return chunk
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(config, 'PARSE_CHUNK_BYTES', 64 * 1024)
+
+@pytest.mark.parametrize('backend', ['mmap', 'stream'])
+def test_parallel_matches_serial(synthetic_tlog, small_chunks, backend, capsys):
+    serial = log_converter.TlogParser(synthetic_tlog, backend=backend).to_tables(jobs=1)
+    parallel = log_converter.TlogParser(synthetic_tlog, backend=backend).to_tables(jobs=4)
+
+    output = capsys.readouterr().out
+    assert 'seam mismatch' not in output
+    assert f'{-(-synthetic_tlog.stat().st_size // config.PARSE_CHUNK_BYTES)} chunks' in output
+    assert serial.message_count() > 0
+    assert_same_tables(serial, parallel)
+
+def test_seam_mismatch_falls_back_to_serial(synthetic_tlog, small_chunks, monkeypatch, capsys):
+    serial = log_converter.TlogParser(synthetic_tlog).to_tables(jobs=1)
+    monkeypatch.setattr(log_converter, '_parse_range', _misaligned_parse_range)
+    parallel = log_converter.TlogParser(synthetic_tlog).to_tables(jobs=4)
+
+    assert 'seam mismatch' in capsys.readouterr().out
+    assert_same_tables(serial, parallel)
+
+def test_progress_error_stops_parallel_parse(synthetic_tlog, small_chunks):
+    class Cancelled(Exception):
+        pass
+
+    reports = []
+
+    def progress(done, total):
+        reports.append((done, total))
+        raise Cancelled
+
+    with pytest.raises(Cancelled):
+        log_converter.TlogParser(synthetic_tlog).to_tables(jobs=4, progress=progress)
+    assert len(reports) == 1
@@ -0,0 +1,82 @@
+"""As-of resampling onto a common grid, on small hand-built tables."""
+
+import numpy as np
+import pytest
+
+from Analysis import resample
+from Analysis.column_store import INTEGER, NUMERIC, TEXT, TableBuilder
+
+NAN, INF = np.nan, np.inf
+FIELDS = {'A': ['x', 'n'], 'B': ['s']}
+KINDS = {'A.x': NUMERIC, 'A.n': INTEGER, 'B.s': TEXT}
+GRID = [0.0, 0.5, 1.0, 1.4, 1.6, 3.0, 3.9, 5.0]
+
+def texts(column):
+    """Text cells with the empty ones (None or NaN, depending on pandas) as None."""
+    return [value if isinstance(value, str) else None for value in column]
+
+@pytest.fixture
+def tables():
+    # A at 0, 1, 2 and 4 s (a 2 s gap before the last sample), B at 0.5 and 2.5 s
+    builder = TableBuilder(FIELDS, KINDS)
+    messages = [(0.0, 'A', [0.0, 1]), (0.5, 'B', ['a']), (1.0, 'A', [10.0, 2]), (2.0, 'A', [20.0, 3]),
+                (2.5, 'B', ['b']), (4.0, 'A', [40.0, 5])]
+    for timestamp, type_, values in messages:
+        builder.append(type_, timestamp, values)
+    return builder.finish()
+
+@pytest.mark.parametrize('method, max_age, expected', [
+    ('previous', INF, [0, 0, 10, 10, 10, 20, 20, 40]),
+    ('previous', 0.5, [0, 0, 10, 10, NAN, NAN, NAN, NAN]),
+    # Ties go to the earlier sample
+    ('nearest', INF, [0, 0, 10, 10, 20, 20, 40, 40]),
+    ('nearest', 0.5, [0, 0, 10, 10, 20, NAN, 40, NAN]),
+    ('linear', INF, [0, 5, 10, 14, 16, 30, 39, NAN]),
+    # No interpolation across the 2 s gap between 2 and 4 s
+    ('linear', 1.5, [0, 5, 10, 14, 16, NAN, NAN, NAN]),
+])
+def test_numeric_methods(tables, method, max_age, expected):
+    frame = resample.resample(tables, ['A.x'], grid=GRID, method=method, max_age=max_age)
+    np.testing.assert_array_equal(frame['timestamp'], GRID)
+    np.testing.assert_allclose(frame['A.x'], expected)
+
+def test_integer_fields_stay_integer_without_gaps(tables):
+    frame = resample.resample(tables, ['A.n'], grid=GRID, method='previous', max_age=INF)
+    assert frame['A.n'].dtype == np.int64
+    assert frame['A.n'].tolist() == [1, 1, 2, 2, 2, 3, 3, 5]
+    gappy = resample.resample(tables, ['A.n'], grid=[-1.0] + GRID, method='previous', max_age=INF)
+    assert np.isnan(gappy['A.n'][0])
+
+@pytest.mark.parametrize('method, max_age, expected', [
+    ('previous', INF, [None, 'a', 'a', 'a', 'a', 'b', 'b', 'b']),
+    # Text is never interpolated: 'linear' takes the previous value
+    ('linear', INF, [None, 'a', 'a', 'a', 'a', 'b', 'b', 'b']),
+    ('nearest', 1.0, ['a', 'a', 'a', 'a', 'b', 'b', None, None]),
+])
+def test_text_fields(tables, method, max_age, expected):
+    frame = resample.resample(tables, ['B.s'], grid=GRID, method=method, max_age=max_age)
+    assert texts(frame['B.s']) == expected
+
+def test_settings_by_field_type_and_default(tables):
+    frame = resample.resample(tables, ['A', 'B'], grid=GRID, method={'A.x': 'linear', '*': 'previous'},
+                              max_age={'B': 0.6, '*': INF})
+    assert list(frame.columns) == ['timestamp', 'A.x', 'A.n', 'B.s']
+    np.testing.assert_allclose(frame['A.x'], [0, 5, 10, 14, 16, 30, 39, NAN])
+    assert frame['A.n'].tolist() == [1, 1, 2, 2, 2, 3, 3, 5]
+    assert texts(frame['B.s']) == [None, 'a', 'a', None, None, 'b', None, None]
+
+def test_time_grid_spans_the_log(tables):
+    np.testing.assert_allclose(resample.time_grid(tables, rate_hz=2), np.arange(9) / 2)
+    # max_age=None falls back to RESAMPLE_MAX_AGE_SEC
+    frame = resample.resample(tables, ['A.x'], rate_hz=1, max_age=None)
+    assert frame['timestamp'].tolist() == [0, 1, 2, 3, 4]
+
+@pytest.mark.parametrize('kwargs, message', [
+    ({'series': ['C.x']}, 'unknown message type'),
+    ({'series': ['A.z']}, 'has no field'),
+    ({'series': ['A.x'], 'method': 'cubic'}, 'unknown method'),
+    ({'series': ['A.x'], 'rate_hz': 0}, 'rate must be positive'),
+])
+def test_bad_arguments(tables, kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        resample.resample(tables, **kwargs)
@@ -0,0 +1,24 @@
+"""The sparse per-type tables must rebuild exactly the dense forensic frame."""
+
+import pandas as pd
+import pytest
+
+from Analysis import log_converter
+
+@pytest.fixture(scope='module')
+def dense(synthetic_tlog):
+    return log_converter.TlogParser(synthetic_tlog).to_dataframe()
+
+def test_wide_matches_to_dataframe(synthetic_tlog, dense):
+    tables = log_converter.TlogParser(synthetic_tlog).to_tables()
+    wide = tables.wide()
+    assert list(wide.columns) == list(dense.columns)
+    pd.testing.assert_frame_equal(dense, wide)
+
+def test_to_csv_round_trip(synthetic_tlog, dense, tmp_path):
+    out = tmp_path / 'forensic.csv'
+    assert log_converter.TlogParser(synthetic_tlog).to_csv(out)
+    # Text fields come back as str and empty cells as NaN; integer columns with gaps as float
+    expected = dense.astype({name: str for name in dense.columns if dense[name].dtype == object})
+    expected = expected.mask(dense.isna())
+    pd.testing.assert_frame_equal(expected, pd.read_csv(out), check_dtype=False)
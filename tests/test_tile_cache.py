@@ -0,0 +1,104 @@
+"""TileStore against a local stub tile server: prefetch, offline mode, LRU eviction, failed downloads."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from Analysis import config
+from Analysis import tile_cache
+
+BOX = (-35.37, 149.16, -35.36, 149.17)
+
+class StubTiles(BaseHTTPRequestHandler):
+    """Serves /z/x/y.png as b'tile z/x/y', or the status set for that path in server.statuses."""
+
+    def do_GET(self):
+        self.server.hits.append(self.path)
+        status = self.server.statuses.get(self.path, 200)
+        body = f'tile {self.path[1:-4]}'.encode() if status == 200 else b'nope'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def tile_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubTiles)
+    server.hits = []
+    server.statuses = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f'http://127.0.0.1:{server.server_address[1]}/{{z}}/{{x}}/{{y}}.png'
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def store(tmp_path):
+    return tile_cache.TileStore(tmp_path / 'tiles.db', max_bytes=1024 ** 2, offline=False)
+
+def tiles_in(box, zooms):
+    tiles = []
+    for zoom in zooms:
+        x0, y0, x1, y1 = tile_cache.tile_range(*box, zoom)
+        tiles += [(zoom, x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+    return tiles
+
+def test_prefetch_downloads_every_tile_once(store, tile_server):
+    zooms = range(14, 17)
+    expected = tiles_in(BOX, zooms)
+
+    assert store.prefetch(tile_server.url, BOX, zooms) == (0, len(expected), 0)
+    assert sorted(tile_server.hits) == sorted(f'/{z}/{x}/{y}.png' for z, x, y in expected)
+    for zoom, x, y in expected:
+        assert store.lookup(tile_server.url, zoom, x, y) == f'tile {zoom}/{x}/{y}'.encode()
+
+    # A second run is served entirely from the store
+    assert store.prefetch(tile_server.url, BOX, zooms) == (len(expected), 0, 0)
+    assert len(tile_server.hits) == len(expected)
+
+def test_offline_serves_only_cached_tiles(tmp_path, tile_server):
+    store = tile_cache.TileStore(tmp_path / 'tiles.db', offline=True)
+    (zoom, x, y), *missing = tiles_in(BOX, [16])
+    store.put(tile_server.url, zoom, x, y, b'cached')
+
+    assert store.get(tile_server.url, zoom, x, y) == b'cached'
+    assert all(store.get(tile_server.url, *tile) is None for tile in missing)
+    assert store.prefetch(tile_server.url, BOX, [16]) == (1, 0, len(missing))
+    assert tile_server.hits == []
+
+def test_least_recently_used_tiles_are_evicted_past_the_cap(store, tile_server, monkeypatch):
+    clock = iter(range(1000))
+    # Distinct, increasing last_used stamps without touching the real time module
+    monkeypatch.setattr(tile_cache, 'time', SimpleNamespace(time=lambda: float(next(clock))))
+    monkeypatch.setattr(config, 'TILE_EVICT_EVERY', 1)
+    store.max_bytes = 3 * len(b'tile 1/0/0')
+
+    for x in range(3):
+        store.put(tile_server.url, 1, x, 0, f'tile 1/{x}/0'.encode())
+    store.lookup(tile_server.url, 1, 0, 0)
+    assert store.size() == store.max_bytes
+
+    # Over the cap: (1, 1, 0) is now the least recently used
+    store.put(tile_server.url, 1, 1, 1, b'tile 1/1/1')
+    assert store.size() <= store.max_bytes
+    assert store.lookup(tile_server.url, 1, 1, 0) is None
+    for x, y in ((0, 0), (2, 0), (1, 1)):
+        assert store.lookup(tile_server.url, 1, x, y) is not None
+
+@pytest.mark.parametrize('status', [404, 500])
+def test_failed_downloads_are_not_stored(store, tile_server, status):
+    tiles = tiles_in(BOX, [15])
+    zoom, x, y = tiles[0]
+    tile_server.statuses[f'/{zoom}/{x}/{y}.png'] = status
+
+    assert store.get(tile_server.url, zoom, x, y) is None
+    assert store.lookup(tile_server.url, zoom, x, y) is None
+    assert store.size() == 0
+    assert store.prefetch(tile_server.url, BOX, [15]) == (0, len(tiles) - 1, 1)
+    assert store.lookup(tile_server.url, zoom, x, y) is None
@@ -0,0 +1,61 @@
+"""A windowed parse (seek index + byte range) must equal a full parse filtered to the same window."""
+
+import os
+
+import numpy as np
+import pytest
+
+from Analysis import config
+from Analysis import log_converter
+from Analysis import seek_index
+from conftest import assert_same_tables
+
+@pytest.fixture(scope='module')
+def index(synthetic_tlog):
+    return seek_index.build(synthetic_tlog)
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(config, 'PARSE_CHUNK_BYTES', 64 * 1024)
+
+def windows(index):
+    """(t0, t1) pairs: on and between index entries, open-ended, and partly or wholly past the end."""
+    times, half = index.times, config.SEEK_INDEX_INTERVAL_SEC / 2
+    end = index.end_time + config.SEEK_INDEX_INTERVAL_SEC
+    return {
+        'on-entries': (times[5], times[40]),
+        'between-entries': (times[5] + half, times[40] + half / 3),
+        'inside-one-interval': (times[20] + 0.1, times[20] + 0.2),
+        'open-start': (None, times[30] + half),
+        'open-end': (times[-30] + half, None),
+        'over-the-end': (times[-3] + half, end + 100),
+        'past-the-end': (end + 10, end + 100),
+    }
+
+@pytest.mark.parametrize('name', ['on-entries', 'between-entries', 'inside-one-interval', 'open-start',
+                                  'open-end', 'over-the-end', 'past-the-end'])
+@pytest.mark.parametrize('jobs', [1, 3])
+def test_window_matches_filtered_full_parse(synthetic_tlog, index, small_chunks, name, jobs):
+    time_range = windows(index)[name]
+    # Reading the whole file (an explicit byte range skips the seek index) and filtering by timestamp
+    full = log_converter.TlogParser(synthetic_tlog, time_range=time_range,
+                                    byte_range=(0, os.path.getsize(synthetic_tlog))).to_tables()
+    windowed = log_converter.TlogParser(synthetic_tlog, time_range=time_range).to_tables(jobs=jobs)
+    assert_same_tables(full, windowed)
+
+    t0, t1 = time_range
+    everything = log_converter.TlogParser(synthetic_tlog).to_tables()
+    stamps = np.concatenate([cols['timestamp'] for cols in everything.columns.values()])
+    inside = (stamps >= (-np.inf if t0 is None else t0)) & (stamps <= (np.inf if t1 is None else t1))
+    assert windowed.message_count() == inside.sum()
+    if name == 'past-the-end':
+        assert windowed.empty
+    else:
+        assert windowed.message_count() > 0
+
+def test_byte_range_covers_the_window(synthetic_tlog, index):
+    size = os.path.getsize(synthetic_tlog)
+    start, stop = index.byte_range(index.times[10] + 0.5, index.times[12] + 0.5)
+    assert (start, stop) == (index.offsets[10], index.offsets[13])
+    assert index.byte_range(None, None) == (0, size)
+    assert index.byte_range(index.end_time + 100, None) == (index.offsets[-1], size)